@@ -5,7 +5,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 from app.core.config import CONFIG as settings
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db
 from app.core.security import verify_token
 from app.db.models import UserModel
 from app.services.role_service import RoleService
@@ -13,7 +13,7 @@ from app.services.role_service import RoleService
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=settings.API_V1_STR+"/auth/login")
 
 async def get_current_user(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_db, scope="function"),
     token: str = Depends(oauth2_scheme)
 ) -> UserModel:
     """
@@ -65,7 +65,7 @@ async def get_current_active_user(
 
 async def get_current_user_with_permissions(
     current_user: UserModel = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ) -> dict:
     """
     获取当前用户及其权限信息
@@ -110,7 +110,7 @@ def require_permissions(required_permissions: List[str]):
     """
     async def permission_dependency(
         current_user: UserModel = Security(get_current_user),
-        db: AsyncSession = Depends(get_db)
+        db: AsyncSession = Depends(get_db, scope="function")
     ):
         role_service = RoleService(db)
         # user_roles = await role_service.get_user_roles(current_user.id)
@@ -146,7 +146,7 @@ def require_super_admin():
     """
     async def super_admin_dependency(
         current_user: UserModel = Security(get_current_user),
-        db: AsyncSession = Depends(get_db)
+        db: AsyncSession = Depends(get_db, scope="function")
     ):
         role_service = RoleService(db)
         # user_roles = await role_service.get_user_roles(current_user.id)
@@ -176,7 +176,7 @@ def check_data_access_permission(
     """
     async def data_access_dependency(
         current_user: UserModel = Security(get_current_user),
-        db: AsyncSession = Depends(get_db)
+        db: AsyncSession = Depends(get_db, scope="function")
     ):
         role_service = RoleService(db)
         # user_roles = await role_service.get_user_roles(current_user.id)
@@ -14,7 +14,7 @@ router = APIRouter()
 @router.post("/login", response_model=Token)
 async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     """统一登录接口"""
     auth_service = AuthService(db)
@@ -37,7 +37,7 @@ async def logout(current_user: UserModel = Depends(get_current_user)):
 @router.post("/password", response_model=dict)
 async def change_password(
     password_data: PasswordUpdate,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_db, scope="function"),
     current_user: UserModel = Depends(get_current_user)
 ):
     """修改密码"""
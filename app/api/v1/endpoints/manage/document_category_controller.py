@@ -18,7 +18,7 @@ router = APIRouter()
 @router.post("/category/create", response_model=DocumentCategoryTree)
 async def create_enterprise_category(
     *,
-    db: AsyncSession = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_db, scope="function"),
     category_in: DocumentCategoryCreate,
     current_user: UserModel = Depends(deps.get_current_active_user)
 ) -> DocumentCategoryTree:
@@ -34,7 +34,7 @@ async def create_enterprise_category(
 
 @router.get("/category/list", response_model=List[DocumentCategoryTree])
 async def get_enterprise_categories(
-    db: AsyncSession = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_read_db),
     current_user: UserModel = Depends(deps.get_current_active_user)
 ) -> List[DocumentCategoryTree]:
     """获取企业知识库分类列表"""
@@ -49,7 +49,7 @@ async def get_enterprise_categories(
 @router.put("/category/{category_id}", response_model=DocumentCategoryTree)
 async def update_enterprise_category(
     *,
-    db: AsyncSession = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_db, scope="function"),
     category_id: int,
     category_in: DocumentCategoryUpdate,
     current_user: UserModel = Depends(deps.get_current_active_user)
@@ -71,7 +71,7 @@ async def update_enterprise_category(
 @router.delete("/category/{category_id}")
 async def delete_enterprise_category(
     *,
-    db: AsyncSession = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_db, scope="function"),
     category_id: int,
     current_user: UserModel = Depends(deps.get_current_active_user)
 ) -> dict:
@@ -91,7 +91,7 @@ async def delete_enterprise_category(
 @router.get("/category/{category_id}", response_model=DocumentCategoryTree)
 async def get_enterprise_category_detail(
     *,
-    db: AsyncSession = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_db, scope="function"),
     category_id: int,
     current_user: UserModel = Depends(deps.get_current_active_user)
 ) -> DocumentCategoryTree:
@@ -3,7 +3,7 @@ from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.api.v1 import deps
 from app.db.models.user import UserModel
-from app.core.celery.celery_app import celery_app
+from app.core.celery.celery_app import celery_app, PROCESS_DOCUMENT_TASK, PRIORITY_ENTERPRISE
 from app.schemas.document import (
     DocumentCreate,
     DocumentInDB,
@@ -28,7 +28,7 @@ router = APIRouter()
 @router.post("/document/upload", response_model=List[DocumentInDB], dependencies=[Depends(require_permissions(["document:upload"]))]) # 添加权限
 async def upload_enterprise_documents(
     *,
-    db: AsyncSession = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_db, scope="function"),
     category_id: int = Form(...),
     files: List[UploadFile] = File(...),
     # description: str = Form(None),
@@ -61,7 +61,7 @@ async def upload_enterprise_documents(
 # @router.get("/document/list", response_model=List[DocumentInDB])
 @router.get("/document/list", response_model=List[DocumentInDB], dependencies=[Depends(require_permissions(["document:list"]))]) # 添加权限
 async def get_enterprise_documents(
-    db: AsyncSession = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_read_db),
     category_id: int = None,
     skip: int = 0,
     limit: int = 10,
@@ -82,7 +82,7 @@ async def get_enterprise_documents(
 @router.get("/document/{document_id}", response_model=DocumentInDB, dependencies=[Depends(require_permissions(["document:read"]))]) # 添加权限
 async def get_enterprise_document_detail(
     *,
-    db: AsyncSession = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_db, scope="function"),
     document_id: int,
     current_user: UserModel = Depends(deps.get_current_active_user) # 仍需获取当前用户
 ) -> DocumentInDB:
@@ -113,7 +113,7 @@ async def get_enterprise_document_detail(
 @router.delete("/document/{document_id}", dependencies=[Depends(require_permissions(["document:delete"]))]) # 添加权限
 async def delete_enterprise_document(
     *,
-    db: AsyncSession = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_db, scope="function"),
     document_id: int,
     current_user: UserModel = Depends(deps.get_current_active_user)
 ) -> dict:
@@ -152,7 +152,7 @@ async def delete_enterprise_document(
 async def create_document_settings(
     document_settings_in: DocumentSettingsCreate,
     document_id: int,
-    db: AsyncSession = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_db, scope="function"),
     current_user: UserModel = Depends(deps.get_current_active_user)    
 ) -> DocumentSettingsInDB:
     """获取默认的文档解析设置"""
@@ -171,7 +171,7 @@ async def create_document_settings(
 @router.get("/document/settings/{document_id}", response_model=DocumentSettingsInDB)
 async def get_document_settings(
     *,
-    db: AsyncSession = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_db, scope="function"),
     document_id: int,    
     current_user: UserModel = Depends(deps.get_current_active_user)
 ) -> DocumentSettingsInDB:
@@ -188,7 +188,7 @@ async def get_document_settings(
 @router.put("/document/settings/{document_id}", response_model=DocumentSettingsInDB, dependencies=[Depends(require_permissions(["document:settings_update"]))]) # 添加权限
 async def update_document_settings(
     *,
-    db: AsyncSession = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_db, scope="function"),
     document_id: int,
     settings_in: DocumentSettingsCreate,
     current_user: UserModel = Depends(deps.get_current_active_user)
@@ -224,7 +224,7 @@ async def update_document_settings(
 @router.post("/document/process/{document_id}", response_model=DocumentProcessResponse, dependencies=[Depends(require_permissions(["document:process"]))]) # 添加权限
 async def process_document(
     *,
-    db: AsyncSession = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_db, scope="function"),
     document_id: int,
     current_user: UserModel = Depends(deps.get_current_active_user)
 ) -> DocumentProcessResponse:
@@ -248,9 +248,9 @@ async def process_document(
         raise HTTPException(status_code=403, detail="Not authorized to process this document")
     
     task = celery_app.send_task(
-        "app.core.tasks.document_task.process_document",
+        PROCESS_DOCUMENT_TASK,
         args=[document_id, current_user.id],
-        queue='celery'  # 显式指定队列
+        priority=PRIORITY_ENTERPRISE  # 队列由 celery_app.task_routes 决定
     )
     logger.info(f"Document processing task {task.id} initiated for document {document_id} by user {current_user.id}.")
     return DocumentProcessResponse(task_id=task.id)
@@ -18,7 +18,7 @@ class PermissionController:
     async def list_permissions(
         skip: int = Query(0, ge=0),
         limit: int = Query(10, ge=1, le=100),
-        db: AsyncSession = Depends(get_db),
+        db: AsyncSession = Depends(get_db, scope="function"),
         current_user: UserModel = Depends(get_current_user)
     ):
         """获取权限列表"""
@@ -32,7 +32,7 @@ class PermissionController:
     @router.get("/{permission_id}", response_model=FunctionPermission, dependencies=[Depends(require_permissions(["permission:read"]))]) # 添加权限
     async def get_permission(
         permission_id: int,
-        db: AsyncSession = Depends(get_db),
+        db: AsyncSession = Depends(get_db, scope="function"),
         current_user: UserModel = Depends(get_current_user)
     ):
         """获取权限详情"""
@@ -52,7 +52,7 @@ class PermissionController:
     @router.post("/add", response_model=FunctionPermission, dependencies=[Depends(require_permissions(["permission:create"]))]) # 添加权限
     async def create_permission(
         permission_data: FunctionPermissionCreate,
-        db: AsyncSession = Depends(get_db),
+        db: AsyncSession = Depends(get_db, scope="function"),
         current_user: UserModel = Depends(get_current_user)
     ):
         """创建权限"""
@@ -67,7 +67,7 @@ class PermissionController:
     async def update_permission(
         permission_id: int,
         permission_data: FunctionPermissionUpdate,
-        db: AsyncSession = Depends(get_db),
+        db: AsyncSession = Depends(get_db, scope="function"),
         current_user: UserModel = Depends(get_current_user)
     ):
         """更新权限"""
@@ -89,7 +89,7 @@ class PermissionController:
     @router.delete("/{permission_id}", dependencies=[Depends(require_permissions(["permission:delete"]))]) # 添加权限
     async def delete_permission(
         permission_id: int,
-        db: AsyncSession = Depends(get_db),
+        db: AsyncSession = Depends(get_db, scope="function"),
         current_user: UserModel = Depends(get_current_user)
     ):
         """删除权限"""
@@ -109,7 +109,7 @@ class PermissionController:
     async def assign_permissions(
         role_id: int,
         permission_ids: List[int],
-        db: AsyncSession = Depends(get_db),
+        db: AsyncSession = Depends(get_db, scope="function"),
         current_user: UserModel = Depends(get_current_user)
     ):
         """为角色分配权限"""
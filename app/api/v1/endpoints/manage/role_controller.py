@@ -18,7 +18,7 @@ class RoleController:
     async def list_roles(
         skip: int = Query(0, ge=0),
         limit: int = Query(10, ge=1, le=100),
-        db: AsyncSession = Depends(get_db),
+        db: AsyncSession = Depends(get_db, scope="function"),
         current_user: UserModel = Depends(get_current_user)
     ):
         """获取角色列表"""
@@ -32,7 +32,7 @@ class RoleController:
     @router.get("/{role_id}", response_model=RoleWithPermissions, dependencies=[Depends(require_permissions(["role:read"]))]) # 添加权限
     async def get_role(
         role_id: int,
-        db: AsyncSession = Depends(get_db),
+        db: AsyncSession = Depends(get_db, scope="function"),
         current_user: UserModel = Depends(get_current_user)
     ):
         """获取角色详情"""
@@ -57,7 +57,7 @@ class RoleController:
     @router.post("/add", response_model=Role, dependencies=[Depends(require_permissions(["role:create"]))]) # 添加权限
     async def create_role(
         role_data: RoleCreate,
-        db: AsyncSession = Depends(get_db),
+        db: AsyncSession = Depends(get_db, scope="function"),
         current_user: UserModel = Depends(get_current_user)
     ):
         """创建角色"""
@@ -79,7 +79,7 @@ class RoleController:
     async def update_role(
         role_id: int,
         role_data: RoleUpdate,
-        db: AsyncSession = Depends(get_db),
+        db: AsyncSession = Depends(get_db, scope="function"),
         current_user: UserModel = Depends(get_current_user)
     ):
         """更新角色"""
@@ -99,7 +99,7 @@ class RoleController:
     @router.delete("/{role_id}", dependencies=[Depends(require_permissions(["role:delete"]))]) # 添加权限
     async def delete_role(
         role_id: int,
-        db: AsyncSession = Depends(get_db),
+        db: AsyncSession = Depends(get_db, scope="function"),
         current_user: UserModel = Depends(get_current_user)
     ):
         """删除角色"""
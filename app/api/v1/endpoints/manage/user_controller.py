@@ -20,7 +20,7 @@ class UserController:
     async def list_users(
         skip: int = Query(0, ge=0),
         limit: int = Query(10, ge=1, le=100),
-        db: AsyncSession = Depends(get_db),
+        db: AsyncSession = Depends(get_db, scope="function"),
         current_user: UserModel = Depends(require_permissions(["user:list"]))
     ) -> Tuple[List[UserModel], int]:
         """获取用户列表"""
@@ -35,7 +35,7 @@ class UserController:
     @router.get("/users/{user_id}", response_model=User, dependencies=[Depends(require_permissions(["user:read"]))]) # 添加权限
     async def get_user(
         user_id: int,
-        db: AsyncSession = Depends(get_db),
+        db: AsyncSession = Depends(get_db, scope="function"),
         current_user: UserModel = Depends(require_permissions(["user:read"]))
     ) -> UserModel:
         """获取用户详情"""
@@ -55,7 +55,7 @@ class UserController:
     @router.post("/add", response_model=User, dependencies=[Depends(require_permissions(["user:create"]))]) # 添加权限
     async def create_user(
         user_data: UserCreate,
-        db: AsyncSession = Depends(get_db),
+        db: AsyncSession = Depends(get_db, scope="function"),
         current_user: UserModel = Depends(require_permissions(["user:create"]))
     ) -> UserModel:
         """创建用户"""
@@ -77,7 +77,7 @@ class UserController:
     async def update_user(
         user_id: int,
         user_data: UserUpdate,
-        db: AsyncSession = Depends(get_db),
+        db: AsyncSession = Depends(get_db, scope="function"),
         current_user: UserModel = Depends(require_permissions(["user:update"]))
     ) -> UserModel:
         """更新用户"""
@@ -97,7 +97,7 @@ class UserController:
     @router.delete("/users/{user_id}", response_model=bool, dependencies=[Depends(require_permissions(["user:delete"]))]) # 添加权限
     async def delete_user(
         user_id: int,
-        db: AsyncSession = Depends(get_db),
+        db: AsyncSession = Depends(get_db, scope="function"),
         current_user: UserModel = Depends(require_permissions(["user:delete"]))
     ) -> bool:
         """删除用户"""
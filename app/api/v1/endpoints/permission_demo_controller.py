@@ -18,7 +18,7 @@ router = APIRouter()
 @router.get("/my-permissions")
 async def get_my_permissions(
     current_user: UserModel = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     """
     获取当前用户的权限信息
@@ -34,7 +34,7 @@ async def get_my_permissions(
 @router.get("/permission-summary")
 async def get_permission_summary(
     current_user: UserModel = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     """
     获取当前用户的权限摘要
@@ -51,7 +51,7 @@ async def get_permission_summary(
 async def check_specific_permission(
     permission: str,
     current_user: UserModel = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     """
     检查当前用户是否有指定权限
@@ -72,7 +72,7 @@ async def check_specific_permission(
 async def check_multiple_permissions(
     permissions: List[str],
     current_user: UserModel = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     """
     检查当前用户是否有指定的多个权限
@@ -142,7 +142,7 @@ async def document_access_endpoint(
 async def get_accessible_resources(
     resource_type: str = None,
     current_user: UserModel = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     """
     获取当前用户可访问的资源列表
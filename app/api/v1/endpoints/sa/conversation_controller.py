@@ -1,17 +1,21 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Header
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.api.v1.deps import get_current_active_user
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db, track_db_time
 from app.schemas.conversation import (
     ConversationCreate, ConversationUpdate, ConversationResponse, ConversationList,
-    SendMessageRequest, SendMessageResponse
+    SendMessageRequest, SendMessageResponse, ConversationSearchHit, ConversationSearchResponse
 )
-from app.schemas.message import MessageCreate, MessageResponse
+from app.schemas.message import MessageCreate, MessageResponse, MessageUpdate
 from app.services.conversation_service import ConversationService
 from app.services.message_service import MessageService
 from app.services.llm_configuration_service import LlmConfigurationService
+from app.services import conversation_transfer, history_search, idempotency
 from app.core.llm import get_llm_response
+from app.core.config import CONFIG
+from app.utils.pagination import decode_cursor, next_cursor
 from app.db.models.user import UserModel
 from pydantic import BaseModel
 from app.core.logger.logging_config_helper import get_configured_logger # 导入日志
@@ -20,6 +24,15 @@ logger = get_configured_logger("pioneer_handler") # 获取Logger实例
 
 router = APIRouter()
 
+# 发送消息后响应中返回的消息条数
+RESPONSE_MESSAGE_LIMIT = 20
+
+def _validate_cursor(cursor: str) -> None:
+    try:
+        decode_cursor(cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
 class ConversationCreateRequest(BaseModel):
     title: str = "新对话"
     llm_id: int
@@ -27,7 +40,7 @@ class ConversationCreateRequest(BaseModel):
 @router.post("/", response_model=ConversationResponse)
 async def create_conversation(
     conversation_data: ConversationCreateRequest,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_db, scope="function"),
     current_user: UserModel = Depends(get_current_active_user)
 ):
     """
@@ -76,39 +89,106 @@ async def create_conversation(
 
     # 5. 返回创建的会话信息和大模型响应
     logger.info(f"New conversation {conversation.id} with initial response returned to user {current_user.id}.")
-    return {
-        **conversation.__dict__,
-        "initial_response": llm_response
-    }
+    return ConversationResponse.model_construct(
+        **conversation.to_dict(),
+        initial_response=llm_response
+    )
 
 @router.get("/list", response_model=ConversationList)
 async def get_conversations(
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
-    db: AsyncSession = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="上一页返回的 next_cursor（keyset分页，优先于 skip）"),
+    db: AsyncSession = Depends(get_read_db),
     current_user: UserModel = Depends(get_current_active_user)
 ):
     """
-    获取用户的会话列表
+    获取用户的会话列表（按创建时间倒序）
     """
-    logger.info(f"User {current_user.id} ({current_user.user_name}) requesting conversation list. Skip: {skip}, Limit: {limit}.")
+    logger.info(f"User {current_user.id} ({current_user.user_name}) requesting conversation list. Skip: {skip}, Limit: {limit}, Cursor: {cursor}.")
+    if cursor:
+        _validate_cursor(cursor)
     total = await ConversationService.get_total(db=db, user_id=current_user.id)
     conversations = await ConversationService.get_multi(
         db=db,
         user_id=current_user.id,
         skip=skip,
-        limit=limit
+        limit=limit,
+        cursor=cursor
     )
     logger.info(f"Returned {len(conversations)} conversations (total: {total}) to user {current_user.id}.")
     return {
         "total": total,
-        "items": conversations
+        "items": conversations,
+        "next_cursor": next_cursor(conversations, limit)
     }
 
+@router.get("/search", response_model=ConversationSearchResponse)
+async def search_conversations(
+    q: str = Query(..., min_length=1, max_length=200, description="检索关键词"),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: UserModel = Depends(get_current_active_user)
+):
+    """
+    检索当前用户的历史消息（全文索引 + 向量检索，按 RRF 融合排序）
+    """
+    logger.info(f"User {current_user.id} ({current_user.user_name}) searching history. Query: {q[:50]}, Limit: {limit}.")
+    hits = await history_search.search(db, current_user.id, q, limit)
+    return {
+        "items": [
+            ConversationSearchHit(
+                message_id=row.id,
+                conversation_id=row.conversation_id,
+                conversation_title=row.conversation_title,
+                question=row.question,
+                content=row.content,
+                create_time=row.create_time,
+                score=score
+            )
+            for row, score in hits
+        ]
+    }
+
+@router.get("/export")
+async def export_conversations(
+    current_user: UserModel = Depends(get_current_active_user)
+):
+    """
+    流式导出当前用户的全部会话和消息（NDJSON，每行一个会话或消息）
+    """
+    logger.info(f"User {current_user.id} ({current_user.user_name}) exporting conversations.")
+    return StreamingResponse(
+        conversation_transfer.export_ndjson(current_user.id),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="conversations.ndjson"'}
+    )
+
+@router.post("/import")
+async def import_conversations(
+    request: Request,
+    llm_id: Optional[int] = Query(None, description="覆盖导入消息的大模型ID（目标环境没有原大模型配置时使用）"),
+    db: AsyncSession = Depends(get_db, scope="function"),
+    current_user: UserModel = Depends(get_current_active_user)
+):
+    """
+    批量导入会话和消息（请求体为 /export 导出的 NDJSON），流式读取请求体并分批插入
+    """
+    logger.info(f"User {current_user.id} ({current_user.user_name}) importing conversations. LLM override: {llm_id}.")
+    try:
+        counts = await conversation_transfer.import_ndjson(
+            db, conversation_transfer.iter_lines(request.stream()), current_user, llm_id
+        )
+    except ValueError as e:
+        logger.warning(f"Conversation import by user {current_user.id} rejected: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+    return counts
+
 @router.get("/{conversation_id}", response_model=ConversationResponse)
 async def get_conversation(
     conversation_id: int,
-    db: AsyncSession = Depends(get_db),
+    full_reasoning: bool = Query(False, description="返回完整推理文本（默认只返回预览）"),
+    db: AsyncSession = Depends(get_read_db),
     current_user: UserModel = Depends(get_current_active_user)
 ):
     """
@@ -133,13 +213,16 @@ async def get_conversation(
         
     logger.info(f"Returned detail for conversation {conversation_id} to user {current_user.id}.")
     
-    # 获取对话的消息列表
-    messages = await MessageService.get_by_conversation(db=db, conversation_id=conversation_id, limit=50)
-    message_responses = [MessageResponse.model_validate(msg) for msg in messages]
+    # 获取对话的消息列表（投影查询/缓存行直接构建响应，推理文本默认只返回预览）
+    preview_chars = None if full_reasoning else CONFIG.llm_reasoning.list_preview_chars
+    messages = await MessageService.get_by_conversation(
+        db=db, conversation_id=conversation_id, limit=50, include_reasoning=preview_chars != 0
+    )
+    message_responses = [MessageResponse.from_row(msg, preview_chars) for msg in messages]
     
     # 返回包含消息列表的对话信息
-    return ConversationResponse(
-        **conversation.__dict__,
+    return ConversationResponse.model_construct(
+        **conversation.to_dict(),
         messages=message_responses
     )
 
@@ -147,7 +230,7 @@ async def get_conversation(
 async def update_conversation(
     conversation_id: int,
     conversation_data: ConversationUpdate,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_db, scope="function"),
     current_user: UserModel = Depends(get_current_active_user)
 ):
     """
@@ -182,7 +265,7 @@ async def update_conversation(
 @router.delete("/{conversation_id}")
 async def delete_conversation(
     conversation_id: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_db, scope="function"),
     current_user: UserModel = Depends(get_current_active_user)
 ):
     """
@@ -222,77 +305,103 @@ async def delete_conversation(
 async def send_message_to_conversation(
     conversation_id: int,
     message_data: SendMessageRequest,
-    db: AsyncSession = Depends(get_db),
-    current_user: UserModel = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_db, scope="function"),
+    current_user: UserModel = Depends(get_current_active_user),
+    idempotency_key: Optional[str] = Header(None, alias=idempotency.HEADER)
 ):
     """
     在已有对话中发送消息
+
+    携带 Idempotency-Key 时，重复请求（双击、超时重试）共享同一次大模型调用，
+    之后的重复请求重放已保存的响应（见 app.services.idempotency）。
+    """
+    return await idempotency.run(
+        db, current_user.id, f"send-message:{conversation_id}", idempotency_key, message_data,
+        lambda: _send_message(conversation_id, message_data, db, current_user)
+    )
+
+async def _send_message(
+    conversation_id: int,
+    message_data: SendMessageRequest,
+    db: AsyncSession,
+    current_user: UserModel
+) -> SendMessageResponse:
+    """
+    数据库访问：会话+LLM配置一次联表查询、历史消息一次查询、插入消息（flush取主键），
+    请求结束时由 get_db 提交一次；响应中的消息列表直接复用内存中的历史消息。
     """
     logger.info(f"User {current_user.id} ({current_user.user_name}) sending message to conversation {conversation_id}. Question: {message_data.question[:50]}...")
     
-    # 1. 验证对话存在且属于当前用户
-    conversation = await ConversationService.get(db=db, id=conversation_id)
-    if not conversation:
-        logger.warning(f"Conversation {conversation_id} not found for message send by user {current_user.id}.")
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Conversation not found"
+    with track_db_time("send_message"):
+        # 1. 一次查询获取对话和LLM配置
+        conversation, llm_config = await ConversationService.get_with_llm_config(
+            db=db, id=conversation_id, llm_id=message_data.llm_id
         )
+        if not conversation:
+            logger.warning(f"Conversation {conversation_id} not found for message send by user {current_user.id}.")
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Conversation not found"
+            )
+            
+        if conversation.user_id != current_user.id:
+            logger.warning(f"User {current_user.id} attempted to send message to unauthorized conversation {conversation_id} (owner: {conversation.user_id}).")
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not enough permissions"
+            )
         
-    if conversation.user_id != current_user.id:
-        logger.warning(f"User {current_user.id} attempted to send message to unauthorized conversation {conversation_id} (owner: {conversation.user_id}).")
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not enough permissions"
+        # 2. 验证LLM配置是否存在且可用
+        if not llm_config or llm_config.status != 1:
+            logger.warning(f"Invalid or unavailable LLM configuration {message_data.llm_id} for message send by user {current_user.id}.")
+            raise HTTPException(status_code=400, detail="Invalid LLM configuration")
+        
+        # 3. 获取历史消息（一次查询同时满足上下文和响应所需的条数）
+        context_limit = getattr(llm_config, 'max_chat_limit', None) or 10
+        history_messages = await MessageService.get_by_conversation(
+            db=db, 
+            conversation_id=conversation_id, 
+            limit=max(context_limit, RESPONSE_MESSAGE_LIMIT - 1)
         )
-    
-    # 2. 验证LLM配置是否存在且可用
-    llm_config = await LlmConfigurationService.get(db=db, id=message_data.llm_id)
-    if not llm_config or llm_config.status != 1:
-        logger.warning(f"Invalid or unavailable LLM configuration {message_data.llm_id} for message send by user {current_user.id}.")
-        raise HTTPException(status_code=400, detail="Invalid LLM configuration")
-    
-    # 3. 获取历史消息作为上下文
-    history_messages = await MessageService.get_by_conversation(
-        db=db, 
-        conversation_id=conversation_id, 
-        limit=getattr(llm_config, 'max_chat_limit', 10)
-    )
-    logger.debug(f"Retrieved {len(history_messages)} history messages for conversation {conversation_id}.")
-    
-    # 4. 获取大模型响应
-    llm_response = await get_llm_response(
-        question=message_data.question,
-        history_messages=history_messages,
-        llm_config=llm_config
-    )
-    logger.debug(f"LLM response received for conversation {conversation_id}. Content: {llm_response.get('content', '')[:50]}...")
-    
-    # 5. 创建消息记录
-    message = await MessageService.create(
-        db=db,
-        obj_in=MessageCreate(
-            conversation_id=conversation_id,
-            llm_id=message_data.llm_id,
+        logger.debug(f"Retrieved {len(history_messages)} history messages for conversation {conversation_id}.")
+        
+        # 4. 获取大模型响应（不执行SQL，不计入数据库耗时）
+        llm_response = await get_llm_response(
             question=message_data.question,
-            content=llm_response.get("content", ""),
-            reasoning_content=llm_response.get("reasoning_content"),
-            create_by=current_user.user_name
+            history_messages=history_messages[:context_limit],
+            llm_config=llm_config,
+            skip_reasoning=message_data.skip_reasoning
+        )
+        logger.debug(f"LLM response received for conversation {conversation_id}. Content: {llm_response.get('content', '')[:50]}...")
+        
+        # 5. 创建消息记录（flush 取主键，由 get_db 在请求结束时提交一次）
+        message = await MessageService.create(
+            db=db,
+            obj_in=MessageCreate(
+                conversation_id=conversation_id,
+                llm_id=message_data.llm_id,
+                question=message_data.question,
+                content=llm_response.get("content", ""),
+                reasoning_content=llm_response.get("reasoning_content"),
+                create_by=current_user.user_name
+            )
         )
-    )
     logger.info(f"Message {message.id} created for conversation {conversation_id} by user {current_user.id}.")
     
-    # 6. 获取更新后的对话信息（包含消息列表）
-    updated_messages = await MessageService.get_by_conversation(db=db, conversation_id=conversation_id, limit=20)
-    message_responses = [MessageResponse.model_validate(msg) for msg in updated_messages]
-    conversation_response = ConversationResponse(
-        **conversation.__dict__,
+    # 6. 复用内存中的历史消息构建响应（最新在前）；新消息返回完整推理文本，列表中只返回预览
+    preview_chars = CONFIG.llm_reasoning.list_preview_chars
+    message_responses = [
+        MessageResponse.from_row(msg, preview_chars)
+        for msg in [message, *history_messages[:RESPONSE_MESSAGE_LIMIT - 1]]
+    ]
+    conversation_response = ConversationResponse.model_construct(
+        **conversation.to_dict(),
         messages=message_responses
     )
     
     logger.info(f"Message sent successfully to conversation {conversation_id} by user {current_user.id}.")
-    return SendMessageResponse(
-        message=MessageResponse.model_validate(message),
+    return SendMessageResponse.model_construct(
+        message=MessageResponse.from_row(message),
         conversation=conversation_response
     )
 
@@ -300,7 +409,7 @@ async def send_message_to_conversation(
 async def update_message(
     message_id: int,
     updated_question: str,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_db, scope="function"),
     current_user: UserModel = Depends(get_current_active_user)
 ):
     """
@@ -348,30 +457,25 @@ async def update_message(
     )
     logger.debug(f"LLM response received for updated message {message_id}. Content: {llm_response.get('content', '')[:50]}...")
     
-    # 6. 更新消息
-    from app.schemas.message import MessageUpdate
+    # 6. 更新消息（问题与回答一并更新，由 get_db 在请求结束时提交）
     updated_message = await MessageService.update(
         db=db,
         db_obj=message,
         obj_in=MessageUpdate(
+            question=updated_question,
             content=llm_response.get("content", ""),
             reasoning_content=llm_response.get("reasoning_content"),
             update_by=current_user.user_name
         )
     )
     
-    # 同时更新问题（需要添加到MessageUpdate schema中）
-    updated_message.question = updated_question
-    await db.commit()
-    await db.refresh(updated_message)
-    
     logger.info(f"Message {message_id} updated successfully by user {current_user.id}.")
     return MessageResponse.model_validate(updated_message)
 
 @router.delete("/message/{message_id}")
 async def delete_message(
     message_id: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_db, scope="function"),
     current_user: UserModel = Depends(get_current_active_user)
 ):
     """
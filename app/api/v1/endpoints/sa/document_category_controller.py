@@ -18,7 +18,7 @@ router = APIRouter()
 @router.post("/knowledge/category/create", response_model=DocumentCategoryTree)
 async def create_personal_category(
     *,
-    db: AsyncSession = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_db, scope="function"),
     category_in: DocumentCategoryCreate,
     current_user: UserModel = Depends(deps.get_current_active_user)
 ) -> DocumentCategoryTree:
@@ -35,7 +35,7 @@ async def create_personal_category(
 
 @router.get("/knowledge/category/list", response_model=List[DocumentCategoryTree])
 async def get_personal_categories(
-    db: AsyncSession = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_read_db),
     current_user: UserModel = Depends(deps.get_current_active_user)
 ) -> List[DocumentCategoryTree]:
     """获取个人知识库分类列表"""
@@ -51,7 +51,7 @@ async def get_personal_categories(
 @router.put("/knowledge/category/{category_id}", response_model=DocumentCategoryTree)
 async def update_personal_category(
     *,
-    db: AsyncSession = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_db, scope="function"),
     category_id: int,
     category_in: DocumentCategoryUpdate,
     current_user: UserModel = Depends(deps.get_current_active_user)
@@ -73,7 +73,7 @@ async def update_personal_category(
 @router.delete("/knowledge/category/{category_id}")
 async def delete_personal_category(
     *,
-    db: AsyncSession = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_db, scope="function"),
     category_id: int,
     current_user: UserModel = Depends(deps.get_current_active_user)
 ) -> dict:
@@ -3,7 +3,7 @@ from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
 from sqlalchemy.ext.asyncio import AsyncSession  # 修改这里
 from app.api.v1 import deps
 from app.db.models.user import UserModel
-from app.core.celery.celery_app import celery_app
+from app.core.celery.celery_app import celery_app, PROCESS_DOCUMENT_TASK, PRIORITY_PERSONAL
 from app.schemas.document import (
     DocumentCreate,
     DocumentInDB,
@@ -25,7 +25,7 @@ router = APIRouter()
 @router.post("/knowledge/document/upload", response_model=List[DocumentInDB])
 async def upload_personal_documents(
     *,
-    db: AsyncSession = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_db, scope="function"),
     category_id: int = Form(...),
     files: List[UploadFile] = File(...),
     # description: str = Form(None),
@@ -57,7 +57,7 @@ async def upload_personal_documents(
 
 @router.get("/knowledge/document/list", response_model=List[DocumentInDB])
 async def get_personal_documents(
-    db: AsyncSession = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_read_db),
     category_id: int = None,
     skip: int = 0,
     limit: int = 10,
@@ -78,7 +78,7 @@ async def get_personal_documents(
 @router.delete("/knowledge/document/{document_id}")
 async def delete_personal_document(
     *,
-    db: AsyncSession = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_db, scope="function"),
     document_id: int,
     current_user: UserModel = Depends(deps.get_current_active_user)
 ) -> dict:
@@ -98,7 +98,7 @@ async def delete_personal_document(
 @router.get("/knowledge/document/settings/{document_id}", response_model=DocumentSettingsInDB)
 async def get_personal_document_settings(
     *,
-    db: AsyncSession = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_db, scope="function"),
     document_id: int,
     current_user: UserModel = Depends(deps.get_current_active_user)
 ) -> DocumentSettingsInDB:
@@ -114,7 +114,7 @@ async def get_personal_document_settings(
 @router.put("/knowledge/document/settings/{document_id}", response_model=DocumentSettingsInDB)
 async def update_personal_document_settings(
     *,
-    db: AsyncSession = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_db, scope="function"),
     document_id: int,
     settings_in: DocumentSettingsCreate,
     current_user: UserModel = Depends(deps.get_current_active_user)
@@ -139,9 +139,9 @@ async def process_personal_document(
     """处理个人知识库文档"""
     logger.info(f"User {current_user.id} ({current_user.user_name}) attempting to process personal document {document_id}.")
     task = celery_app.send_task(
-        "app.core.tasks.document_task.process_document",
+        PROCESS_DOCUMENT_TASK,
         args=[document_id, current_user.id],
-        queue='celery'  # 显式指定队列
+        priority=PRIORITY_PERSONAL  # 队列由 celery_app.task_routes 决定
     )
     logger.info(f"Personal document processing task {task.id} initiated for document {document_id} by user {current_user.id}.")
     return DocumentProcessResponse(task_id=task.id)
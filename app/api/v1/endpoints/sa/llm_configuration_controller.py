@@ -20,7 +20,7 @@ router = APIRouter()
 async def get_llm_list(
     skip: int = 0,
     limit: int = 100,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_db, scope="function"),
     current_user: UserModel = Depends(get_current_active_user)
 ):
     """获取可用的LLM列表"""
@@ -32,7 +32,7 @@ async def get_llm_list(
 @router.post("/llm", response_model=LlmConfigurationResponse, dependencies=[Depends(require_permissions(["llm:create"]))]) # 添加权限
 async def create_llm_config(
     *,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_db, scope="function"),
     current_user: UserModel = Depends(get_current_active_user),
     llm_config_in: LlmConfigurationCreate
 ):
@@ -59,7 +59,7 @@ async def create_llm_config(
 @router.put("/llm/{llm_id}", response_model=LlmConfigurationResponse, dependencies=[Depends(require_permissions(["llm:update"]))]) # 添加权限
 async def update_llm_config(
     *,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_db, scope="function"),
     current_user: UserModel = Depends(get_current_active_user),
     llm_id: int,
     llm_config_in: LlmConfigurationUpdate
@@ -1,13 +1,16 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Response, Header
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.api.v1.deps import get_db, get_current_active_user
+from app.api.v1.deps import get_db, get_read_db, get_current_active_user
 from app.schemas.message import MessageCreate, MessageResponse, MessageUpdate
 from app.services.message_service import MessageService
 from app.services.conversation_service import ConversationService
 from app.services.llm_configuration_service import LlmConfigurationService
+from app.services import idempotency
 # from app.config import settings
 from app.core.llm import get_llm_response
+from app.core.config import CONFIG
+from app.utils.pagination import decode_cursor, next_cursor
 from app.db.models.user import UserModel
 from app.core.logger.logging_config_helper import get_configured_logger # 导入日志
 
@@ -18,12 +21,19 @@ router = APIRouter()
 @router.post("/conversation/message", response_model=MessageResponse)
 async def create_message(
     *,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_db, scope="function"),
     current_user: UserModel = Depends(get_current_active_user),
     message_in: MessageCreate,
-    background_tasks: BackgroundTasks
+    background_tasks: BackgroundTasks,
+    idempotency_key: Optional[str] = Header(None, alias=idempotency.HEADER)
 ):
-    """创建新的消息"""
+    """创建新的消息（携带 Idempotency-Key 时重复请求只调用一次大模型，见 app.services.idempotency）"""
+    return await idempotency.run(
+        db, current_user.id, "create-message", idempotency_key, message_in,
+        lambda: _create_message(db, current_user, message_in)
+    )
+
+async def _create_message(db: AsyncSession, current_user: UserModel, message_in: MessageCreate) -> MessageResponse:
     logger.info(f"User {current_user.id} ({current_user.user_name}) attempting to create message for conversation {message_in.conversation_id}. Question: {message_in.question[:50]}...")
     # 验证会话存在且属于当前用户
     conversation = await ConversationService.get(db=db, id=message_in.conversation_id)
@@ -61,18 +71,31 @@ async def create_message(
     
     message = await MessageService.create(db=db, obj_in=message_in)
     logger.info(f"Message {message.id} created for conversation {message_in.conversation_id} by user {current_user.id}.")
-    return message
+    return MessageResponse.from_row(message)
 
 @router.get("/conversation/{conversation_id}/messages", response_model=List[MessageResponse])
 async def get_conversation_messages(
     conversation_id: int,
+    response: Response,
     skip: int = 0,
     limit: int = 20,
-    db: AsyncSession = Depends(get_db),
+    cursor: Optional[str] = None,
+    full_reasoning: bool = False,
+    db: AsyncSession = Depends(get_read_db),
     current_user: UserModel = Depends(get_current_active_user)
 ):
-    """获取特定会话的消息列表"""
-    logger.info(f"User {current_user.id} ({current_user.user_name}) requesting messages for conversation {conversation_id}. Skip: {skip}, Limit: {limit}.")
+    """
+    获取特定会话的消息列表（按创建时间倒序）
+
+    传入上一页响应头 X-Next-Cursor 的值作为 cursor 获取下一页（keyset分页，优先于 skip）。
+    推理文本默认只返回前 list_preview_chars 个字符，full_reasoning=true 时返回完整内容。
+    """
+    logger.info(f"User {current_user.id} ({current_user.user_name}) requesting messages for conversation {conversation_id}. Skip: {skip}, Limit: {limit}, Cursor: {cursor}.")
+    if cursor:
+        try:
+            decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
     conversation = await ConversationService.get(db=db, id=conversation_id)
     if not conversation:
         logger.warning(f"Conversation {conversation_id} not found for message list request by user {current_user.id}.")
@@ -81,8 +104,13 @@ async def get_conversation_messages(
         logger.warning(f"User {current_user.id} attempted to access messages in unauthorized conversation {conversation_id} (owner: {conversation.user_id}).")
         raise HTTPException(status_code=403, detail="Not enough permissions")
     
+    preview_chars = None if full_reasoning else CONFIG.llm_reasoning.list_preview_chars
     messages = await MessageService.get_by_conversation(
-        db=db, conversation_id=conversation_id, skip=skip, limit=limit
+        db=db, conversation_id=conversation_id, skip=skip, limit=limit, cursor=cursor,
+        include_reasoning=preview_chars != 0
     )
+    cursor_for_next = next_cursor(messages, limit)
+    if cursor_for_next:
+        response.headers["X-Next-Cursor"] = cursor_for_next
     logger.info(f"Returned {len(messages)} messages for conversation {conversation_id} to user {current_user.id}.")
-    return messages 
\ No newline at end of file
+    return [MessageResponse.from_row(msg, preview_chars) for msg in messages] 
\ No newline at end of file
@@ -0,0 +1,90 @@
+"""
+Celery worker 的常驻事件循环
+
+每个 worker 进程启动一个后台线程运行常驻事件循环，任务通过 run_async 把协程提交到
+该循环并同步等待结果。与每个任务新建/关闭事件循环相比：
+- 异步数据库连接池、LLM/Embedding HTTP 连接池、向量库客户端（及其 asyncio.Lock）
+  在任务之间复用，不会因绑定到已关闭的事件循环而失效
+- 配合 threads 执行池（celery.pool / celery.concurrency），多个任务线程共享同一个循环，
+  一个 worker 可同时处理多个文档入库任务，把 Embedding 服务的速率限制用满
+
+事件循环在首次使用时按进程创建（prefork 子进程中各自创建），worker 退出时释放
+连接池并停止循环。
+
+threads 执行池不强制 task_time_limit（也不支持 worker_max_tasks_per_child），任务调用
+run_async 时传入 timeout（celery_app.TASK_TIME_LIMIT），超时后协程被取消、任务失败，
+卡住的任务不会一直占用任务线程。
+"""
+
+import asyncio
+import os
+import threading
+from typing import Any, Awaitable, Optional
+
+from celery.signals import worker_process_shutdown, worker_shutdown
+
+from app.core.logger.logging_config_helper import get_configured_logger
+
+logger = get_configured_logger("pioneer_handler")
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_pid: Optional[int] = None
+_lock = threading.Lock()
+
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """返回当前进程的常驻事件循环（首次调用时在后台线程中启动）"""
+    global _loop, _loop_pid
+    with _lock:
+        # fork 出的子进程不会继承运行循环的线程，需要重新创建
+        if _loop is None or _loop_pid != os.getpid():
+            loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def run():
+                asyncio.set_event_loop(loop)
+                loop.call_soon(ready.set)
+                loop.run_forever()
+
+            threading.Thread(target=run, name="celery-event-loop", daemon=True).start()
+            ready.wait()
+            _loop, _loop_pid = loop, os.getpid()
+            logger.info(f"Started persistent event loop for worker process {_loop_pid}")
+    return _loop
+
+
+def run_async(coro: Awaitable[Any], timeout: Optional[float] = None) -> Any:
+    """在常驻事件循环中执行协程并等待结果（在任务线程中调用，不能在事件循环内调用）"""
+    future = asyncio.run_coroutine_threadsafe(coro, get_loop())
+    try:
+        return future.result(timeout)
+    except BaseException:
+        # 超时或任务被终止时取消协程，避免它在循环中继续占用连接
+        future.cancel()
+        raise
+
+
+async def _close_clients() -> None:
+    from app.core.http_transport import aclose_all
+    from app.db.session import engine, read_engine
+
+    await aclose_all()
+    await engine.dispose()
+    if read_engine is not engine:
+        await read_engine.dispose()
+
+
+@worker_process_shutdown.connect
+@worker_shutdown.connect
+def shutdown(**kwargs) -> None:
+    """worker 退出时关闭连接池并停止事件循环"""
+    global _loop
+    with _lock:
+        loop, _loop = (_loop, None) if _loop_pid == os.getpid() else (None, _loop)
+    if loop is None:
+        return
+    try:
+        asyncio.run_coroutine_threadsafe(_close_clients(), loop).result(10)
+    except Exception as e:
+        logger.warning(f"Failed to close async clients on worker shutdown: {e}")
+    loop.call_soon_threadsafe(loop.stop)
@@ -1,16 +1,36 @@
 # app/core/celery_app.py
 from celery import Celery
+from kombu import Queue
 from app.core.config import CONFIG as settings
 from app.core.logger.logging_config_helper import get_configured_logger
 
 logger = get_configured_logger("pioneer_handler")
 
+# 文档入库的分阶段队列：解析（CPU）、向量化（Embedding 服务）、写入向量库，各自部署 worker 独立扩容
+QUEUE_DEFAULT = 'celery'
+QUEUE_PARSE = 'document.parse'
+QUEUE_EMBED = 'document.embed'
+QUEUE_INDEX = 'document.index'
+ALL_QUEUES = [QUEUE_DEFAULT, QUEUE_PARSE, QUEUE_EMBED, QUEUE_INDEX]
+
+# 文档处理入口任务（控制器按名称发送，无需导入任务模块）
+PROCESS_DOCUMENT_TASK = 'app.core.celery.document_task.process_document'
+
+# 任务优先级（Redis broker：0 最高，9 最低）
+PRIORITY_PERSONAL = 2  # 个人知识库文档（通常较小，优先处理）
+PRIORITY_ENTERPRISE = 5  # 企业知识库文档
+PRIORITY_DEFAULT = 5
+PRIORITY_LOWEST = 9
+
+# 任务超时时间（秒）。threads 执行池不强制 task_time_limit，任务通过 run_async(timeout=...) 自行限时
+TASK_TIME_LIMIT = 3600
+
 # 创建 Celery 实例
 celery_app = Celery(
     "knowledge_base",
     broker=f"redis://{settings.redis.host}:{settings.redis.port}/{settings.redis.db}",
     backend=f"redis://{settings.redis.host}:{settings.redis.port}/{settings.redis.db}",
-    include=['app.core.celery.document_task']  # 显式包含任务模块
+    include=['app.core.celery.document_task', 'app.core.celery.llm_batch_task', 'app.core.celery.history_task']  # 显式包含任务模块
 )
 
 # Celery 配置
@@ -21,13 +41,34 @@ celery_app.conf.update(
     timezone='Asia/Shanghai',
     enable_utc=True,
     task_track_started=True,
-    task_time_limit=3600,  # 任务超时时间1小时
-    worker_max_tasks_per_child=200,  # 每个worker最多执行200个任务后重启
+    task_time_limit=TASK_TIME_LIMIT,  # 任务超时时间1小时（仅 prefork 池强制；threads 池由 run_async 超时取消）
+    worker_max_tasks_per_child=200,  # 每个worker最多执行200个任务后重启（仅 prefork 池生效）
+    worker_pool=settings.celery.pool,  # threads：任务线程共享进程内常驻事件循环（见 async_runtime）
+    worker_concurrency=settings.celery.concurrency,  # 每个worker并发执行的任务数
     broker_connection_retry_on_startup=True,
     # 添加以下配置
     worker_prefetch_multiplier=1,  # 限制worker同时处理的任务数
     task_ignore_result=False,  # 需要获取任务结果
     task_always_eager=False,  # 确保任务异步执行
+    # 任务路由：按任务名分发到各阶段队列，发送方无需指定 queue
+    task_default_queue=QUEUE_DEFAULT,
+    task_queues=[Queue(queue) for queue in ALL_QUEUES],  # 未指定 -Q 的 worker 消费全部队列
+    task_routes={
+        PROCESS_DOCUMENT_TASK: {'queue': QUEUE_PARSE},
+        'app.core.celery.document_task.embed_chunks': {'queue': QUEUE_EMBED},
+        'app.core.celery.document_task.index_chunks': {'queue': QUEUE_INDEX},
+        'app.core.celery.document_task.finalize_document': {'queue': QUEUE_INDEX},
+        'app.core.celery.history_task.index_message': {'queue': QUEUE_EMBED},
+        'app.core.celery.history_task.delete_messages': {'queue': QUEUE_INDEX},
+    },
+    task_default_priority=PRIORITY_DEFAULT,
+    task_inherit_parent_priority=True,
+    # Redis 按优先级拆分队列（每个优先级一个子队列），高优先级消息先被消费
+    broker_transport_options={
+        'queue_order_strategy': 'priority',
+        'priority_steps': list(range(PRIORITY_LOWEST + 1)),
+        'sep': ':',
+    },
 )
 
 # 修改任务发现方式
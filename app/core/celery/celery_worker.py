@@ -12,4 +12,7 @@ from app.core.celery.celery_app import celery_app
 if __name__ == '__main__':
     # 确保 app 目录在 Python 路径中
     sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-    celery_app.worker_main(argv=['worker', '--loglevel=info', '--pool=solo'])
\ No newline at end of file
+    # 执行池和并发数见 config_main.yaml 的 celery 配置（threads 池共享常驻事件循环）
+    # 额外参数透传给 worker，例如单独部署向量化 worker：celery_worker.py -Q document.embed -c 16
+    # 未指定 -Q 时消费 celery_app.task_queues 中的全部队列
+    celery_app.worker_main(argv=['worker', '--loglevel=info', *sys.argv[1:]])
\ No newline at end of file
@@ -1,89 +1,244 @@
-from typing import Dict, Any
-import asyncio
-from celery import Task
-from .celery_app import celery_app
-from app.api.v1.deps import get_db
+"""
+文档入库任务
+
+staged_ingestion（config_main.yaml 的 celery 配置）开启时，文档按阶段拆分为多个任务，
+分别路由到各自的队列（见 celery_app.task_routes），各阶段的 worker 可独立扩容：
+
+    process_document (document.parse)  解析、分块，与上次的分块清单比对
+      -> chord(
+           [embed_chunks (document.embed) -> index_chunks (document.index)] x N,
+           finalize_document (document.index)
+         )
+
+每个子任务处理 chunks_per_task 个新分块；finalize_document 删除已不存在的分块、
+更新分块清单和文档状态。process_document 被 chord 替换（Task.replace），chord 回调
+继承原任务 ID，因此控制器返回的 task_id 始终可用于查询进度和最终结果。
+
+子任务继承文档的优先级；子任务数超过 large_document_tasks 的大文档降低优先级，
+避免个人知识库的小文档排在几百页的企业文档之后。
+"""
+
+import time
+from typing import Dict, Any, List, Optional
+from celery import Task, chord
+from celery.exceptions import Ignore
+from .celery_app import celery_app, PRIORITY_DEFAULT, PRIORITY_LOWEST, TASK_TIME_LIMIT
+from .async_runtime import run_async
+from app.core.config import CONFIG as settings
+from app.core.langchain.rag_pipeline import RAGPipeline, ChunkManifest
 from app.db.session import AsyncSessionLocal
 from app.services.document_service import DocumentService
 from app.core.logger.logging_config_helper import get_configured_logger
 
 logger = get_configured_logger("pioneer_handler")
 
+# 大文档降低的优先级级数
+LARGE_DOCUMENT_PRIORITY_PENALTY = 3
+# 已完成子任务计数（用于进度）的过期时间
+PROGRESS_COUNTER_TTL = 24 * 3600
+
+
 class DocumentProcessTask(Task):
     """文档处理任务基类"""
     _db = None
-    
+
     def after_return(self, *args, **kwargs):
         """任务完成后关闭数据库连接"""
         if self._db is not None:
             self._db.close()
             self._db = None
 
+    def on_failure(self, exc, task_id, args, kwargs, einfo):
+        """任务失败时标记文档处理失败（子任务通过关键字参数传递 document_id）"""
+        document_id = kwargs.get('document_id') or (args[0] if args else None)
+        if document_id is None:
+            return
+
+        async def mark_failed():
+            async with AsyncSessionLocal() as db:
+                await DocumentService.mark_failed(db, document_id)
+
+        try:
+            run_async(mark_failed(), timeout=TASK_TIME_LIMIT)
+        except Exception as e:
+            logger.error(f"Failed to mark document {document_id} as failed: {e}")
+
+
 @celery_app.task(
     name='app.core.celery.document_task.process_document',
     base=DocumentProcessTask,
     bind=True
 )
-
 def process_document(self, document_id: int, user_id: int) -> Dict[str, Any]:
-    """处理文档任务"""
+    """处理文档任务（在 worker 的常驻事件循环中执行，见 async_runtime）"""
     try:
-        # 创建事件循环来运行异步代码
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        async def process():
-            try:
-                # 使用异步上下文管理器创建会话
-                async with AsyncSessionLocal() as db:
-                # db = await anext(get_db())
-                    # 获取文档信息
-                    document = await DocumentService.get_by_id(db, document_id)
-                    if not document:
-                        raise ValueError(f"Document {document_id} not found")
-                        
-                    # 获取文档设置
-                    settings = await DocumentService.get_document_settings(db, document_id)
-                    if not settings:
-                        raise ValueError(f"Document settings for {document_id} not found")
-                    
-                    # 更新任务进度 - 开始
-                    self.update_state(
-                        state='PROGRESS',
-                        meta={'progress': 10, 'status': 'Processing document...'}
-                    )
-                    
-                    # 处理文档
-                    chunks = await DocumentService.process_document(
-                        db=db,
-                        document_id=document_id
-                    )
-                    
-                    # 更新任务进度 - 完成
-                    self.update_state(
-                        state='PROGRESS',
-                        meta={'progress': 100, 'status': 'Document processed successfully'}
-                    )
-                    
-                    return {
-                        'status': 'success',
-                        'progress': 100,
-                        'document_id': document_id,
-                        'chunks_count': len(chunks) if chunks else 0
-                    }
-            except Exception as e:
-                logger.error(f"处理文档时出错: {e}", exc_info=True)
-                raise
-                
-        # 运行异步任务
-        result = loop.run_until_complete(process())
-        loop.close()
-        return result
-        
+        # 更新任务进度 - 开始（任务状态只能在任务线程中更新）
+        self.update_state(
+            state='PROGRESS',
+            meta={'progress': 10, 'status': 'Processing document...'}
+        )
+
+        # 解析和完成共用任务的超时时间
+        deadline = time.monotonic() + TASK_TIME_LIMIT
+        if settings.celery.staged_ingestion:
+            plan = run_async(_parse(document_id), timeout=TASK_TIME_LIMIT)
+            if plan['batches']:
+                return self.replace(_build_chord(self, document_id, plan))
+            # 没有需要向量化的分块（未修改或空文档），直接完成
+            result = run_async(_finalize(document_id, plan['chunks']), timeout=max(0.0, deadline - time.monotonic()))
+        else:
+            result = run_async(_process(document_id), timeout=TASK_TIME_LIMIT)
+
+        # 更新任务进度 - 完成
+        self.update_state(
+            state='PROGRESS',
+            meta={'progress': 100, 'status': 'Document processed successfully'}
+        )
+
+        return {
+            'status': 'success',
+            'progress': 100,
+            'document_id': document_id,
+            'chunks_count': result.get('chunks_stored', 0) if result else 0
+        }
+
+    except Ignore:
+        raise  # 已被 chord 替换
     except Exception as e:
         logger.error(f"处理文档任务失败: {e}", exc_info=True)
+        self.on_failure(e, self.request.id, (document_id, user_id), {}, None)
         return {
             'status': 'error',
             'error': str(e),
             'document_id': document_id
-        }
\ No newline at end of file
+        }
+
+
+@celery_app.task(
+    name='app.core.celery.document_task.embed_chunks',
+    base=DocumentProcessTask,
+    bind=True,
+    ignore_result=True  # 向量只传递给 index_chunks，不写入结果后端
+)
+def embed_chunks(
+    self,
+    document_id: int,
+    chunks: List[Dict[str, Any]],
+    file_path: str,
+    document_info: Dict[str, Any]
+) -> List[Dict[str, Any]]:
+    """向量化一批分块，返回待写入向量库的文档"""
+    pipeline = RAGPipeline(splitter_config={})
+    return run_async(pipeline.embed_chunks(chunks, file_path, document_info), timeout=TASK_TIME_LIMIT)
+
+
+@celery_app.task(
+    name='app.core.celery.document_task.index_chunks',
+    base=DocumentProcessTask,
+    bind=True
+)
+def index_chunks(self, docs: List[Dict[str, Any]], document_id: int, root_id: str, total: int) -> int:
+    """把一批向量写入向量库，并更新文档任务（root_id）的进度"""
+    run_async(RAGPipeline(splitter_config={}).vector_db_client.upload_documents(docs), timeout=TASK_TIME_LIMIT)
+
+    counter = f"document_task:progress:{root_id}"
+    client = self.backend.client
+    done = client.incr(counter)
+    client.expire(counter, PROGRESS_COUNTER_TTL)
+    self.update_state(
+        task_id=root_id,
+        state='PROGRESS',
+        meta={'progress': 10 + int(85 * done / total), 'status': f'Indexed {done}/{total} batches'}
+    )
+    return len(docs)
+
+
+@celery_app.task(
+    name='app.core.celery.document_task.finalize_document',
+    base=DocumentProcessTask,
+    bind=True
+)
+def finalize_document(self, results: List[int], document_id: int, chunks: Dict[str, str]) -> Dict[str, Any]:
+    """删除已不存在的分块，更新分块清单和文档状态（chord 回调，任务 ID 即文档任务 ID）"""
+    self.backend.client.delete(f"document_task:progress:{self.request.id}")
+    run_async(_finalize(document_id, chunks), timeout=TASK_TIME_LIMIT)
+    return {
+        'status': 'success',
+        'progress': 100,
+        'document_id': document_id,
+        'chunks_count': sum(results)
+    }
+
+
+def _build_chord(task: Task, document_id: int, plan: Dict[str, Any]):
+    """按文档优先级构建 embed -> index 子任务和 finalize 回调"""
+    priority = (task.request.delivery_info or {}).get('priority')
+    priority = PRIORITY_DEFAULT if priority is None else priority
+    total = len(plan['batches'])
+    if total > settings.celery.large_document_tasks:
+        priority = min(priority + LARGE_DOCUMENT_PRIORITY_PENALTY, PRIORITY_LOWEST)
+    logger.info(f"Document {document_id}: dispatching {total} embed/index tasks with priority {priority}.")
+
+    header = [
+        embed_chunks.si(
+            document_id=document_id,
+            chunks=batch,
+            file_path=plan['file_path'],
+            document_info=plan['document_info']
+        ).set(priority=priority)
+        | index_chunks.s(document_id=document_id, root_id=task.request.id, total=total).set(priority=priority)
+        for batch in plan['batches']
+    ]
+    body = finalize_document.s(document_id=document_id, chunks=plan['chunks']).set(priority=priority)
+    return chord(header, body)
+
+
+async def _parse(document_id: int) -> Dict[str, Any]:
+    """解析并分块，按 chunks_per_task 分批返回需要向量化的新分块和本次的分块清单"""
+    async with AsyncSessionLocal() as db:
+        document, chunk_config, document_info = await DocumentService.get_processing_context(db, document_id)
+        previous_chunks = await DocumentService.get_chunk_manifest(db, document_id)
+
+    pipeline = RAGPipeline(splitter_config=chunk_config)
+    manifest = ChunkManifest(document_id, previous_chunks)
+    size = max(1, settings.celery.chunks_per_task)
+    batches, batch = [], []
+    async for chunk in pipeline.iter_new_chunks(document.file_url, manifest):
+        batch.append(chunk)
+        if len(batch) >= size:
+            batches.append(batch)
+            batch = []
+    if batch:
+        batches.append(batch)
+    logger.info(
+        f"Document {document_id} parsed: {manifest.pages} pages, "
+        f"{sum(map(len, batches))} new chunks, {manifest.unchanged} unchanged."
+    )
+    return {
+        'file_path': document.file_url,
+        'document_info': document_info,
+        'batches': batches,
+        # 空文档不更新分块清单（与单任务流程一致）
+        'chunks': manifest.chunks if manifest.pages else None
+    }
+
+
+async def _finalize(document_id: int, chunks: Optional[Dict[str, str]]) -> Dict[str, Any]:
+    async with AsyncSessionLocal() as db:
+        document, _, _ = await DocumentService.get_processing_context(db, document_id)
+        previous_chunks = await DocumentService.get_chunk_manifest(db, document_id)
+        deleted = 0
+        if chunks is not None:
+            manifest = ChunkManifest(document_id, previous_chunks)
+            manifest.chunks = dict(chunks)
+            deleted = await RAGPipeline(splitter_config={}).delete_removed_chunks(manifest)
+            chunks = manifest.chunks
+        await DocumentService.complete_processing(db, document, previous_chunks, chunks)
+    return {'status': 'success', 'chunks_stored': 0, 'chunks_deleted': deleted}
+
+
+async def _process(document_id: int) -> Dict[str, Any]:
+    """单任务流程：在一个任务内完成解析、向量化和写入"""
+    async with AsyncSessionLocal() as db:
+        return await DocumentService.process_document(db=db, document_id=document_id)
+
@@ -0,0 +1,67 @@
+from typing import Dict, Any, List
+from sqlalchemy import select
+from .celery_app import celery_app, TASK_TIME_LIMIT
+from .async_runtime import run_async
+from app.core import retriever
+from app.core.embedding import get_embedding
+from app.db.models.conversation import ConversationModel
+from app.db.models.message import MessageModel
+from app.db.session import AsyncSessionLocal
+from app.services.history_search import build_document, vector_id
+from app.core.logger.logging_config_helper import get_configured_logger
+
+logger = get_configured_logger("pioneer_handler")
+
+
+async def _index_message(message_id: int) -> Dict[str, Any]:
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(
+                MessageModel.id, MessageModel.conversation_id, MessageModel.question,
+                MessageModel.content, ConversationModel.user_id
+            )
+            .join(ConversationModel, ConversationModel.id == MessageModel.conversation_id)
+            .filter(MessageModel.id == message_id)
+        )
+        message = result.first()
+    if message is None:
+        # 消息在任务执行前已被删除
+        return {'status': 'skipped', 'message_id': message_id}
+
+    embedding = await get_embedding(f"{message.question}\n{message.content or ''}")
+    await retriever.upload_documents([build_document(message, message.user_id, embedding)])
+    return {'status': 'success', 'message_id': message_id}
+
+
+@celery_app.task(
+    name='app.core.celery.history_task.index_message',
+    bind=True,
+    max_retries=3,
+    default_retry_delay=30
+)
+def index_message(self, message_id: int) -> Dict[str, Any]:
+    """把一条聊天消息向量化写入用户的历史检索站点（user_{id}_history）"""
+    try:
+        return run_async(_index_message(message_id), timeout=TASK_TIME_LIMIT)
+    except Exception as e:
+        logger.error(f"历史消息 {message_id} 向量化失败: {e}", exc_info=True)
+        raise self.retry(exc=e)
+
+
+@celery_app.task(
+    name='app.core.celery.history_task.delete_messages',
+    bind=True,
+    max_retries=3,
+    default_retry_delay=30
+)
+def delete_messages(self, message_ids: List[int]) -> Dict[str, Any]:
+    """删除已删除消息在历史检索站点中的向量"""
+    try:
+        deleted = run_async(
+            retriever.delete_documents_by_ids([vector_id(message_id) for message_id in message_ids]),
+            timeout=TASK_TIME_LIMIT
+        )
+        return {'status': 'success', 'deleted': deleted}
+    except Exception as e:
+        logger.error(f"删除 {len(message_ids)} 条历史消息向量失败: {e}", exc_info=True)
+        raise self.retry(exc=e)
@@ -0,0 +1,74 @@
+from typing import Dict, Any, List, Optional
+from .celery_app import celery_app, TASK_TIME_LIMIT
+from .async_runtime import run_async
+from app.core.config import CONFIG
+from app.core.llm_batch import get_job_store, create_batch_job, advance_batch_job
+from app.core.logger.logging_config_helper import get_configured_logger
+
+logger = get_configured_logger("pioneer_handler")
+
+
+@celery_app.task(
+    name='app.core.celery.llm_batch_task.run_llm_batch',
+    bind=True,
+    max_retries=None
+)
+def run_llm_batch(
+    self,
+    job_id: str,
+    prompts: Optional[List[str]] = None,
+    schema: Optional[Dict[str, Any]] = None,
+    provider: Optional[str] = None,
+    level: str = "low",
+    max_length: int = 512,
+    latency_tolerant: bool = True,
+    poll_errors: int = 0
+) -> Dict[str, Any]:
+    """
+    批量LLM推理任务
+
+    首次执行时创建批处理作业；厂商Batch API作业提交后通过重试定期轮询，
+    不占用worker等待。轮询失败（厂商 5xx、网络错误等）时同样稍后重试，连续失败
+    batch.max_poll_errors 次才放弃，避免已付费的厂商作业结果丢失。结果保存在本地
+    作业存储中，用 job_id 读取 (app.core.llm_batch.get_batch_results)。
+    """
+    store = get_job_store()
+    job = store.load(job_id)
+    if job is None:
+        if prompts is None or schema is None:
+            return {'status': 'error', 'error': f'Batch job {job_id} not found', 'job_id': job_id}
+        job = create_batch_job(
+            prompts, schema, provider=provider, level=level, max_length=max_length,
+            latency_tolerant=latency_tolerant, job_id=job_id
+        )
+
+    self.update_state(
+        state='PROGRESS',
+        meta={'job_id': job_id, 'mode': job.mode, 'done': len(job.results), 'total': len(job.prompts)}
+    )
+
+    try:
+        job = run_async(advance_batch_job(job), timeout=TASK_TIME_LIMIT)
+    except Exception as e:
+        if job.vendor_batch_id and poll_errors < CONFIG.llm_batch.max_poll_errors:
+            # 厂商作业已提交：稍后继续轮询，不放弃已提交的作业
+            logger.warning(f"批处理作业 {job_id} 轮询失败（第 {poll_errors + 1} 次），稍后重试: {e}")
+            raise self.retry(
+                args=(job_id,), kwargs={'poll_errors': poll_errors + 1}, countdown=CONFIG.llm_batch.poll_interval
+            )
+        logger.error(f"批处理作业 {job_id} 执行失败: {e}", exc_info=True)
+        return {'status': 'error', 'error': str(e), 'job_id': job_id}
+
+    if not job.done:
+        # 厂商批处理仍在进行中：稍后重试轮询（只传 job_id，避免重复发送提示词）
+        raise self.retry(args=(job_id,), kwargs={}, countdown=CONFIG.llm_batch.poll_interval)
+
+    return {
+        'status': 'success' if job.status == 'completed' else 'error',
+        'error': job.error,
+        'job_id': job_id,
+        'mode': job.mode,
+        'total': len(job.indices),
+        'unique': len(job.prompts),
+        'results_count': len(job.results)
+    }
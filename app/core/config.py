@@ -28,6 +28,67 @@ class ModelConfig:
     high: str
     low: str
 
+@dataclass
+class RateLimitConfig:
+    max_concurrency: int = 16  # Upper bound for in-flight requests
+    min_concurrency: int = 1  # Floor for the adaptive (AIMD) limit
+    initial_concurrency: Optional[int] = None  # Starting limit, defaults to max_concurrency
+    tokens_per_minute: Optional[int] = None  # Token budget per minute, None for unlimited
+    increase_step: float = 1.0  # Additive increase per window of successful calls
+    decrease_factor: float = 0.5  # Multiplicative decrease on 429/timeout
+    default_retry_after: float = 1.0  # Pause (seconds) on 429 without a Retry-After header
+    max_retries: int = 2  # Retries after a 429 before giving up
+
+@dataclass
+class HttpTransportConfig:
+    max_connections: int = 200  # Connections per origin (all providers sharing the host)
+    max_keepalive_connections: int = 50  # Idle connections kept open for reuse
+    keepalive_expiry: float = 30.0  # Seconds an idle connection is kept
+    http2: bool = True  # Multiplex requests over HTTP/2 (needs httpx[http2])
+    connect_timeout: float = 5.0
+    read_timeout: float = 60.0
+    write_timeout: float = 30.0
+    pool_timeout: float = 10.0  # Max wait for a free connection from the pool
+
+@dataclass
+class BatchConfig:
+    concurrency: int = 8  # Unique prompts in flight per batch when running online
+    vendor_min_prompts: int = 50  # Smallest batch worth sending to a vendor Batch API
+    poll_interval: float = 60.0  # Seconds between vendor batch status checks
+    max_poll_errors: int = 10  # Consecutive failed vendor batch polls before the task gives up
+    completion_window: str = "24h"  # Vendor batch completion window
+    job_dir: str = "llm_batch_jobs"  # Local job store (relative to the output/config directory)
+
+@dataclass
+class ReasoningConfig:
+    max_chars: int = 8000  # Reasoning kept per message (0 = unlimited); the middle is cut
+    head_chars: int = 2000  # Of max_chars, characters kept from the beginning (rest from the end)
+    list_preview_chars: int = 500  # Reasoning characters returned per message in list views (0 = omitted)
+
+@dataclass
+class ModelGroupConfig:
+    endpoints: List[str]  # LLM endpoints serving the same model, in preference order
+    hedge_enabled: bool = False  # Send a second request if the first is slower than usual
+    hedge_percentile: float = 0.95  # Latency percentile of the primary used as hedge delay
+    hedge_min_delay: float = 0.5  # Lower bound (seconds) for the hedge delay
+    hedge_max_delay: float = 5.0  # Upper bound (seconds) for the hedge delay
+    failure_cooldown: float = 30.0  # Seconds an endpoint is deprioritised after a failure
+
+@dataclass
+class LocalServerConfig:
+    url: str
+    server_type: str = "ollama"  # "ollama" or "llamacpp" (llama.cpp llama-server)
+    models: List[str] = field(default_factory=list)  # Models pinned (kept resident) on this server; empty = any
+    max_concurrency: int = 4  # Parallel slots: OLLAMA_NUM_PARALLEL / llama-server --parallel
+
+@dataclass
+class LocalPoolConfig:
+    servers: List[LocalServerConfig]
+    keep_alive: Any = -1  # Ollama keep_alive for pinned models (-1 = stay loaded)
+    num_ctx: Optional[int] = None  # Ollama context window (llama.cpp: set with -c at launch)
+    num_predict: Optional[int] = None  # Upper bound for generated tokens per request
+    failure_cooldown: float = 30.0  # Seconds a server is skipped after a connection failure
+
 @dataclass
 class LLMProviderConfig:
     llm_type: str
@@ -35,6 +96,8 @@ class LLMProviderConfig:
     models: Optional[ModelConfig] = None
     endpoint: Optional[str] = None
     api_version: Optional[str] = None
+    rate_limit: Optional[RateLimitConfig] = None
+    local_pool: Optional[LocalPoolConfig] = None
 
 @dataclass
 class EmbeddingProviderConfig:
@@ -141,6 +204,14 @@ class StorageBehaviorConfig:
     auto_migrate_on_login: bool = True
     max_migrate_conversations: int = 500
 
+@dataclass
+class MySQLPoolConfig:
+    size: int = 10  # Connections kept open per engine (per uvicorn worker process)
+    max_overflow: int = 20  # Extra connections opened under load beyond size
+    recycle: int = 3600  # Seconds before a connection is replaced (keep below MySQL wait_timeout)
+    timeout: float = 30.0  # Seconds to wait for a free connection before failing
+    pre_ping: bool = True  # Test connections on checkout
+
 @dataclass
 class MySQLConfig:
     host: str
@@ -149,6 +220,8 @@ class MySQLConfig:
     database: str
     password: Optional[str] = None
     uri: Optional[str] = None
+    pool: MySQLPoolConfig = field(default_factory=MySQLPoolConfig)
+    replica_uri: Optional[str] = None  # Read replica for list/detail queries (None = primary)
 
 @dataclass
 class RedisConfig:
@@ -156,6 +229,43 @@ class RedisConfig:
     port: int
     db: int
 
+@dataclass
+class MessageCacheConfig:
+    enabled: bool = True
+    max_messages: int = 50  # Most recent messages kept per conversation
+    ttl_seconds: int = 3600  # Idle conversations drop out of the cache after this
+
+@dataclass
+class HistorySearchConfig:
+    vector_enabled: bool = False  # Also embed messages into the vector store (site user_{id}_history)
+    candidates: int = 50  # Results taken from each ranker (full-text / vector) before fusion
+    rrf_k: int = 60  # Reciprocal rank fusion constant: score = sum(1 / (rrf_k + rank))
+
+@dataclass
+class IdempotencyConfig:
+    enabled: bool = True
+    ttl_seconds: int = 86400  # How long a completed result is replayed for duplicate keys
+    lock_ttl_seconds: int = 300  # Cross-worker execution lock expiry (covers a crashed worker)
+    wait_timeout_seconds: int = 300  # Max time a duplicate waits for the in-flight request
+    poll_interval_seconds: float = 0.25  # Result polling interval while another worker holds the lock
+
+@dataclass
+class IngestionConfig:
+    queue_size: int = 4  # Items buffered between pipeline stages (backpressure)
+    embed_batch_size: int = 32  # Chunks per embedding request
+    embed_concurrency: int = 2  # Embedding requests in flight at once
+    upload_batch_size: int = 128  # Chunks per vector store upload
+    parse_workers: int = 4  # Processes parsing documents (0 = parse on a thread in-process)
+    pdf_pages_per_task: int = 16  # PDF pages per parsing task
+
+@dataclass
+class CeleryWorkerConfig:
+    pool: str = "threads"  # Task threads share the worker's persistent event loop
+    concurrency: int = 8  # Tasks (e.g. document ingestion) run concurrently per worker
+    staged_ingestion: bool = True  # Parse / embed / index run as separate tasks on their own queues
+    chunks_per_task: int = 64  # Chunks embedded and indexed per subtask
+    large_document_tasks: int = 20  # Documents with more subtasks are demoted in priority
+
 @dataclass
 class UploadConfig:
     dir: str
@@ -295,13 +405,23 @@ class AppConfig:
             port=mysql_data.get("port", 3306),
             user=self._get_config_value(mysql_data.get("user_env"), mysql_data.get("user")),
             password=self._get_config_value(mysql_data.get("password_env")),
-            database=self._get_config_value(mysql_data.get("database_env"), mysql_data.get("database"))
+            database=self._get_config_value(mysql_data.get("database_env"), mysql_data.get("database")),
+            pool=MySQLPoolConfig(**(mysql_data.get("pool") or {}))
         )
         if self.mysql.user and self.mysql.password and self.mysql.host and self.mysql.database:
             self.mysql.uri = f"mysql+aiomysql://{self.mysql.user}:{self.mysql.password}@{self.mysql.host}:{self.mysql.port}/{self.mysql.database}"
         else:
             self.mysql.uri = None
 
+        # Optional read replica: same credentials and database as the primary unless overridden
+        replica_data = mysql_data.get("replica") or {}
+        replica_host = self._get_config_value(replica_data.get("host_env"), replica_data.get("host"))
+        if replica_host and self.mysql.uri:
+            replica_user = self._get_config_value(replica_data.get("user_env"), replica_data.get("user")) or self.mysql.user
+            replica_password = self._get_config_value(replica_data.get("password_env")) or self.mysql.password
+            replica_port = replica_data.get("port", self.mysql.port)
+            self.mysql.replica_uri = f"mysql+aiomysql://{replica_user}:{replica_password}@{replica_host}:{replica_port}/{self.mysql.database}"
+
         # Redis config
         redis_data = data.get("redis", {})
         self.redis = RedisConfig(
@@ -310,6 +430,21 @@ class AppConfig:
             db=redis_data.get("db", 0)
         )
 
+        # Write-through Redis cache of recent conversation messages
+        self.message_cache = MessageCacheConfig(**(data.get("message_cache") or {}))
+
+        # Search over a user's own chat history (MySQL FULLTEXT + optional vectors)
+        self.history_search = HistorySearchConfig(**(data.get("history_search") or {}))
+
+        # Idempotency-Key handling for message sends
+        self.idempotency = IdempotencyConfig(**(data.get("idempotency") or {}))
+
+        # Staged document ingestion pipeline
+        self.ingestion = IngestionConfig(**(data.get("ingestion") or {}))
+
+        # Celery worker execution pool
+        self.celery = CeleryWorkerConfig(**(data.get("celery") or {}))
+
         # Upload config
         upload_data = data.get("upload", {})
         upload_dir = self._resolve_path(upload_data.get("dir", "uploads"))
@@ -320,6 +455,9 @@ class AppConfig:
             allowed_extensions=upload_data.get("allowed_extensions", [])
         )
 
+        # Dedicated thread pools for blocking subsystems: {name: max_workers}
+        self.executors: Dict[str, int] = data.get("executors") or {}
+
         # Security config
         security_data = data.get("security", {})
         self.security = SecurityConfig(
@@ -338,6 +476,13 @@ class AppConfig:
             self.preferred_llm_endpoint: str = data["preferred_endpoint"]
             self.llm_endpoints: Dict[str, LLMProviderConfig] = {}
 
+            # Default rate limits, overridable per endpoint with a `rate_limit` block
+            rate_limit_defaults = data.get("rate_limit_defaults") or {}
+            self.llm_rate_limit_defaults = RateLimitConfig(**rate_limit_defaults)
+
+            # Shared HTTP transport (connection pool / keep-alive / HTTP/2) for all providers
+            self.llm_http_transport = HttpTransportConfig(**(data.get("http_transport") or {}))
+
             for name, cfg in data.get("endpoints", {}).items():
                 m = cfg.get("models", {})
                 models = ModelConfig(
@@ -350,15 +495,64 @@ class AppConfig:
                 api_endpoint = self._get_config_value(cfg.get("api_endpoint_env"))
                 api_version = self._get_config_value(cfg.get("api_version_env"))
                 llm_type = self._get_config_value(cfg.get("llm_type"))
+                rate_limit = RateLimitConfig(**{**rate_limit_defaults, **(cfg.get("rate_limit") or {})})
+                local_pool = self._parse_local_pool(cfg["local_pool"]) if cfg.get("local_pool") else None
                 # Create the LLM provider config - no longer include embedding model
                 self.llm_endpoints[name] = LLMProviderConfig(
                     llm_type=llm_type,
                     api_key=api_key,
                     models=models,
                     endpoint=api_endpoint,
-                    api_version=api_version
+                    api_version=api_version,
+                    rate_limit=rate_limit,
+                    local_pool=local_pool
+                )
+
+            # Batch inference (ask_llm_batch / Celery run_llm_batch)
+            batch_data = data.get("batch") or {}
+            self.llm_batch = BatchConfig(**batch_data)
+            self.llm_batch.job_dir = self._resolve_path(self.llm_batch.job_dir)
+
+            # Native reasoning capture: truncation of stored reasoning. Compression moved to
+            # app/db/reasoning_codec.py; its old keys are ignored so existing files still load.
+            reasoning_data = dict(data.get("reasoning") or {})
+            for key in ("compress_min_chars", "compression_level"):
+                reasoning_data.pop(key, None)
+            self.llm_reasoning = ReasoningConfig(**reasoning_data)
+
+            # Model groups: the same model served by several endpoints (routing/failover/hedging)
+            self.llm_model_groups: Dict[str, ModelGroupConfig] = {}
+            for name, cfg in (data.get("model_groups") or {}).items():
+                hedge = cfg.get("hedge") or {}
+                endpoints = [e for e in cfg.get("endpoints", []) if e in self.llm_endpoints]
+                if not endpoints:
+                    logger.warning(f"Model group {name} has no known endpoints, skipping")
+                    continue
+                self.llm_model_groups[name] = ModelGroupConfig(
+                    endpoints=endpoints,
+                    hedge_enabled=hedge.get("enabled", False),
+                    hedge_percentile=hedge.get("percentile", 0.95),
+                    hedge_min_delay=hedge.get("min_delay", 0.5),
+                    hedge_max_delay=hedge.get("max_delay", 5.0),
+                    failure_cooldown=cfg.get("failure_cooldown", 30.0)
                 )
 
+    def _parse_local_pool(self, data: Dict[str, Any]) -> LocalPoolConfig:
+        """Parse the `local_pool` block of an endpoint (local Ollama / llama.cpp servers)."""
+        servers = []
+        for server in data.get("servers") or []:
+            url = self._get_config_value(server.get("url"))
+            if not url:
+                continue
+            servers.append(LocalServerConfig(
+                url=url.rstrip("/"),
+                server_type=server.get("type", "ollama"),
+                models=list(server.get("models") or []),
+                max_concurrency=server.get("max_concurrency", 4)
+            ))
+        options = {k: v for k, v in data.items() if k != "servers"}
+        return LocalPoolConfig(servers=servers, **options)
+
     def load_embedding_config(self, path: str = "config_embedding.yaml"):
         """Load embedding model configuration."""
         # Build the full path to the config file using the config directory
@@ -105,15 +105,12 @@ async def get_gemini_embeddings(
             # Create embedding config
             config = types.EmbedContentConfig(task_type=task_type)
             
-            # Use asyncio.to_thread to make the synchronous GenAI call
-            # non-blocking
+            # Use the native async GenAI client (no worker thread needed)
             result = await asyncio.wait_for(
-                asyncio.to_thread(
-                    lambda: client.models.embed_content(
-                        model=model,
-                        contents=text,
-                        config=config
-                    )
+                client.aio.models.embed_content(
+                    model=model,
+                    contents=text,
+                    config=config
                 ),
                 timeout=timeout
             )
@@ -190,18 +187,15 @@ async def get_gemini_batch_embeddings(
     for i, text in enumerate(texts):
         logger.debug(f"Processing text {i+1}/{len(texts)}")
         
-        # Use asyncio.to_thread to make the synchronous GenAI call
-        # non-blocking
+        # Use the native async GenAI client (no worker thread needed)
         while True:
             try:
                 # Attempt to get the embedding
                 result = await asyncio.wait_for(
-                    asyncio.to_thread(
-                        lambda t=text: client.models.embed_content(
-                            model=model,
-                            contents=t,
-                            config=config
-                        )
+                    client.aio.models.embed_content(
+                        model=model,
+                        contents=text,
+                        config=config
                     ),
                     timeout=timeout
                 )
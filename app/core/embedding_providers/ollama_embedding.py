@@ -13,7 +13,8 @@ import asyncio
 import threading
 from typing import List, Optional
 from ollama import AsyncClient
-from core.config import CONFIG
+from app.core.config import CONFIG
+from app.core.llm_providers.local_pool import get_pool_for_model
 
 from app.core.logger.logging_config_helper import get_configured_logger, LogLevel
 
@@ -74,8 +75,6 @@ async def get_ollama_embedding(
     Returns:
         List of floats representing the embedding vector
     """
-    client = get_ollama_client()
-
     # If model is not provided, get from config
     if model is None:
         provider_config = CONFIG.get_embedding_provider("ollama")
@@ -89,6 +88,13 @@ async def get_ollama_embedding(
     logger.debug(f"Text length: {len(text)} chars")
 
     try:
+        pool = get_pool_for_model(model)
+        if pool is not None:
+            # The embedding model is pinned to its own local server(s)
+            embeddings = await asyncio.wait_for(pool.embed(model, [text]), timeout=timeout)
+            return embeddings[0]
+
+        client = get_ollama_client()
         response = await asyncio.wait_for(
             client.embed(input=text, model=model), timeout=timeout
         )
@@ -126,8 +132,6 @@ async def get_ollama_batch_embeddings(
     Returns:
         List of embedding vectors, each a list of floats
     """
-    client = get_ollama_client()
-
     # If model is not provided, get from config
     if model is None:
         provider_config = CONFIG.get_embedding_provider("ollama")
@@ -141,6 +145,12 @@ async def get_ollama_batch_embeddings(
     logger.debug(f"Batch size: {len(texts)} texts")
 
     try:
+        pool = get_pool_for_model(model)
+        if pool is not None:
+            # The embedding model is pinned to its own local server(s)
+            return await asyncio.wait_for(pool.embed(model, texts), timeout=timeout)
+
+        client = get_ollama_client()
         response = await asyncio.wait_for(
             client.embed(input=texts, model=model), timeout=timeout
         )
@@ -0,0 +1,96 @@
+"""
+Dedicated, bounded thread pools for blocking subsystems.
+
+``asyncio.to_thread`` and ``run_in_executor(None, ...)`` all share the loop's default
+executor, so one slow subsystem (e.g. a vendor SDK under load) can starve every other
+blocking call. Each subsystem here gets its own ``ThreadPoolExecutor`` sized from the
+``executors`` block in config_main.yaml, and ``run_blocking`` publishes queue depth,
+active workers and queue wait time through ``app.core.metrics``.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+from app.core import metrics
+from app.core.config import CONFIG
+from app.core.logger.logging_config_helper import get_configured_logger
+
+logger = get_configured_logger("executors")
+
+# Worker count for subsystems without an entry in config_main.yaml
+DEFAULT_MAX_WORKERS = 8
+
+_executors: Dict[str, ThreadPoolExecutor] = {}
+_queued: Dict[str, int] = {}
+_active: Dict[str, int] = {}
+_lock = threading.Lock()
+
+
+def _max_workers(name: str) -> int:
+    sizes = getattr(CONFIG, "executors", None) or {}
+    return max(1, int(sizes.get(name, sizes.get("default", DEFAULT_MAX_WORKERS))))
+
+
+def get_executor(name: str) -> ThreadPoolExecutor:
+    """Return the executor dedicated to a subsystem, creating it on first use."""
+    with _lock:
+        executor = _executors.get(name)
+        if executor is None:
+            workers = _max_workers(name)
+            executor = _executors[name] = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"{name}-")
+            _queued[name] = 0
+            _active[name] = 0
+            logger.info(f"Created executor '{name}' with {workers} workers")
+    return executor
+
+
+def _publish(name: str) -> None:
+    metrics.set_gauge("executor.queue_depth", _queued[name], {"executor": name})
+    metrics.set_gauge("executor.active", _active[name], {"executor": name})
+
+
+async def run_blocking(name: str, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run a blocking callable on the subsystem's executor without blocking the event loop."""
+    executor = get_executor(name)
+    submitted = time.monotonic()
+
+    def task():
+        with _lock:
+            _queued[name] -= 1
+            _active[name] += 1
+            _publish(name)
+        metrics.observe("executor.queue_wait_seconds", time.monotonic() - submitted, {"executor": name})
+        try:
+            return func(*args, **kwargs)
+        finally:
+            with _lock:
+                _active[name] -= 1
+                _publish(name)
+
+    with _lock:
+        _queued[name] += 1
+        _publish(name)
+    future = executor.submit(task)
+    try:
+        return await asyncio.wrap_future(future)
+    except asyncio.CancelledError:
+        # Drop work that has not started yet so it doesn't inflate the queue
+        if future.cancel():
+            with _lock:
+                _queued[name] -= 1
+                _publish(name)
+        raise
+
+
+def shutdown_all(wait: bool = False) -> None:
+    """Shut down every executor (application shutdown)."""
+    with _lock:
+        executors = list(_executors.items())
+        _executors.clear()
+    for name, executor in executors:
+        executor.shutdown(wait=wait, cancel_futures=True)
+    if executors:
+        logger.info(f"Shut down {len(executors)} executor(s)")
@@ -0,0 +1,97 @@
+"""
+Shared HTTP transport for LLM providers.
+
+One tuned ``httpx.AsyncClient`` is kept per origin (scheme://host:port) and handed to
+every SDK client (``http_client=``) and raw-HTTP provider talking to that origin, so
+connections, TLS sessions and HTTP/2 streams are reused instead of being set up per
+provider or per call. Pool limits, keep-alive and HTTP/2 come from the
+``http_transport`` block in config_llm.yaml. Clients are closed in the FastAPI
+lifespan via ``aclose_all``.
+"""
+
+import importlib.util
+import threading
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from app.core.config import CONFIG, HttpTransportConfig
+from app.core.logger.logging_config_helper import get_configured_logger
+
+logger = get_configured_logger("http_transport")
+
+_clients: Dict[str, httpx.AsyncClient] = {}
+_clients_lock = threading.Lock()
+_http2_available: Optional[bool] = None
+
+
+def _origin(url: str) -> str:
+    """Normalise a URL to its origin, the unit connections can be shared across."""
+    parts = urlsplit(url.strip().strip('"'))
+    if not parts.scheme or not parts.netloc:
+        raise ValueError(f"Invalid base URL for HTTP transport: {url!r}")
+    return f"{parts.scheme.lower()}://{parts.netloc.lower()}"
+
+
+def _http2_enabled(config: HttpTransportConfig) -> bool:
+    """HTTP/2 needs the optional ``h2`` package (httpx[http2]); fall back to HTTP/1.1 without it."""
+    global _http2_available
+    if not config.http2:
+        return False
+    if _http2_available is None:
+        _http2_available = importlib.util.find_spec("h2") is not None
+        if not _http2_available:
+            logger.warning("HTTP/2 requested but the 'h2' package is not installed; using HTTP/1.1")
+    return _http2_available
+
+
+def _build_client(origin: str, config: HttpTransportConfig) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        http2=_http2_enabled(config),
+        limits=httpx.Limits(
+            max_connections=config.max_connections,
+            max_keepalive_connections=config.max_keepalive_connections,
+            keepalive_expiry=config.keepalive_expiry,
+        ),
+        timeout=httpx.Timeout(
+            config.read_timeout,
+            connect=config.connect_timeout,
+            write=config.write_timeout,
+            pool=config.pool_timeout,
+        ),
+        follow_redirects=True,
+    )
+
+
+def get_http_client(base_url: str) -> httpx.AsyncClient:
+    """
+    Return the shared client for the origin of ``base_url``, creating it on first use.
+
+    Per-request timeouts passed by callers (or SDK clients) override the defaults.
+    """
+    origin = _origin(base_url)
+    with _clients_lock:
+        client = _clients.get(origin)
+        if client is None or client.is_closed:
+            config = getattr(CONFIG, "llm_http_transport", None) or HttpTransportConfig()
+            client = _clients[origin] = _build_client(origin, config)
+            logger.info(
+                f"Created shared HTTP client for {origin} (http2={_http2_enabled(config)}, "
+                f"max_connections={config.max_connections})"
+            )
+    return client
+
+
+async def aclose_all() -> None:
+    """Close every shared client (application shutdown)."""
+    with _clients_lock:
+        clients = list(_clients.items())
+        _clients.clear()
+    for origin, client in clients:
+        try:
+            await client.aclose()
+        except Exception as e:
+            logger.warning(f"Error closing HTTP client for {origin}: {e}")
+    if clients:
+        logger.info(f"Closed {len(clients)} shared HTTP client(s)")
@@ -1,5 +1,5 @@
 from pathlib import Path
-from typing import List
+from typing import Iterator, List
 from langchain.schema import Document
 from langchain_community.document_loaders import (
     PyPDFLoader,
@@ -68,3 +68,19 @@ class DocumentLoaderFactory:
         except Exception as e:
             logger.error(f"Failed to load document {file_path}: {e}", exc_info=True)
             raise
+
+    @classmethod
+    def lazy_load_documents(cls, file_path: str) -> Iterator[Document]:
+        """
+        Lazily loads a document page by page (e.g. one Document per PDF page), so
+        callers can process large files without holding every page in memory.
+        Loaders without native lazy loading fall back to loading the whole file.
+
+        Args:
+            file_path: The path to the document.
+
+        Returns:
+            An iterator of LangChain Document objects.
+        """
+        logger.info(f"Lazily loading document from: {file_path}")
+        return cls.get_loader(file_path).lazy_load()
@@ -1,4 +1,5 @@
 from typing import List, Dict, Any
+from langchain.schema import Document
 from langchain.text_splitter import (
     RecursiveCharacterTextSplitter,
     MarkdownHeaderTextSplitter,
@@ -60,3 +61,25 @@ class DocumentSplitterFactory:
                 separators=DEFAULT_SEPARATORS,
                 length_function=len,
             )
+
+    @staticmethod
+    def split_document(splitter, document: Document) -> List[Document]:
+        """
+        Splits a single document (e.g. one page) with the given splitter.
+
+        MarkdownHeaderTextSplitter only splits raw text, so its chunks are given the
+        source document's metadata merged with the header metadata.
+
+        Args:
+            splitter: A splitter returned by get_splitter.
+            document: The document to split.
+
+        Returns:
+            A list of chunk Documents.
+        """
+        if isinstance(splitter, MarkdownHeaderTextSplitter):
+            return [
+                Document(page_content=chunk.page_content, metadata={**document.metadata, **chunk.metadata})
+                for chunk in splitter.split_text(document.page_content)
+            ]
+        return splitter.split_documents([document])
@@ -0,0 +1,144 @@
+"""
+Process pool for CPU-heavy document parsing.
+
+PDF text extraction (pypdf) and the unstructured Markdown/HTML loaders are pure-Python
+CPU work: run inline they block the event loop, and on a thread they still hold the
+GIL, so a large report parses on one core. Here parsing runs in a ``ProcessPoolExecutor``
+sized from ``ingestion.parse_workers``:
+
+- PDFs are split into page ranges (``ingestion.pdf_pages_per_task``) parsed in parallel;
+  at most two ranges per worker are in flight and pages are yielded in order, so memory
+  stays bounded for large files
+- other CPU-heavy formats are parsed whole in a worker process, off the event loop
+
+Only plain text and metadata cross the process boundary. With ``parse_workers: 0``, or
+inside a daemonic process that cannot have children (e.g. a Celery prefork worker),
+documents are loaded lazily on the ``document_loader`` thread executor instead.
+"""
+
+import asyncio
+import multiprocessing
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from langchain.schema import Document
+
+from app.core.config import CONFIG
+from app.core.executors import run_blocking
+from app.core.langchain.document_loader import DocumentLoaderFactory
+from app.core.logger.logging_config_helper import get_configured_logger
+
+logger = get_configured_logger(__name__)
+
+# Formats parsed in a worker process; the rest (plain text, docx) are cheap to load
+_PROCESS_SUFFIXES = {".md", ".markdown", ".html", ".htm"}
+
+_pool: Optional[ProcessPoolExecutor] = None
+_lock = threading.Lock()
+
+ParsedPage = Tuple[str, Dict[str, Any]]
+
+
+def _parse_pdf_pages(file_path: str, start: int, stop: int) -> List[ParsedPage]:
+    """Worker: extract text from pages [start, stop) (same output as PyPDFLoader)."""
+    import pypdf
+
+    reader = pypdf.PdfReader(file_path)
+    return [
+        (reader.pages[number].extract_text(), {"source": file_path, "page": number})
+        for number in range(start, stop)
+    ]
+
+
+def _parse_file(file_path: str) -> List[ParsedPage]:
+    """Worker: load a whole file with its LangChain loader."""
+    return [(doc.page_content, doc.metadata) for doc in DocumentLoaderFactory.load_documents(file_path)]
+
+
+def _pdf_page_count(file_path: str) -> int:
+    import pypdf
+
+    return len(pypdf.PdfReader(file_path).pages)
+
+
+def get_parsing_pool() -> Optional[ProcessPoolExecutor]:
+    """Return the process-wide parsing pool, or None when parsing must stay in-process."""
+    global _pool
+    workers = CONFIG.ingestion.parse_workers
+    if workers <= 0:
+        return None
+    if multiprocessing.current_process().daemon:
+        # multiprocessing forbids children of daemonic processes (Celery prefork workers)
+        return None
+    with _lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            logger.info(f"Created document parsing pool with {workers} processes")
+    return _pool
+
+
+async def iter_documents(file_path: str) -> AsyncIterator[Document]:
+    """Yield a file's documents (one per PDF page) in order without blocking the event loop."""
+    pool = get_parsing_pool()
+    suffix = Path(file_path).suffix.lower()
+    if pool is not None and suffix == ".pdf":
+        source = _iter_pdf(pool, file_path)
+    elif pool is not None and suffix in _PROCESS_SUFFIXES:
+        source = _iter_file(pool, file_path)
+    else:
+        source = _iter_lazy(file_path)
+    async for document in source:
+        yield document
+
+
+async def _iter_pdf(pool: ProcessPoolExecutor, file_path: str) -> AsyncIterator[Document]:
+    total = await run_blocking("document_loader", _pdf_page_count, file_path)
+    size = max(1, CONFIG.ingestion.pdf_pages_per_task)
+    starts = iter(range(0, total, size))
+    loop = asyncio.get_running_loop()
+    in_flight: deque = deque()
+
+    def submit() -> None:
+        start = next(starts, None)
+        if start is not None:
+            in_flight.append(loop.run_in_executor(pool, _parse_pdf_pages, file_path, start, min(start + size, total)))
+
+    for _ in range(2 * CONFIG.ingestion.parse_workers):
+        submit()
+    logger.info(f"Parsing {total} PDF pages of {file_path} in ranges of {size}")
+    try:
+        while in_flight:
+            pages = await in_flight.popleft()
+            submit()
+            for text, metadata in pages:
+                yield Document(page_content=text, metadata=metadata)
+    finally:
+        for future in in_flight:
+            future.cancel()
+
+
+async def _iter_file(pool: ProcessPoolExecutor, file_path: str) -> AsyncIterator[Document]:
+    pages = await asyncio.get_running_loop().run_in_executor(pool, _parse_file, file_path)
+    for text, metadata in pages:
+        yield Document(page_content=text, metadata=metadata)
+
+
+async def _iter_lazy(file_path: str) -> AsyncIterator[Document]:
+    iterator = DocumentLoaderFactory.lazy_load_documents(file_path)
+    while True:
+        document = await run_blocking("document_loader", next, iterator, None)
+        if document is None:
+            break
+        yield document
+
+
+def shutdown(wait: bool = False) -> None:
+    """Shut down the parsing pool (application shutdown)."""
+    global _pool
+    with _lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=wait, cancel_futures=True)
@@ -1,14 +1,29 @@
-from typing import List, Dict, Any, Optional, Callable
+from typing import List, Dict, Any, Optional, Callable, Awaitable, AsyncIterator
+import asyncio
+import hashlib
 import json
 from langchain.schema import Document
-from app.core.langchain.document_loader import DocumentLoaderFactory
 from app.core.langchain.document_splitter import DocumentSplitterFactory
 from app.core.langchain.embedding_provider import CustomEmbeddings
 from app.core.retriever import get_vector_db_client
+from app.core.config import CONFIG
+from app.core.langchain import parsing_pool
 from app.core.logger.logging_config_helper import get_configured_logger
 
 logger = get_configured_logger(__name__)
 
+# End-of-stream marker passed between pipeline stages
+_DONE = object()
+
+# Legacy positional vector ids {document_id}_{i} deleted on a document's first incremental run
+LEGACY_MIN_IDS = 1000
+LEGACY_HASH_PREFIX = "legacy:"
+
+
+def chunk_hash(content: str) -> str:
+    """Content hash identifying a chunk across re-indexing runs."""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
 class RAGPipeline:
     """
     A pipeline for processing documents for Retrieval-Augmented Generation (RAG).
@@ -34,81 +49,282 @@ class RAGPipeline:
         self, 
         file_path: str, 
         document_info: Dict[str, Any],
-        progress_callback: Optional[Callable[[str, float], None]] = None
+        progress_callback: Optional[Callable[[str, float], None]] = None,
+        previous_chunks: Optional[Dict[str, str]] = None
     ) -> Dict[str, Any]:
         """
         Processes a single file through the entire pipeline and stores it in the vector DB.
 
+        The file is streamed through concurrent stages connected by bounded queues
+        (see the ``ingestion`` config block):
+
+            load pages -> split -> embed micro-batches -> upload batches
+
+        Each queue holds at most ``queue_size`` items, so a fast stage waits for a slow
+        one instead of buffering the whole document; memory stays constant in the file
+        size and page parsing, embedding and uploading overlap. Chunks never span pages.
+
+        Indexing is incremental (see ChunkManifest): chunks whose content hash is already in
+        ``previous_chunks`` are neither embedded nor uploaded, and vectors of chunks that
+        disappeared are deleted after the new ones are uploaded.
+
         Args:
             file_path: The path to the file to process.
             document_info: A dictionary with details about the document (id, name, category_id, user_id).
             progress_callback: An async function to call with progress updates (status, percentage).
+                Percentages follow the chunks actually stored; the total is only known once the
+                whole file has been split, so until then progress is capped at 50%.
+            previous_chunks: Manifest of the chunks already in the vector DB (content hash -> vector id).
 
         Returns:
-            A dictionary containing the status and the number of stored chunks.
+            A dictionary containing the status, chunk counts (stored, unchanged, deleted) and
+            ``chunks``, the new manifest (content hash -> vector id). Vectors that could not be
+            deleted stay in the manifest so the next run retries.
         """
         logger.info(f"Starting RAG pipeline for file: {file_path}")
+        config = CONFIG.ingestion
+        manifest = ChunkManifest(document_info["id"], previous_chunks)
+        pages: asyncio.Queue = asyncio.Queue(maxsize=config.queue_size)
+        batches: asyncio.Queue = asyncio.Queue(maxsize=config.queue_size)
+        uploads: asyncio.Queue = asyncio.Queue(maxsize=config.queue_size)
+        state = {"chunks": 0, "stored": 0, "split_done": False, "progress": 0.0}
 
-        # 1. Load Document
-        if progress_callback: await progress_callback("loading", 0.1)
-        try:
-            documents = DocumentLoaderFactory.load_documents(file_path)
-            if not documents:
-                logger.warning(f"No documents were loaded from {file_path}.")
-                return {"status": "failed", "message": "No content loaded from document."}
-        except Exception as e:
-            logger.error(f"Failed to load document: {e}")
-            raise
+        async def report(status: str, progress: float):
+            if progress_callback and progress > state["progress"]:
+                state["progress"] = progress
+                await progress_callback(status, progress)
 
-        # 2. Split Document
-        if progress_callback: await progress_callback("splitting", 0.3)
-        try:
+        async def load_stage():
+            # Parsing runs on the process pool (PDF page ranges in parallel) or a thread executor
+            async for page in parsing_pool.iter_documents(file_path):
+                manifest.pages += 1
+                await pages.put(page)
+            await pages.put(_DONE)
+
+        async def split_stage():
             splitter = DocumentSplitterFactory.get_splitter(self.splitter_config)
-            chunks = splitter.split_documents(documents)
-            logger.info(f"Split document into {len(chunks)} chunks.")
-        except Exception as e:
-            logger.error(f"Failed to split document: {e}")
-            raise
+            batch = []
+            while (page := await pages.get()) is not _DONE:
+                for chunk in self.new_chunks(splitter, page, manifest):
+                    batch.append(chunk)
+                    state["chunks"] += 1
+                    if len(batch) >= config.embed_batch_size:
+                        await batches.put(batch)
+                        batch = []
+            if batch:
+                await batches.put(batch)
+            state["split_done"] = True
+            for _ in range(config.embed_concurrency):
+                await batches.put(_DONE)
+
+        async def embed_stage():
+            while (batch := await batches.get()) is not _DONE:
+                await uploads.put(await self.embed_chunks(batch, file_path, document_info))
+            await uploads.put(_DONE)
 
-        # 3. Embed Chunks
-        if progress_callback: await progress_callback("embedding", 0.6)
+        async def upload_stage():
+            pending: List[Dict[str, Any]] = []
+            finished = 0
+
+            async def flush():
+                batch = pending[:config.upload_batch_size]
+                await self.vector_db_client.upload_documents(batch)
+                state["stored"] += len(batch)
+                del pending[:len(batch)]
+                fraction = state["stored"] / max(state["chunks"], 1)
+                await report("storing", fraction if state["split_done"] else min(fraction, 1.0) * 0.5)
+
+            while finished < config.embed_concurrency:
+                docs = await uploads.get()
+                if docs is _DONE:
+                    finished += 1
+                    continue
+                pending.extend(docs)
+                while len(pending) >= config.upload_batch_size:
+                    await flush()
+            while pending:
+                await flush()
+
+        if progress_callback: await progress_callback("processing", 0.0)
         try:
-            chunk_texts = [chunk.page_content for chunk in chunks]
-            chunk_embeddings = await self.embeddings.aembed_documents(chunk_texts)
-            logger.info(f"Successfully created embeddings for {len(chunk_embeddings)} chunks.")
+            await _run_stages(
+                load_stage(), split_stage(),
+                *(embed_stage() for _ in range(config.embed_concurrency)),
+                upload_stage()
+            )
         except Exception as e:
-            logger.error(f"Failed to embed document chunks: {e}")
+            logger.error(f"Failed to process file {file_path} after storing {state['stored']} chunks: {e}")
             raise
 
-        if len(chunks) != len(chunk_embeddings):
+        if not manifest.pages:
+            logger.warning(f"No documents were loaded from {file_path}.")
+            return {"status": "failed", "message": "No content loaded from document."}
+
+        deleted = await self.delete_removed_chunks(manifest)
+
+        if progress_callback: await progress_callback("completed", 1.0)
+        logger.info(f"Successfully processed and stored file {file_path}: {manifest.pages} pages, {state['stored']} chunks stored, {deleted} removed.")
+        return {
+            "status": "success",
+            "chunks_stored": state["stored"],
+            "chunks_unchanged": manifest.unchanged,
+            "chunks_deleted": deleted,
+            "chunks": manifest.chunks
+        }
+
+    async def iter_new_chunks(self, file_path: str, manifest: "ChunkManifest") -> AsyncIterator[Dict[str, Any]]:
+        """
+        Parses and splits a file, yielding only the chunks that are not in the previous manifest.
+
+        Args:
+            file_path: The path to the file to process.
+            manifest: The manifest of this indexing run (records every chunk seen).
+
+        Returns:
+            An async iterator of chunks ({"id", "content", "metadata"}).
+        """
+        splitter = DocumentSplitterFactory.get_splitter(self.splitter_config)
+        async for page in parsing_pool.iter_documents(file_path):
+            manifest.pages += 1
+            for chunk in self.new_chunks(splitter, page, manifest):
+                yield chunk
+
+    @staticmethod
+    def new_chunks(splitter, page: Document, manifest: "ChunkManifest") -> List[Dict[str, Any]]:
+        """Splits a page and returns the chunks that need to be embedded ({"id", "content", "metadata"})."""
+        chunks = []
+        for chunk in DocumentSplitterFactory.split_document(splitter, page):
+            vector_id = manifest.add(chunk.page_content)
+            if vector_id is not None:
+                chunks.append({"id": vector_id, "content": chunk.page_content, "metadata": chunk.metadata})
+        return chunks
+
+    async def embed_chunks(
+        self,
+        chunks: List[Dict[str, Any]],
+        file_path: str,
+        document_info: Dict[str, Any]
+    ) -> List[Dict[str, Any]]:
+        """
+        Embeds a batch of chunks and formats them for storage in the vector DB.
+
+        Args:
+            chunks: Chunks as produced by new_chunks ({"id", "content", "metadata"}).
+            file_path: The path of the source file (stored as the document url).
+            document_info: A dictionary with details about the document (id, name, category_id, user_id).
+
+        Returns:
+            The documents to upload, one per chunk.
+        """
+        embeddings = await self.embeddings.aembed_documents([chunk["content"] for chunk in chunks])
+        if len(embeddings) != len(chunks):
             logger.error("Mismatch between number of chunks and number of embeddings.")
             raise ValueError("The number of chunks and embeddings must be the same.")
-
-        # 4. Format for storage
-        docs_to_upload = []
-        for i, chunk in enumerate(chunks):
-            doc_to_upload = {
-                "id": f"{document_info['id']}_{i}",
+        site = self.site_for(document_info)
+        return [
+            {
+                "id": chunk["id"],
                 "url": file_path,
                 "name": document_info.get('name', ''),
-                "site": f"category_{document_info['category_id']}" if document_info.get('category_id') else f"user_{document_info['user_id']}",
+                "site": site,
                 "schema_json": json.dumps({
-                    "content": chunk.page_content,
-                    "metadata": chunk.metadata,
+                    "content": chunk["content"],
+                    "metadata": chunk["metadata"],
                 }),
-                "embedding": chunk_embeddings[i],
+                "embedding": embedding,
             }
-            docs_to_upload.append(doc_to_upload)
+            for chunk, embedding in zip(chunks, embeddings)
+        ]
+
+    async def delete_removed_chunks(self, manifest: "ChunkManifest") -> int:
+        """
+        Deletes the vectors of chunks that are no longer in the document, and on the first
+        incremental run the vectors stored under legacy positional ids. Vectors that could
+        not be deleted are kept in the manifest so the next run retries.
 
-        # 5. Store in Vector DB
-        if progress_callback: await progress_callback("storing", 0.9)
+        Returns:
+            The number of deleted vectors (legacy ids not included).
+        """
+        legacy = manifest.legacy_chunks()
+        if legacy:
+            await self._delete_stale(manifest, legacy)
+        removed = manifest.removed()
+        if not removed:
+            return 0
+        return await self._delete_stale(manifest, removed)
+
+    async def _delete_stale(self, manifest: "ChunkManifest", stale: Dict[str, str]) -> int:
         try:
-            await self.vector_db_client.upload_documents(docs_to_upload)
-            logger.info(f"Successfully stored {len(docs_to_upload)} chunks in vector database.")
+            return await self.vector_db_client.delete_documents_by_ids(list(stale.values()))
         except Exception as e:
-            logger.error(f"Failed to store chunks in vector database: {e}")
-            raise
+            logger.warning(f"Failed to delete {len(stale)} stale chunks of document {manifest.document_id}, keeping them for the next run: {e}")
+            manifest.chunks.update(stale)
+            return 0
 
-        if progress_callback: await progress_callback("completed", 1.0)
-        logger.info(f"Successfully processed and stored file {file_path}.")
-        return {"status": "success", "chunks_stored": len(docs_to_upload)}
+    @staticmethod
+    def site_for(document_info: Dict[str, Any]) -> str:
+        """Vector DB site of a document: its category, or the owner's personal knowledge base."""
+        if document_info.get('category_id'):
+            return f"category_{document_info['category_id']}"
+        return f"user_{document_info['user_id']}"
+
+
+class ChunkManifest:
+    """
+    Content-hash manifest of one indexing run, diffed against the previous run's.
+
+    Every chunk is identified by the SHA-256 of its content and stored under the vector id
+    ``{document_id}_{hash[:32]}``, so re-uploading a chunk is an idempotent upsert. Repeated
+    content within a document is stored once; unchanged chunks keep the metadata (e.g. page
+    number) they were first stored with.
+    """
+
+    def __init__(self, document_id: int, previous: Optional[Dict[str, str]] = None):
+        self.document_id = document_id
+        self.previous = previous or {}
+        self.chunks: Dict[str, str] = {}  # content hash -> vector id
+        self.unchanged = 0
+        self.pages = 0
+
+    def add(self, content: str) -> Optional[str]:
+        """Records a chunk; returns its vector id if it must be embedded, None if already stored."""
+        content_hash = chunk_hash(content)
+        if content_hash in self.chunks:
+            return None
+        if content_hash in self.previous:
+            self.chunks[content_hash] = self.previous[content_hash]
+            self.unchanged += 1
+            return None
+        vector_id = self.chunks[content_hash] = f"{self.document_id}_{content_hash[:32]}"
+        return vector_id
+
+    def removed(self) -> Dict[str, str]:
+        """Chunks of the previous run that are no longer in the document."""
+        return {h: v for h, v in self.previous.items() if h not in self.chunks}
+
+    def legacy_chunks(self) -> Dict[str, str]:
+        """
+        Vectors stored before manifests existed, under positional ids ``{document_id}_{i}``.
+
+        Only returned when there is no previous manifest (the first incremental run). The old
+        chunk count was not recorded, so ids up to twice the current chunk count (at least
+        LEGACY_MIN_IDS) are deleted; deleting ids that do not exist is a no-op. Keys are
+        pseudo hashes, so ids that fail to delete are kept in the manifest and retried.
+        """
+        if self.previous:
+            return {}
+        count = max(LEGACY_MIN_IDS, 2 * len(self.chunks))
+        return {f"{LEGACY_HASH_PREFIX}{i}": f"{self.document_id}_{i}" for i in range(count)}
+
+
+async def _run_stages(*stages: Awaitable[None]) -> None:
+    """Runs pipeline stages concurrently; the first failure cancels the others and is re-raised."""
+    tasks = [asyncio.ensure_future(stage) for stage in stages]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        for task in done:
+            if task.exception() is not None:
+                raise task.exception()
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -9,8 +9,13 @@ Backwards compatibility is not guaranteed at this time.
 
 """
 
-from typing import Optional, Dict, Any
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, Tuple
 from app.core.config import CONFIG
+from app.core.llm_limiter import run_limited, estimate_tokens, RateLimitedError
+from app.core.llm_router import get_router, AllEndpointsFailedError
+from app.core.prompts import get_prompt
+from app.core.reasoning import truncate_reasoning
 import asyncio
 import threading
 import subprocess
@@ -23,6 +28,10 @@ logger = get_configured_logger("llm_wrapper")
 # Cache for loaded providers
 _loaded_providers = {}
 
+# Providers resolved from database LLM configurations (ai_llm_configuration), keyed by config id
+_config_providers: Dict[int, "ConfigProvider"] = {}
+_config_providers_lock = threading.Lock()
+
 def init():
     """Initialize LLM providers based on configuration."""
     # Get all configured LLM endpoints
@@ -45,10 +54,11 @@ _llm_type_packages = {
     "llama_azure": ["openai>=1.12.0"],
     "deepseek_azure": ["openai>=1.12.0"],
     "aliyun_qwen_openai": ["openai>=1.12.0"],
-    "inception": ["aiohttp>=3.9.1"],
+    "inception": ["httpx>=0.28.1"],
     "snowflake": ["httpx>=0.28.1"],
     "huggingface": ["huggingface_hub>=0.31.0"],
     "ollama": ["ollama>=0.5.1"],
+    "local_pool": ["ollama>=0.5.1"],
 }
 
 # Cache for installed packages
@@ -118,38 +128,41 @@ def _get_provider(llm_type: str):
     # Import the appropriate provider module if not already loaded
     try:
         if llm_type == "openai":
-            from llm_providers.openai import provider as openai_provider
+            from app.core.llm_providers.openai import provider as openai_provider
             _loaded_providers[llm_type] = openai_provider
         elif llm_type == "anthropic":
-            from llm_providers.anthropic import provider as anthropic_provider
+            from app.core.llm_providers.anthropic import provider as anthropic_provider
             _loaded_providers[llm_type] = anthropic_provider
         elif llm_type == "gemini":
-            from llm_providers.gemini import provider as gemini_provider
+            from app.core.llm_providers.gemini import provider as gemini_provider
             _loaded_providers[llm_type] = gemini_provider
         elif llm_type == "azure_openai":
-            from llm_providers.azure_oai import provider as azure_openai_provider
+            from app.core.llm_providers.azure_oai import provider as azure_openai_provider
             _loaded_providers[llm_type] = azure_openai_provider
         elif llm_type == "llama_azure":
-            from llm_providers.azure_llama import provider as llama_provider
+            from app.core.llm_providers.azure_llama import provider as llama_provider
             _loaded_providers[llm_type] = llama_provider
         elif llm_type == "deepseek_azure":
-            from llm_providers.azure_deepseek import provider as deepseek_provider
+            from app.core.llm_providers.azure_deepseek import provider as deepseek_provider
             _loaded_providers[llm_type] = deepseek_provider
-        elif llm_type == "aliyun_qwen_openai":
-            from llm_providers.qwen_openai import provider as qwen_provider
+        elif llm_type in ("aliyun_qwen_openai", "qwen_openai"):
+            from app.core.llm_providers.qwen_openai import provider as qwen_provider
             _loaded_providers[llm_type] = qwen_provider
         elif llm_type == "inception":
-            from llm_providers.inception import provider as inception_provider
+            from app.core.llm_providers.inception import provider as inception_provider
             _loaded_providers[llm_type] = inception_provider
         elif llm_type == "snowflake":
-            from llm_providers.snowflake import provider as snowflake_provider
+            from app.core.llm_providers.snowflake import provider as snowflake_provider
             _loaded_providers[llm_type] = snowflake_provider
         elif llm_type == "huggingface":
-            from llm_providers.huggingface import provider as huggingface_provider
+            from app.core.llm_providers.huggingface import provider as huggingface_provider
             _loaded_providers[llm_type] = huggingface_provider
         elif llm_type == "ollama":
-            from llm_providers.ollama import provider as ollama_provider
+            from app.core.llm_providers.ollama import provider as ollama_provider
             _loaded_providers[llm_type] = ollama_provider
+        elif llm_type == "local_pool":
+            from app.core.llm_providers.local_pool import provider as local_pool_provider
+            _loaded_providers[llm_type] = local_pool_provider
         else:
             raise ValueError(f"Unknown LLM type: {llm_type}")
             
@@ -173,7 +186,7 @@ async def ask_llm(
     Args:
         prompt: The text prompt to send to the LLM
         schema: JSON schema that the response should conform to
-        provider: The LLM endpoint to use (if None, use preferred endpoint from config)
+        provider: The LLM endpoint or model group to use (if None, use preferred endpoint from config)
         level: The model tier to use ('low' or 'high')
         timeout: Request timeout in seconds
         query_params: Optional query parameters for development mode provider override
@@ -205,6 +218,10 @@ async def ask_llm(
     logger.debug(f"Prompt preview: {prompt[:100]}...")
     logger.debug(f"Schema: {schema}")
     
+    # Model groups route across several endpoints serving the same model
+    if provider_name in CONFIG.llm_model_groups:
+        return await _ask_model_group(provider_name, prompt, schema, level, timeout, max_length)
+
     if provider_name not in CONFIG.llm_endpoints:
         error_msg = f"Unknown provider '{provider_name}'"
         logger.error(error_msg)
@@ -228,28 +245,16 @@ async def ask_llm(
     llm_type_for_error = llm_type
 
     try:
-
-        # Get the provider instance based on llm_type
-        try:
-            provider_instance = _get_provider(llm_type)
-        except ValueError as e:
-            error_msg = str(e)
-            logger.error(error_msg)
-            return {}
-        
-        # Simply call the provider's get_completion method without locking
-        # Each provider should handle thread-safety internally
-        logger.debug(f"Calling {llm_type} provider completion for endpoint {provider_name} with max_tokens={max_length}")
-        result = await asyncio.wait_for(
-            provider_instance.get_completion(prompt, schema, model=model_id, timeout=timeout, max_tokens=max_length),
-            timeout=timeout
-        )
+        result = await _call_endpoint(provider_name, prompt, schema, level, timeout, max_length)
         logger.debug(f"{provider_name} response received, size: {len(str(result))} chars")
         return result
         
     except asyncio.TimeoutError:
         logger.error(f"LLM call timed out after {timeout}s with provider {provider_name}")
         return {}
+    except RateLimitedError as e:
+        logger.error(f"LLM endpoint {provider_name} still rate limited after retries (retry_after={e.retry_after})")
+        return {}
     except Exception as e:
         error_msg = f"LLM call failed: {type(e).__name__}: {str(e)}"
         logger.error(f"Error with provider {provider_name}: {error_msg}")
@@ -270,20 +275,235 @@ async def ask_llm(
         return {}
 
 
+async def _call_endpoint(
+    provider_name: str,
+    prompt: str,
+    schema: Dict[str, Any],
+    level: str,
+    timeout: float,
+    max_length: int
+) -> Dict[str, Any]:
+    """
+    Call a single configured endpoint under its limiter.
+
+    Unlike ask_llm this raises on failure (timeout, rate limit, provider errors) so
+    callers such as the model-group router can decide whether to fail over.
+    """
+    provider_config = CONFIG.llm_endpoints.get(provider_name)
+    if not provider_config or not provider_config.models:
+        raise ValueError(f"Missing model configuration for provider '{provider_name}'")
+
+    llm_type = provider_config.llm_type
+    model_id = getattr(provider_config.models, level)
+    provider_instance = _get_provider(llm_type)
+
+    # The per-endpoint limiter bounds in-flight calls and the token budget;
+    # queue wait counts against the overall timeout
+    logger.debug(f"Calling {llm_type} provider completion for endpoint {provider_name} with max_tokens={max_length}")
+    return await asyncio.wait_for(
+        run_limited(
+            provider_name,
+            lambda: provider_instance.get_completion(prompt, schema, model=model_id, timeout=timeout, max_tokens=max_length),
+            tokens=estimate_tokens(prompt, max_length)
+        ),
+        timeout=timeout
+    )
+
+
+async def _ask_model_group(
+    group_name: str,
+    prompt: str,
+    schema: Dict[str, Any],
+    level: str,
+    timeout: float,
+    max_length: int
+) -> Dict[str, Any]:
+    """Route a request through a model group with failover and optional hedging."""
+    router = get_router(group_name)
+    try:
+        return await router.route(
+            lambda endpoint_name, remaining: _call_endpoint(
+                endpoint_name, prompt, schema, level, remaining, max_length
+            ),
+            timeout=timeout
+        )
+    except AllEndpointsFailedError as e:
+        logger.log_with_context(
+            LogLevel.ERROR,
+            "LLM model group call failed",
+            {
+                "model_group": group_name,
+                "level": level,
+                "attempted": ",".join(e.attempted),
+                "error_type": type(e.last_error).__name__ if e.last_error else None,
+                "error_message": str(e.last_error) if e.last_error else None
+            }
+        )
+        return {}
+
+
+@dataclass
+class ConfigProvider:
+    """Provider resolved for one database LLM configuration."""
+    fingerprint: Tuple[Any, ...]  # Connection-relevant fields the provider was built from
+    endpoint_name: str  # Limiter key: the matching config_llm.yaml endpoint or llm_config_<id>
+    provider: Any
+    model: str
+
+
+def _config_fingerprint(llm_config) -> Tuple[Any, ...]:
+    return (llm_config.llm_en_name, llm_config.api_url, llm_config.api_key, bool(llm_config.is_local_llm))
+
+
+def _resolve_config_provider(llm_config) -> ConfigProvider:
+    """
+    Build the provider for a database LLM configuration.
+
+    A row with an ``api_url`` gets its own OpenAI-compatible client (online APIs and
+    local servers alike); otherwise the row must name a model served by one of the
+    endpoints in config_llm.yaml, whose provider and limiter are reused.
+    """
+    fingerprint = _config_fingerprint(llm_config)
+    model = llm_config.llm_en_name
+
+    if llm_config.api_url:
+        from app.core.llm_providers.openai_compatible import OpenAICompatibleProvider
+        provider_instance = OpenAICompatibleProvider(llm_config.api_url, llm_config.api_key, default_model=model)
+        return ConfigProvider(fingerprint, f"llm_config_{llm_config.id}", provider_instance, model)
+
+    for endpoint_name, endpoint_config in CONFIG.llm_endpoints.items():
+        models = endpoint_config.models
+        if models and model in (models.high, models.low):
+            return ConfigProvider(fingerprint, endpoint_name, _get_provider(endpoint_config.llm_type), model)
+
+    raise ValueError(f"LLM configuration {llm_config.id} ({model}) has no api_url and no endpoint serves this model")
+
+
+def get_config_provider(llm_config) -> ConfigProvider:
+    """
+    Return the cached provider for a database LLM configuration.
+
+    The cache is keyed by config id; an entry is rebuilt when the row's connection
+    fields change, which also covers updates made through another worker process.
+    """
+    fingerprint = _config_fingerprint(llm_config)
+    with _config_providers_lock:
+        cached = _config_providers.get(llm_config.id)
+    if cached is not None and cached.fingerprint == fingerprint:
+        return cached
+
+    resolved = _resolve_config_provider(llm_config)
+    with _config_providers_lock:
+        _config_providers[llm_config.id] = resolved
+    logger.info(f"Resolved LLM configuration {llm_config.id} ({resolved.model}) to endpoint {resolved.endpoint_name}")
+    return resolved
+
+
+def invalidate_llm_config(config_id: int) -> None:
+    """Drop the cached provider of a database LLM configuration (call after updating the row)."""
+    with _config_providers_lock:
+        removed = _config_providers.pop(config_id, None)
+    if removed is not None:
+        logger.info(f"Invalidated cached provider for LLM configuration {config_id}")
+
+
+async def ask_llm_with_config(
+    llm_config,
+    prompt: str,
+    schema: Dict[str, Any],
+    timeout: float = 30,
+    max_length: Optional[int] = None,
+    skip_reasoning: bool = False
+) -> Dict[str, Any]:
+    """
+    Send a request to the LLM described by a database configuration, using its
+    model, temperature, top_p and max_tokens. Returns {} on failure like ask_llm.
+
+    Reasoning models return their native reasoning as ``reasoning_content``;
+    ``skip_reasoning=True`` drops it (and disables thinking where the provider can).
+    """
+    max_length = max_length or llm_config.max_tokens or 512
+    try:
+        resolved = get_config_provider(llm_config)
+        temperature = llm_config.temperature if llm_config.temperature is not None else 0.7
+        return await asyncio.wait_for(
+            run_limited(
+                resolved.endpoint_name,
+                lambda: resolved.provider.get_completion(
+                    prompt,
+                    schema,
+                    model=resolved.model,
+                    temperature=temperature,
+                    top_p=llm_config.top_p,
+                    max_tokens=max_length,
+                    timeout=timeout,
+                    skip_reasoning=skip_reasoning
+                ),
+                tokens=estimate_tokens(prompt, max_length)
+            ),
+            timeout=timeout
+        )
+    except asyncio.TimeoutError:
+        logger.error(f"LLM call timed out after {timeout}s with LLM configuration {llm_config.id}")
+        return {}
+    except Exception as e:
+        logger.log_with_context(
+            LogLevel.ERROR,
+            "LLM call failed",
+            {
+                "llm_config_id": llm_config.id,
+                "model": llm_config.llm_en_name,
+                "error_type": type(e).__name__,
+                "error_message": str(e)
+            }
+        )
+        return {}
+
+
+# Used when ConversationReplyPrompt cannot be loaded from prompts.xml
+_FALLBACK_REPLY_PROMPT = (
+    "You are a professional AI assistant. Please provide accurate and helpful responses "
+    "based on the user's questions and context.\n\nConversation History:\n{history}\n\n"
+    "Current Question: {question}\n\nPlease provide a helpful response:"
+)
+
+
+def _conversation_reply_prompt(history: str, question: str) -> str:
+    """Render ConversationReplyPrompt, falling back to the built-in prompt if it is unavailable."""
+    try:
+        template = get_prompt("ConversationReplyPrompt")
+    except Exception as e:
+        logger.error(f"Failed to load the prompt registry: {type(e).__name__}: {e}")
+        template = None
+    if template is None:
+        logger.error("Prompt 'ConversationReplyPrompt' is missing from prompts.xml, using the built-in reply prompt")
+        return _FALLBACK_REPLY_PROMPT.format(history=history, question=question)
+    return template.render({"conversation.history": history, "request.query": question})
+
+
 async def get_llm_response(
     question: str,
     history_messages: list,
     llm_config,
-    max_tokens: int = 512
+    max_tokens: Optional[int] = None,
+    timeout: int = 30,
+    skip_reasoning: bool = False
 ) -> Dict[str, Any]:
     """
     Get LLM response with conversation context.
+
+    The answer is requested as JSON with only a ``content`` field; reasoning comes from
+    the model's native reasoning channel (reasoning models only) and is truncated
+    according to the ``reasoning`` policy in config_llm.yaml.
     
     Args:
         question: User's question
         history_messages: List of previous messages in conversation
-        llm_config: LLM configuration object
-        max_tokens: Maximum tokens for response
+        llm_config: LLM configuration object (ai_llm_configuration row); if None the
+            preferred endpoint from config_llm.yaml is used
+        max_tokens: Maximum tokens for response (default: the configuration's max_tokens)
+        timeout: Request timeout in seconds
+        skip_reasoning: Don't capture reasoning (and disable thinking where possible)
         
     Returns:
         Dict containing 'content' and optionally 'reasoning_content'
@@ -292,40 +512,46 @@ async def get_llm_response(
         # Build conversation context
         conversation_history = []
         
-        # Add system prompt
-        system_prompt = "You are a professional AI assistant. Please provide accurate and helpful responses based on the user's questions and context."
-        
         # Add historical messages in chronological order
         for msg in reversed(history_messages[-10:]):  # Use last 10 messages for context
             conversation_history.append(f"User: {msg.question}")
             if msg.content:
                 conversation_history.append(f"Assistant: {msg.content}")
         
-        # Build the final prompt
-        context = "\n".join(conversation_history) if conversation_history else ""
-        full_prompt = f"{system_prompt}\n\nConversation History:\n{context}\n\nCurrent Question: {question}\n\nPlease provide a helpful response:"
+        # Build the final prompt from the precompiled template (stable instructions first)
+        full_prompt = _conversation_reply_prompt("\n".join(conversation_history), question)
         
         # Simple schema for text response
         schema = {
             "type": "object",
             "properties": {
-                "content": {"type": "string", "description": "The main response content"},
-                "reasoning_content": {"type": "string", "description": "Optional reasoning or thought process"}
+                "content": {"type": "string", "description": "The main response content"}
             },
             "required": ["content"]
         }
         
         # Call the LLM
-        response = await ask_llm(
-            prompt=full_prompt,
-            schema=schema,
-            max_length=max_tokens
-        )
+        if llm_config is not None:
+            response = await ask_llm_with_config(
+                llm_config,
+                full_prompt,
+                schema,
+                timeout=timeout,
+                max_length=max_tokens,
+                skip_reasoning=skip_reasoning
+            )
+        else:
+            response = await ask_llm(
+                prompt=full_prompt,
+                schema=schema,
+                timeout=timeout,
+                max_length=max_tokens or 512
+            )
         
         if response and "content" in response:
             return {
                 "content": response["content"],
-                "reasoning_content": response.get("reasoning_content")
+                "reasoning_content": None if skip_reasoning else truncate_reasoning(response.get("reasoning_content"))
             }
         else:
             # Fallback response
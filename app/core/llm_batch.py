@@ -0,0 +1,347 @@
+"""
+Batch LLM inference for offline workloads such as report generation.
+
+``ask_llm_batch`` deduplicates identical prompts and then either runs the unique
+prompts online through ``ask_llm`` with bounded concurrency, or - for large,
+latency-tolerant batches on OpenAI / Azure OpenAI - submits them to the vendor
+Batch API, which is cheaper and not subject to the online rate limits.
+
+Every batch is a job persisted in a local, file-based job store, so a worker that
+restarts resumes an online job where it stopped and keeps polling a submitted vendor
+batch instead of paying for it twice. ``app.core.celery.llm_batch_task`` wraps this
+for running large jobs off the request path.
+"""
+
+import asyncio
+import io
+import json
+import os
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional
+
+from app.core import metrics
+from app.core.config import CONFIG
+from app.core.llm import ask_llm, _get_provider
+from app.core.logger.logging_config_helper import get_configured_logger
+
+logger = get_configured_logger("llm_batch")
+
+# llm_type -> request URL used inside the vendor batch input file
+VENDOR_BATCH_URLS = {
+    "openai": "/v1/chat/completions",
+    "azure_openai": "/chat/completions",
+}
+
+# Vendor batch states that will not change any more
+_VENDOR_TERMINAL = {"completed", "failed", "expired", "cancelled"}
+
+# Persist online progress every N completed prompts
+SAVE_EVERY = 20
+
+
+@dataclass
+class BatchJob:
+    job_id: str
+    provider: str
+    level: str
+    max_length: int
+    schema: Dict[str, Any]
+    prompts: List[str]  # Unique prompts
+    indices: List[int]  # For each submitted prompt, its index in `prompts`
+    mode: str  # "online" or "vendor"
+    status: str = "pending"  # pending | submitted | completed | failed
+    vendor_batch_id: Optional[str] = None
+    results: Dict[str, Dict[str, Any]] = field(default_factory=dict)  # str(unique index) -> response
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("completed", "failed")
+
+    @property
+    def resumable(self) -> bool:
+        """A finished online job with failed prompts; advancing it runs only those prompts again."""
+        return self.mode == "online" and self.status == "completed" and len(self.results) < len(self.prompts)
+
+
+class BatchJobStore:
+    """One JSON file per job; writes are atomic so a crash never leaves a torn file."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._lock = threading.Lock()
+
+    def _path(self, job_id: str) -> str:
+        if not job_id or os.sep in job_id or job_id.startswith("."):
+            raise ValueError(f"Invalid batch job id: {job_id!r}")
+        return os.path.join(self.directory, f"{job_id}.json")
+
+    def save(self, job: BatchJob) -> None:
+        job.updated_at = time.time()
+        path = self._path(job.job_id)
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(asdict(job), f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+
+    def load(self, job_id: str) -> Optional[BatchJob]:
+        path = self._path(job_id)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return BatchJob(**json.load(f))
+
+    def delete(self, job_id: str) -> None:
+        try:
+            os.remove(self._path(job_id))
+        except FileNotFoundError:
+            pass
+
+
+_store: Optional[BatchJobStore] = None
+
+
+def get_job_store() -> BatchJobStore:
+    global _store
+    if _store is None:
+        _store = BatchJobStore(CONFIG.llm_batch.job_dir)
+    return _store
+
+
+def _vendor_llm_type(provider_name: str) -> Optional[str]:
+    """llm_type of the endpoint if it supports a vendor Batch API, else None."""
+    endpoint = CONFIG.llm_endpoints.get(provider_name)
+    if endpoint and endpoint.llm_type in VENDOR_BATCH_URLS:
+        return endpoint.llm_type
+    return None
+
+
+def create_batch_job(
+    prompts: List[str],
+    schema: Dict[str, Any],
+    provider: Optional[str] = None,
+    level: str = "low",
+    max_length: int = 512,
+    latency_tolerant: bool = False,
+    job_id: Optional[str] = None
+) -> BatchJob:
+    """Deduplicate prompts, choose online or vendor mode and persist the new job."""
+    provider_name = provider or CONFIG.preferred_llm_endpoint
+
+    unique: Dict[str, int] = {}
+    indices = [unique.setdefault(prompt, len(unique)) for prompt in prompts]
+    metrics.inc("llm.batch.prompts", len(prompts))
+    metrics.inc("llm.batch.deduplicated", len(prompts) - len(unique))
+
+    use_vendor = (
+        latency_tolerant
+        and _vendor_llm_type(provider_name) is not None
+        and len(unique) >= CONFIG.llm_batch.vendor_min_prompts
+    )
+    job = BatchJob(
+        job_id=job_id or uuid.uuid4().hex,
+        provider=provider_name,
+        level=level,
+        max_length=max_length,
+        schema=schema,
+        prompts=list(unique),
+        indices=indices,
+        mode="vendor" if use_vendor else "online",
+    )
+    get_job_store().save(job)
+    logger.info(
+        f"Created batch job {job.job_id}: {len(prompts)} prompts ({len(unique)} unique), "
+        f"provider={provider_name}, mode={job.mode}"
+    )
+    return job
+
+
+async def _run_online(job: BatchJob, timeout: float, concurrency: int) -> None:
+    """
+    Run the prompts that have no result yet through ask_llm, saving progress as it goes.
+    Failed prompts ({} responses) are not recorded, so resuming the job retries them.
+    """
+    store = get_job_store()
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    pending = [i for i in range(len(job.prompts)) if str(i) not in job.results]
+    completed = 0
+
+    async def run_one(i: int) -> None:
+        nonlocal completed
+        async with semaphore:
+            result = await ask_llm(
+                job.prompts[i], job.schema, provider=job.provider, level=job.level,
+                timeout=timeout, max_length=job.max_length
+            )
+        if result:
+            job.results[str(i)] = result
+        completed += 1
+        if completed % SAVE_EVERY == 0:
+            store.save(job)
+
+    try:
+        await asyncio.gather(*(run_one(i) for i in pending))
+    finally:
+        store.save(job)
+    failed = len(job.prompts) - len(job.results)
+    if failed:
+        logger.warning(f"Batch job {job.job_id}: {failed} prompts failed, resume the job to retry them")
+    job.status = "completed"
+
+
+def _build_vendor_input(job: BatchJob, llm_type: str) -> bytes:
+    endpoint = CONFIG.llm_endpoints[job.provider]
+    model = getattr(endpoint.models, job.level)
+    system_prompt = f"Provide a valid JSON response matching this schema: {json.dumps(job.schema)}"
+    lines = []
+    for i, prompt in enumerate(job.prompts):
+        lines.append(json.dumps({
+            "custom_id": str(i),
+            "method": "POST",
+            "url": VENDOR_BATCH_URLS[llm_type],
+            "body": {
+                "model": model,
+                "messages": [
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": prompt},
+                ],
+                "max_tokens": job.max_length,
+            },
+        }, ensure_ascii=False))
+    return "\n".join(lines).encode("utf-8")
+
+
+async def _advance_vendor(job: BatchJob) -> None:
+    """Submit the vendor batch, or poll it once and collect the output when finished."""
+    llm_type = _vendor_llm_type(job.provider)
+    provider_instance = _get_provider(llm_type)
+    client = provider_instance.get_client()
+
+    if job.vendor_batch_id is None:
+        input_file = await client.files.create(
+            file=(f"{job.job_id}.jsonl", io.BytesIO(_build_vendor_input(job, llm_type))),
+            purpose="batch"
+        )
+        batch = await client.batches.create(
+            input_file_id=input_file.id,
+            endpoint=VENDOR_BATCH_URLS[llm_type],
+            completion_window=CONFIG.llm_batch.completion_window,
+            metadata={"job_id": job.job_id}
+        )
+        job.vendor_batch_id = batch.id
+        job.status = "submitted"
+        logger.info(f"Submitted batch job {job.job_id} to {job.provider} as {batch.id}")
+        return
+
+    batch = await client.batches.retrieve(job.vendor_batch_id)
+    if batch.status not in _VENDOR_TERMINAL:
+        logger.debug(f"Batch job {job.job_id} ({batch.id}) is {batch.status}")
+        return
+
+    if batch.output_file_id:
+        content = await client.files.content(batch.output_file_id)
+        for line in content.text.splitlines():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            body = ((record.get("response") or {}).get("body")) or {}
+            try:
+                message = body["choices"][0]["message"]["content"]
+                job.results[record["custom_id"]] = provider_instance.clean_response(message)
+            except Exception as e:
+                logger.warning(f"Batch job {job.job_id}: unusable result for {record.get('custom_id')}: {e}")
+
+    if batch.status == "completed":
+        job.status = "completed"
+    else:
+        job.status = "failed"
+        job.error = f"Vendor batch {batch.id} ended as {batch.status}"
+    logger.info(f"Batch job {job.job_id} {job.status}: {len(job.results)}/{len(job.prompts)} results")
+
+
+async def advance_batch_job(
+    job: BatchJob,
+    timeout: float = 60,
+    concurrency: Optional[int] = None
+) -> BatchJob:
+    """
+    Move a job forward: online jobs run to completion, vendor jobs are submitted
+    or polled once. Completed online jobs with failed prompts retry those prompts.
+    The job is saved after every step.
+    """
+    if job.done and not job.resumable:
+        return job
+    try:
+        if job.mode == "vendor":
+            await _advance_vendor(job)
+        else:
+            await _run_online(job, timeout, concurrency or CONFIG.llm_batch.concurrency)
+    except Exception as e:
+        logger.error(f"Batch job {job.job_id} step failed: {type(e).__name__}: {e}")
+        if job.mode == "vendor" and job.vendor_batch_id is None:
+            # Submission failed: fall back to running the prompts online next time
+            job.mode = "online"
+        else:
+            raise
+    finally:
+        get_job_store().save(job)
+    return job
+
+
+def get_batch_results(job: BatchJob) -> List[Dict[str, Any]]:
+    """Results in the order of the submitted prompts ({} where a prompt failed)."""
+    return [job.results.get(str(i), {}) for i in job.indices]
+
+
+async def ask_llm_batch(
+    prompts: List[str],
+    schema: Dict[str, Any],
+    provider: Optional[str] = None,
+    level: str = "low",
+    timeout: float = 60,
+    max_length: int = 512,
+    concurrency: Optional[int] = None,
+    latency_tolerant: bool = False,
+    job_id: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    Run many independent prompts and return their responses in order.
+
+    Args:
+        prompts: Prompts to run; duplicates are sent once
+        schema: JSON schema every response should conform to
+        provider: LLM endpoint (default: preferred endpoint)
+        level: Model tier ('low' or 'high')
+        timeout: Per-prompt timeout in seconds (online mode)
+        max_length: Maximum response length in tokens
+        concurrency: Unique prompts in flight (default: batch.concurrency)
+        latency_tolerant: Allow the vendor Batch API (may take up to the completion window)
+        job_id: Resume or name a job in the local job store
+
+    Returns:
+        One response dict per prompt ({} where a prompt failed)
+    """
+    job = get_job_store().load(job_id) if job_id else None
+    if job is None:
+        job = create_batch_job(
+            prompts, schema, provider=provider, level=level, max_length=max_length,
+            latency_tolerant=latency_tolerant, job_id=job_id
+        )
+
+    while True:
+        await advance_batch_job(job, timeout=timeout, concurrency=concurrency)
+        if job.done:
+            break
+        if job.mode == "vendor" and job.vendor_batch_id:
+            await asyncio.sleep(CONFIG.llm_batch.poll_interval)
+
+    if job.status == "failed":
+        logger.error(f"Batch job {job.job_id} failed: {job.error}")
+    return get_batch_results(job)
@@ -0,0 +1,296 @@
+"""
+Per-endpoint concurrency and rate limiting for LLM calls.
+
+Each configured LLM endpoint gets one ``EndpointLimiter`` that bounds the number of
+in-flight requests and, optionally, the tokens sent per minute. The concurrency
+limit adapts AIMD-style: it grows additively while calls succeed and is cut
+multiplicatively when the vendor answers 429 (or times out), and a Retry-After
+hint pauses the whole endpoint instead of letting every queued call hit the wall.
+Queue wait time is exported through ``app.core.metrics``.
+"""
+
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+from app.core import metrics
+from app.core.config import CONFIG, RateLimitConfig
+from app.core.logger.logging_config_helper import get_configured_logger
+
+logger = get_configured_logger("llm_limiter")
+
+# Cache of limiters keyed by endpoint name
+_limiters: Dict[str, "EndpointLimiter"] = {}
+
+
+class RateLimitedError(RuntimeError):
+    """Raised when an endpoint keeps answering 429 after all retries."""
+
+    def __init__(self, endpoint: str, retry_after: Optional[float] = None):
+        super().__init__(f"LLM endpoint '{endpoint}' is rate limited")
+        self.endpoint = endpoint
+        self.retry_after = retry_after
+
+
+def _status_code(exc: BaseException) -> Optional[int]:
+    """Best-effort extraction of an HTTP status code from SDK/httpx exceptions."""
+    code = getattr(exc, "status_code", None)
+    if code is None:
+        response = getattr(exc, "response", None)
+        code = getattr(response, "status_code", None) or getattr(response, "status", None)
+    try:
+        return int(code) if code is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def is_rate_limit_error(exc: BaseException) -> bool:
+    """Return True if the exception represents a vendor-side 429."""
+    if isinstance(exc, RateLimitedError):
+        return True
+    if _status_code(exc) == 429:
+        return True
+    name = type(exc).__name__
+    return name in ("RateLimitError", "ResourceExhausted", "TooManyRequests")
+
+
+def get_retry_after(exc: BaseException) -> Optional[float]:
+    """Read Retry-After (seconds or HTTP date) or retry-after-ms from an exception's response."""
+    if isinstance(exc, RateLimitedError):
+        return exc.retry_after
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        value = headers.get("retry-after-ms")
+        if value is not None:
+            return max(0.0, float(value) / 1000.0)
+        value = headers.get("retry-after")
+        if value is None:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            retry_at = parsedate_to_datetime(value)
+            return max(0.0, retry_at.timestamp() - time.time())
+    except Exception:
+        return None
+
+
+def estimate_tokens(prompt: str, max_tokens: int = 0) -> int:
+    """Rough token estimate (~4 characters per token) for budget accounting."""
+    return len(prompt) // 4 + 1 + max(0, max_tokens)
+
+
+class EndpointLimiter:
+    """
+    Async limiter for a single LLM endpoint.
+
+    Combines an adaptive concurrency window (AIMD) with an optional
+    tokens-per-minute bucket and a global pause driven by Retry-After.
+    """
+
+    def __init__(self, name: str, config: Optional[RateLimitConfig] = None):
+        self.name = name
+        self.config = config or RateLimitConfig()
+        self.max_concurrency = max(1, int(self.config.max_concurrency))
+        self.min_concurrency = max(1, min(int(self.config.min_concurrency), self.max_concurrency))
+        initial = self.config.initial_concurrency or self.max_concurrency
+        self._limit = float(max(self.min_concurrency, min(initial, self.max_concurrency)))
+        self._in_flight = 0
+        self._waiters: deque = deque()
+        self._blocked_until = 0.0
+        self._last_decrease = 0.0
+
+        # Token bucket (None = unlimited)
+        self._tpm = self.config.tokens_per_minute
+        self._tokens = float(self._tpm) if self._tpm else 0.0
+        self._last_refill = time.monotonic()
+
+    @property
+    def limit(self) -> int:
+        """Current adaptive concurrency limit."""
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    def _labels(self) -> Dict[str, Any]:
+        return {"endpoint": self.name}
+
+    def _publish(self) -> None:
+        metrics.set_gauge("llm.limiter.in_flight", self._in_flight, self._labels())
+        metrics.set_gauge("llm.limiter.limit", self.limit, self._labels())
+        metrics.set_gauge("llm.limiter.queue_depth", len(self._waiters), self._labels())
+
+    def _refill(self, now: float) -> None:
+        if not self._tpm:
+            return
+        elapsed = now - self._last_refill
+        self._last_refill = now
+        self._tokens = min(float(self._tpm), self._tokens + elapsed * self._tpm / 60.0)
+
+    def _token_delay(self, tokens: int, now: float) -> float:
+        """Seconds to wait until ``tokens`` fit in the bucket (0 if they fit now)."""
+        if not self._tpm:
+            return 0.0
+        self._refill(now)
+        needed = min(float(tokens), float(self._tpm))
+        if self._tokens >= needed:
+            return 0.0
+        return (needed - self._tokens) * 60.0 / self._tpm
+
+    def _wake_next(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+
+    async def acquire(self, tokens: int = 0) -> None:
+        """Wait for a concurrency slot and token budget, then reserve them."""
+        start = time.monotonic()
+        queued = False
+        try:
+            while True:
+                now = time.monotonic()
+                if now < self._blocked_until:
+                    await asyncio.sleep(self._blocked_until - now)
+                    continue
+
+                # Respect FIFO order: newcomers queue behind existing waiters
+                if self._in_flight >= self.limit or (self._waiters and not queued):
+                    waiter = asyncio.get_running_loop().create_future()
+                    if queued:
+                        self._waiters.appendleft(waiter)
+                    else:
+                        self._waiters.append(waiter)
+                    queued = True
+                    self._publish()
+                    try:
+                        await waiter
+                    except asyncio.CancelledError:
+                        if waiter.done() and not waiter.cancelled():
+                            # We were woken but are leaving; pass the wakeup on
+                            self._wake_next()
+                        else:
+                            try:
+                                self._waiters.remove(waiter)
+                            except ValueError:
+                                pass
+                        raise
+                    continue
+
+                delay = self._token_delay(tokens, now)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                    continue
+
+                if self._tpm:
+                    self._tokens -= min(float(tokens), float(self._tpm))
+                self._in_flight += 1
+                break
+        finally:
+            wait = time.monotonic() - start
+            metrics.observe("llm.limiter.queue_wait_seconds", wait, self._labels())
+
+        # Another slot may still be free for the next waiter
+        if self._in_flight < self.limit:
+            self._wake_next()
+        self._publish()
+
+    def release(self) -> None:
+        """Return a concurrency slot."""
+        self._in_flight = max(0, self._in_flight - 1)
+        if self._in_flight < self.limit:
+            self._wake_next()
+        self._publish()
+
+    def on_success(self) -> None:
+        """Additive increase: roughly +increase_step per full window of successes."""
+        if self._limit < self.max_concurrency:
+            self._limit = min(
+                float(self.max_concurrency),
+                self._limit + self.config.increase_step / max(self._limit, 1.0),
+            )
+
+    def on_overload(self, retry_after: Optional[float] = None, rate_limited: bool = True) -> None:
+        """Multiplicative decrease, plus a global pause when the vendor sends Retry-After."""
+        now = time.monotonic()
+        if rate_limited:
+            pause = retry_after if retry_after is not None else self.config.default_retry_after
+            self._blocked_until = max(self._blocked_until, now + pause)
+        # Only back off once per pause window so a burst of 429s doesn't collapse the limit to 1
+        if now - self._last_decrease >= max(retry_after or 0.0, self.config.default_retry_after):
+            self._last_decrease = now
+            old = self.limit
+            self._limit = max(float(self.min_concurrency), self._limit * self.config.decrease_factor)
+            logger.warning(
+                f"Endpoint {self.name} overloaded (rate_limited={rate_limited}, retry_after={retry_after}); "
+                f"concurrency limit {old} -> {self.limit}"
+            )
+        metrics.inc("llm.limiter.throttled", labels=self._labels())
+        self._publish()
+
+    @asynccontextmanager
+    async def slot(self, tokens: int = 0):
+        """
+        Hold a concurrency slot for the duration of the block and feed the outcome
+        back into the adaptive limit.
+        """
+        await self.acquire(tokens)
+        try:
+            yield self
+        except asyncio.TimeoutError:
+            self.on_overload(rate_limited=False)
+            raise
+        except Exception as e:
+            if is_rate_limit_error(e):
+                self.on_overload(get_retry_after(e), rate_limited=True)
+            raise
+        else:
+            self.on_success()
+        finally:
+            self.release()
+
+
+def get_limiter(endpoint_name: str) -> EndpointLimiter:
+    """Return the (cached) limiter for an LLM endpoint."""
+    limiter = _limiters.get(endpoint_name)
+    if limiter is None:
+        provider_config = CONFIG.llm_endpoints.get(endpoint_name)
+        rate_config = getattr(provider_config, "rate_limit", None) or CONFIG.llm_rate_limit_defaults
+        limiter = _limiters[endpoint_name] = EndpointLimiter(endpoint_name, rate_config)
+        logger.debug(
+            f"Created limiter for {endpoint_name}: max_concurrency={limiter.max_concurrency}, "
+            f"tokens_per_minute={rate_config.tokens_per_minute}"
+        )
+    return limiter
+
+
+async def run_limited(endpoint_name: str, call, tokens: int = 0):
+    """
+    Run ``call()`` (a zero-argument coroutine factory) under the endpoint limiter,
+    retrying after Retry-After when the vendor answers 429.
+    """
+    limiter = get_limiter(endpoint_name)
+    attempts = max(0, int(limiter.config.max_retries)) + 1
+    for attempt in range(attempts):
+        try:
+            async with limiter.slot(tokens):
+                return await call()
+        except Exception as e:
+            if not is_rate_limit_error(e) or attempt == attempts - 1:
+                if is_rate_limit_error(e):
+                    raise RateLimitedError(endpoint_name, get_retry_after(e)) from e
+                raise
+            logger.info(f"Rate limited by {endpoint_name}, retrying (attempt {attempt + 2}/{attempts})")
@@ -16,13 +16,17 @@ import asyncio
 from typing import Dict, Any, List, Optional
 
 from anthropic import AsyncAnthropic
-from core.config import CONFIG
+from app.core.config import CONFIG
 import threading
 
-from llm_providers.llm_provider import LLMProvider
+from app.core.llm_providers.llm_provider import LLMProvider
+from app.core.http_transport import get_http_client
+from app.core.prompts import record_prompt_cache_usage
 
 logger = logging.getLogger(__name__)
 
+ANTHROPIC_BASE_URL = "https://api.anthropic.com"
+
 
 class ConfigurationError(RuntimeError):
     """Raised when configuration is missing or invalid."""
@@ -56,25 +60,37 @@ class AnthropicProvider(LLMProvider):
         with cls._client_lock:  # Thread-safe client initialization
             if cls._client is None:
                 api_key = cls.get_api_key()
-                cls._client = AsyncAnthropic(api_key=api_key)
+                cls._client = AsyncAnthropic(api_key=api_key, http_client=get_http_client(ANTHROPIC_BASE_URL))
         return cls._client
 
     @classmethod
     def _build_messages(cls, prompt: str, schema: Dict[str, Any]) -> List[Dict[str, str]]:
         """
-        Construct the message sequence for JSON-schema enforcement.
+        Construct the message sequence; the schema lives in the cached system block.
         """
         return [
-            {
-                "role": "assistant",
-                "content": f"I'll provide a JSON response matching this schema: {json.dumps(schema)}"
-            },
             {
                 "role": "user",
                 "content": prompt
             }
         ]
 
+    @classmethod
+    def _build_system(cls, schema: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Stable system block (instructions + schema) marked for Anthropic prompt caching.
+        """
+        return [
+            {
+                "type": "text",
+                "text": (
+                    "You are a helpful assistant that always responds with valid JSON matching the provided schema.\n"
+                    f"Provide a JSON response matching this schema: {json.dumps(schema, sort_keys=True)}"
+                ),
+                "cache_control": {"type": "ephemeral"}
+            }
+        ]
+
     @classmethod
     def clean_response(cls, content: str) -> Dict[str, Any]:
         """
@@ -116,7 +132,7 @@ class AnthropicProvider(LLMProvider):
                     messages=messages,
                     max_tokens=max_tokens,
                     temperature=temperature,
-                    system=f"You are a helpful assistant that always responds with valid JSON matching the provided schema."
+                    system=self._build_system(schema)
                 ),
                 timeout
             )
@@ -124,6 +140,7 @@ class AnthropicProvider(LLMProvider):
             logger.error("Completion request timed out after %s seconds", timeout)
             return {}
 
+        record_prompt_cache_usage("anthropic", getattr(response, "usage", None))
         # Extract the response content
         content = response.content[0].text
         return self.clean_response(content)
@@ -12,13 +12,16 @@ Backwards compatibility is not guaranteed at this time.
 import json
 from openai import AsyncAzureOpenAI
 import os
-from core.config import CONFIG
+from app.core.config import CONFIG
 import asyncio
 import threading
 import re
 from typing import Dict, Any, Optional
 
-from llm_providers.llm_provider import LLMProvider
+from app.core.llm_providers.llm_provider import LLMProvider
+from app.core.http_transport import get_http_client
+from app.core.prompts import record_prompt_cache_usage
+from app.core.reasoning import consume_chat_stream
 from app.core.logger.logging_config_helper import get_configured_logger
 logger = get_configured_logger("deepseek_azure")
 
@@ -89,7 +92,8 @@ class DeepSeekAzureProvider(LLMProvider):
                         azure_endpoint=endpoint,
                         api_key=api_key,
                         api_version=api_version,
-                        timeout=30.0
+                        timeout=30.0,
+                        http_client=get_http_client(endpoint)
                     )
                     logger.info("DeepSeek Azure client initialized successfully")
                 except Exception as e:
@@ -132,7 +136,13 @@ class DeepSeekAzureProvider(LLMProvider):
         timeout: float = 8.0,
         **kwargs
     ) -> Dict[str, Any]:
-        """Get completion from DeepSeek on Azure"""
+        """
+        Get completion from DeepSeek on Azure.
+
+        The response is streamed so DeepSeek-R1's reasoning (``reasoning_content``
+        deltas or a leading <think> block) is captured apart from the JSON answer and
+        returned as ``reasoning_content``; ``skip_reasoning=True`` discards it.
+        """
         if model is None:
             # Get model from config if not provided
             provider_config = CONFIG.llm_endpoints.get("deepseek_azure")
@@ -146,25 +156,33 @@ class DeepSeekAzureProvider(LLMProvider):
 Your response must exactly match the following JSON schema: {json.dumps(schema)}
 Only output the JSON object itself, with no markdown formatting, no explanations, and no additional text."""
         
-        try:
-            response = await asyncio.wait_for(
-                client.chat.completions.create(
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": prompt}
-                    ],
-                    model=model,
-                    temperature=temperature,
-                    max_tokens=max_tokens,
-                    response_format={"type": "json_object"}  # Force JSON response
-                ),
-                timeout=timeout
+        capture_reasoning = not kwargs.get("skip_reasoning", False)
+
+        async def complete():
+            stream = await client.chat.completions.create(
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": prompt}
+                ],
+                model=model,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                response_format={"type": "json_object"},  # Force JSON response
+                stream=True,
+                stream_options={"include_usage": True}
             )
+            return await consume_chat_stream(stream, capture_reasoning=capture_reasoning)
+
+        try:
+            response = await asyncio.wait_for(complete(), timeout=timeout)
             
-            content = response.choices[0].message.content
-            logger.debug(f"Raw response length: {len(content)} chars")
+            record_prompt_cache_usage("deepseek_azure", response.usage)
+            logger.debug(f"Raw response length: {len(response.content)} chars, "
+                         f"reasoning: {len(response.reasoning or '')} chars")
             
-            result = self.clean_response(content)
+            result = self.clean_response(response.content)
+            if result and response.reasoning:
+                result["reasoning_content"] = response.reasoning
             logger.info("DeepSeek completion successful")
             return result
             
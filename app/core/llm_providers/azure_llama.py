@@ -12,13 +12,15 @@ Backwards compatibility is not guaranteed at this time.
 import json
 from openai import AsyncAzureOpenAI
 import os
-from core.config import CONFIG
+from app.core.config import CONFIG
 import asyncio
 import threading
 import re
 from typing import Dict, Any, Optional
 
-from llm_providers.llm_provider import LLMProvider
+from app.core.llm_providers.llm_provider import LLMProvider
+from app.core.http_transport import get_http_client
+from app.core.prompts import record_prompt_cache_usage
 from app.core.logger.logging_config_helper import get_configured_logger
 logger = get_configured_logger("llama_azure")
 
@@ -89,7 +91,8 @@ class LlamaAzureProvider(LLMProvider):
                         azure_endpoint=endpoint,
                         api_key=api_key,
                         api_version=api_version,
-                        timeout=30.0
+                        timeout=30.0,
+                        http_client=get_http_client(endpoint)
                     )
                     logger.info("Llama Azure client initialized successfully")
                 except Exception as e:
@@ -161,6 +164,7 @@ Only output the JSON object, no additional text or explanation."""
                 timeout=timeout
             )
             
+            record_prompt_cache_usage("llama_azure", getattr(response, "usage", None))
             content = response.choices[0].message.content
             logger.debug(f"Raw response length: {len(content)} chars")
             
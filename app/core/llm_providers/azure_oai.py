@@ -10,12 +10,14 @@ Code for calling Azure Open AI endpoints for LLM functionality.
 
 import json
 from openai import AsyncAzureOpenAI
-from core.config import CONFIG
+from app.core.config import CONFIG
 import asyncio
 import threading
 from typing import Dict, Any, Optional
 
-from llm_providers.llm_provider import LLMProvider
+from app.core.llm_providers.llm_provider import LLMProvider
+from app.core.http_transport import get_http_client
+from app.core.prompts import record_prompt_cache_usage
 from app.core.logger.logging_config_helper import get_configured_logger, LogLevel
 logger = get_configured_logger("azure_oai")
 
@@ -91,7 +93,8 @@ class AzureOpenAIProvider(LLMProvider):
                         azure_endpoint=endpoint,
                         api_key=api_key,
                         api_version=api_version,
-                        timeout=30.0  # Set timeout explicitly
+                        timeout=30.0,  # Set timeout explicitly
+                        http_client=get_http_client(endpoint)
                     )
                     logger.debug("Azure OpenAI client initialized successfully")
                 except Exception as e:
@@ -215,6 +218,7 @@ class AzureOpenAIProvider(LLMProvider):
                 logger.error("Response does not contain expected 'message.content' structure")
                 return {}
                 
+            record_prompt_cache_usage("azure_openai", getattr(response, "usage", None))
             ansr_str = response.choices[0].message.content
             ansr = self.clean_response(ansr_str)
             return ansr
@@ -17,10 +17,10 @@ import asyncio
 from typing import Dict, Any, Optional
 
 from google import genai
-from core.config import CONFIG
+from app.core.config import CONFIG
 import threading
 
-from llm_providers.llm_provider import LLMProvider
+from app.core.llm_providers.llm_provider import LLMProvider
 from app.core.logger.logging_config_helper import get_configured_logger, LogLevel
 logger = get_configured_logger("gemini")
 
@@ -151,13 +151,12 @@ class GeminiProvider(LLMProvider):
         # logger.debug(f"\t\tRequest config: {config}")
         # logger.debug(f"\t\tPrompt content: {prompt}...")  # Log first 100 chars
         try:
+            # Native async client: no thread per in-flight request
             response = await asyncio.wait_for(
-                asyncio.to_thread(
-                    lambda: client.models.generate_content(
-                        model=model_to_use,
-                        contents=prompt,
-                        config=config
-                    )
+                client.aio.models.generate_content(
+                    model=model_to_use,
+                    contents=prompt,
+                    config=config
                 ),
                 timeout=timeout
             )
@@ -14,11 +14,11 @@ import re
 import threading
 from typing import Any, Dict, List, Optional
 
-from core.config import CONFIG
+from app.core.config import CONFIG
 from app.core.logger.logging_config_helper import get_configured_logger
 
 from huggingface_hub import AsyncInferenceClient
-from llm_providers.llm_provider import LLMProvider
+from app.core.llm_providers.llm_provider import LLMProvider
 
 
 logger = get_configured_logger("llm")
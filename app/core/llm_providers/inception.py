@@ -9,15 +9,14 @@ Backwards compatibility is not guaranteed at this time.
 """
 
 import os
-import requests
 import json
 import re
-import aiohttp
 # import asyncio
 # import threading
 from typing import Dict, Any, Optional
 
-from llm_providers.llm_provider import LLMProvider
+from app.core.llm_providers.llm_provider import LLMProvider
+from app.core.http_transport import get_http_client
 
 
 class ConfigurationError(RuntimeError):
@@ -46,10 +45,9 @@ class InceptionProvider(LLMProvider):
     @classmethod
     def get_client(cls):
         """
-        Inception uses direct HTTP calls, so there's no persistent client.
-        This method is implemented to satisfy the interface but returns None.
+        Inception uses direct HTTP calls over the shared, pooled HTTP client.
         """
-        return None
+        return get_http_client(cls.API_URL)
 
     @classmethod
     def clean_response(cls, content: str) -> Dict[str, Any]:
@@ -115,21 +113,20 @@ class InceptionProvider(LLMProvider):
             payload["diffusing"] = True
 
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    self.API_URL, 
-                    headers=HEADERS, 
-                    json=payload, 
-                    timeout=timeout
-                ) as resp:
-                    resp.raise_for_status()
-                    data = await resp.json()
-                    content = data["choices"][0]["message"]["content"]
-                    
-                    # If schema was provided, parse the response as JSON
-                    if schema:
-                        return self.clean_response(content)
-                    return content
+            resp = await self.get_client().post(
+                self.API_URL,
+                headers=HEADERS,
+                json=payload,
+                timeout=timeout
+            )
+            resp.raise_for_status()
+            data = resp.json()
+            content = data["choices"][0]["message"]["content"]
+
+            # If schema was provided, parse the response as JSON
+            if schema:
+                return self.clean_response(content)
+            return content
         except Exception as e:
             # Log the error and return empty response
             import logging
@@ -0,0 +1,286 @@
+"""
+Local LLM serving across a pool of Ollama / llama.cpp server processes.
+
+For on-prem, CPU-only deployments one model server per model (or per NUMA node)
+scales better than a single Ollama instance swapping models in and out. The pool:
+
+- pins models to servers: a model is only sent to the servers that list it under
+  ``models`` (servers with an empty list take models nobody pins), so the chat and
+  embedding models stay resident on their own processes instead of evicting each other;
+- sends Ollama ``keep_alive`` with every request so pinned models are not unloaded,
+  and passes ``num_ctx`` / ``num_predict`` limits through;
+- dispatches each request to the eligible server with the lowest queue depth
+  (in-flight requests relative to its parallel slots, then latency), so the servers'
+  continuous batching (``OLLAMA_NUM_PARALLEL``, ``llama-server --parallel``) is kept full;
+- skips a server for ``failure_cooldown`` seconds after a connection failure.
+
+Configured as the ``local_pool`` endpoint in config_llm.yaml.
+"""
+
+import asyncio
+import json
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+from ollama import AsyncClient
+
+from app.core import metrics
+from app.core.config import CONFIG, LocalPoolConfig, LocalServerConfig
+from app.core.http_transport import get_http_client
+from app.core.llm_providers.llm_provider import LLMProvider
+from app.core.logger.logging_config_helper import get_configured_logger
+
+logger = get_configured_logger("local_pool")
+
+ENDPOINT_NAME = "local_pool"
+
+# Weight of the newest sample in the per-server latency average
+_LATENCY_ALPHA = 0.2
+
+# Failures that mean the server itself is unreachable (not a bad request)
+_CONNECTION_ERRORS = (httpx.TransportError, ConnectionError)
+
+
+class NoLocalServerError(RuntimeError):
+    """No server in the pool can serve the requested model."""
+
+
+@dataclass
+class LocalServer:
+    """A model server in the pool and its live load."""
+    config: LocalServerConfig
+    inflight: int = 0
+    latency: Optional[float] = None  # Moving average of request latency (seconds)
+    unavailable_until: float = 0.0
+    _ollama_client: Optional[AsyncClient] = None
+
+    @property
+    def url(self) -> str:
+        return self.config.url
+
+    @property
+    def queue_depth(self) -> int:
+        """Requests waiting on the server beyond its parallel slots."""
+        return max(0, self.inflight - self.config.max_concurrency)
+
+    @property
+    def load(self) -> float:
+        return self.inflight / max(1, self.config.max_concurrency)
+
+    def ollama_client(self) -> AsyncClient:
+        if self._ollama_client is None:
+            self._ollama_client = AsyncClient(host=self.url)
+        return self._ollama_client
+
+
+class LocalServerPool:
+    """Model-pinned, queue-depth-aware dispatch over local model servers."""
+
+    def __init__(self, config: LocalPoolConfig):
+        self.config = config
+        self.servers = [LocalServer(server) for server in config.servers]
+        self._lock = threading.Lock()
+
+    def pins(self, model: str) -> bool:
+        """True if some server keeps this model resident."""
+        return any(model in server.config.models for server in self.servers)
+
+    def candidates(self, model: str) -> List[LocalServer]:
+        """Servers eligible for the model, best first."""
+        if self.pins(model):
+            eligible = [server for server in self.servers if model in server.config.models]
+        else:
+            eligible = [server for server in self.servers if not server.config.models]
+        now = time.monotonic()
+        return sorted(
+            eligible,
+            key=lambda s: (s.unavailable_until > now, s.load, s.latency or 0.0)
+        )
+
+    def _publish(self, server: LocalServer) -> None:
+        labels = {"server": server.url}
+        metrics.set_gauge("local_pool.inflight", server.inflight, labels)
+        metrics.set_gauge("local_pool.queue_depth", server.queue_depth, labels)
+
+    async def dispatch(self, model: str, call: Callable[[LocalServer], Awaitable[Any]]) -> Any:
+        """
+        Run ``call(server)`` on the least-loaded server for the model; on a connection
+        failure the server is put in cooldown and the next one is tried.
+        """
+        attempted = set()
+        last_error: Optional[BaseException] = None
+        while True:
+            with self._lock:
+                remaining = [s for s in self.candidates(model) if s.url not in attempted]
+                if not remaining:
+                    break
+                server = remaining[0]
+                server.inflight += 1
+                self._publish(server)
+            attempted.add(server.url)
+            started = time.monotonic()
+            try:
+                result = await call(server)
+                elapsed = time.monotonic() - started
+                server.latency = elapsed if server.latency is None else (
+                    _LATENCY_ALPHA * elapsed + (1 - _LATENCY_ALPHA) * server.latency
+                )
+                metrics.observe("local_pool.latency_seconds", elapsed, {"server": server.url})
+                return result
+            except _CONNECTION_ERRORS as e:
+                last_error = e
+                server.unavailable_until = time.monotonic() + self.config.failure_cooldown
+                metrics.inc("local_pool.failures", 1, {"server": server.url})
+                logger.warning(f"Local model server {server.url} unavailable ({type(e).__name__}: {e}), trying next")
+            finally:
+                with self._lock:
+                    server.inflight -= 1
+                    self._publish(server)
+
+        if last_error is not None:
+            raise last_error
+        raise NoLocalServerError(f"No local model server configured for model {model}")
+
+    def _num_predict(self, max_tokens: Optional[int]) -> Optional[int]:
+        limits = [n for n in (max_tokens, self.config.num_predict) if n]
+        return min(limits) if limits else None
+
+    async def chat(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        json_mode: bool = True
+    ) -> str:
+        """Chat completion on the best server for the model; returns the message content."""
+        num_predict = self._num_predict(max_tokens)
+
+        async def call(server: LocalServer) -> str:
+            if server.config.server_type == "llamacpp":
+                body: Dict[str, Any] = {"model": model, "messages": messages, "temperature": temperature}
+                if num_predict:
+                    body["max_tokens"] = num_predict
+                if json_mode:
+                    body["response_format"] = {"type": "json_object"}
+                response = await get_http_client(server.url).post(f"{server.url}/v1/chat/completions", json=body)
+                response.raise_for_status()
+                return response.json()["choices"][0]["message"]["content"] or ""
+
+            options: Dict[str, Any] = {"temperature": temperature}
+            if self.config.num_ctx:
+                options["num_ctx"] = self.config.num_ctx
+            if num_predict:
+                options["num_predict"] = num_predict
+            response = await server.ollama_client().chat(
+                model=model,
+                messages=messages,
+                options=options,
+                format="json" if json_mode else "",
+                keep_alive=self.config.keep_alive
+            )
+            return response.message.content or ""
+
+        return await self.dispatch(model, call)
+
+    async def embed(self, model: str, texts: List[str]) -> List[List[float]]:
+        """Embeddings from the server(s) the embedding model is pinned to."""
+        async def call(server: LocalServer) -> List[List[float]]:
+            if server.config.server_type == "llamacpp":
+                response = await get_http_client(server.url).post(
+                    f"{server.url}/v1/embeddings", json={"model": model, "input": texts}
+                )
+                response.raise_for_status()
+                return [item["embedding"] for item in response.json()["data"]]
+
+            options = {"num_ctx": self.config.num_ctx} if self.config.num_ctx else None
+            response = await server.ollama_client().embed(
+                model=model, input=texts, options=options, keep_alive=self.config.keep_alive
+            )
+            return [list(embedding) for embedding in response.embeddings]
+
+        return await self.dispatch(model, call)
+
+
+def get_pool_for_model(model: str) -> Optional[LocalServerPool]:
+    """The local pool if one of its servers pins ``model`` (used by the embedding path)."""
+    endpoint = CONFIG.llm_endpoints.get(ENDPOINT_NAME)
+    if not endpoint or not endpoint.local_pool:
+        return None
+    pool = provider.get_client()
+    return pool if pool.pins(model) else None
+
+
+class LocalPoolProvider(LLMProvider):
+    """Implementation of LLMProvider for a pool of local Ollama / llama.cpp servers."""
+
+    _client_lock = threading.Lock()
+    _client = None
+
+    @classmethod
+    def get_client(cls) -> LocalServerPool:
+        """Get or create the server pool from the local_pool endpoint config"""
+        with cls._client_lock:
+            if cls._client is None:
+                endpoint = CONFIG.llm_endpoints.get(ENDPOINT_NAME)
+                if not endpoint or not endpoint.local_pool or not endpoint.local_pool.servers:
+                    raise ValueError("local_pool endpoint has no servers configured")
+                cls._client = LocalServerPool(endpoint.local_pool)
+                logger.info(f"Local server pool initialized with {len(cls._client.servers)} servers")
+        return cls._client
+
+    @classmethod
+    def clean_response(cls, content: str) -> Dict[str, Any]:
+        """Extract and parse the JSON object in the response"""
+        response_text = content.strip().replace("```json", "").replace("```", "").strip()
+        start_idx = response_text.find("{")
+        end_idx = response_text.rfind("}") + 1
+        if start_idx == -1 or end_idx == 0:
+            logger.error("No valid JSON object found in response")
+            return {}
+        try:
+            return json.loads(response_text[start_idx:end_idx])
+        except json.JSONDecodeError as e:
+            logger.error(f"Failed to parse response as JSON: {e}")
+            return {}
+
+    async def get_completion(
+        self,
+        prompt: str,
+        schema: Dict[str, Any],
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 2048,
+        timeout: float = 60.0,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """Get completion from the least-loaded local server serving the model"""
+        if model is None:
+            provider_config = CONFIG.llm_endpoints.get(ENDPOINT_NAME)
+            model = provider_config.models.high if provider_config and provider_config.models else None
+        if not model:
+            raise ValueError("No model configured for local_pool")
+
+        system_prompt = f"""You are a helpful assistant that provides responses in JSON format.
+Your response must be valid JSON that matches this schema: {json.dumps(schema)}
+Only output the JSON object, no additional text or explanation."""
+        content = await asyncio.wait_for(
+            self.get_client().chat(
+                model,
+                [
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": prompt},
+                ],
+                temperature=temperature,
+                max_tokens=max_tokens
+            ),
+            timeout=timeout
+        )
+        return self.clean_response(content)
+
+
+# Create a singleton instance
+provider = LocalPoolProvider()
@@ -10,13 +10,13 @@ Backwards compatibility is not guaranteed at this time.
 import json
 from ollama import AsyncClient
 import os
-from core.config import CONFIG
+from app.core.config import CONFIG
 import asyncio
 import threading
 import re
 from typing import Dict, Any, Optional
 
-from llm_providers.llm_provider import LLMProvider
+from app.core.llm_providers.llm_provider import LLMProvider
 from app.core.logger.logging_config_helper import get_configured_logger, LogLevel
 
 
@@ -16,13 +16,17 @@ import asyncio
 from typing import Dict, Any, List, Optional
 
 from openai import AsyncOpenAI
-from core.config import CONFIG
+from app.core.config import CONFIG
 import threading
-from llm_providers.llm_provider import LLMProvider
+from app.core.llm_providers.llm_provider import LLMProvider
+from app.core.http_transport import get_http_client
+from app.core.prompts import record_prompt_cache_usage
 
 from app.core.logger.logging_config_helper import get_configured_logger
 logger = get_configured_logger("llm")
 
+OPENAI_BASE_URL = "https://api.openai.com/v1"
+
 
 class ConfigurationError(RuntimeError):
     """
@@ -56,7 +60,7 @@ class OpenAIProvider(LLMProvider):
         with cls._client_lock:  # Thread-safe client initialization
             if cls._client is None:
                 api_key = cls.get_api_key()
-                cls._client = AsyncOpenAI(api_key=api_key)
+                cls._client = AsyncOpenAI(api_key=api_key, http_client=get_http_client(OPENAI_BASE_URL))
         return cls._client
 
     @classmethod
@@ -123,6 +127,7 @@ class OpenAIProvider(LLMProvider):
             logger.error("Completion request timed out after %s seconds", timeout)
             return {}
 
+        record_prompt_cache_usage("openai", getattr(response, "usage", None))
         try:
             return self.clean_response(response.choices[0].message.content)
         except Exception as e:
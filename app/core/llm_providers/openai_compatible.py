@@ -0,0 +1,131 @@
+"""
+OpenAI-compatible provider built from a database LLM configuration.
+
+Unlike the endpoint providers (one singleton per endpoint in config_llm.yaml), an
+instance of this provider is created per ``ai_llm_configuration`` row and talks to
+that row's ``api_url`` with its ``api_key``. DeepSeek, DashScope (compatible mode),
+Xinference, vLLM and Ollama's ``/v1`` API all speak this protocol.
+
+Responses are streamed so that reasoning models served this way (deepseek-reasoner,
+Qwen thinking models, vLLM with a reasoning parser) have their native reasoning
+captured apart from the JSON answer.
+"""
+
+import asyncio
+import json
+import re
+import threading
+from typing import Any, Dict, List, Optional
+
+from openai import AsyncOpenAI
+
+from app.core.llm_providers.llm_provider import LLMProvider
+from app.core.http_transport import get_http_client
+from app.core.prompts import record_prompt_cache_usage
+from app.core.reasoning import consume_chat_stream
+from app.core.logger.logging_config_helper import get_configured_logger
+
+logger = get_configured_logger("openai_compatible_llm")
+
+# Hosts that accept DashScope's enable_thinking switch
+_ENABLE_THINKING_HOSTS = ("dashscope",)
+
+
+class OpenAICompatibleProvider(LLMProvider):
+    """LLMProvider for an arbitrary OpenAI-compatible chat completions API."""
+
+    def __init__(self, base_url: str, api_key: Optional[str] = None, default_model: Optional[str] = None):
+        self.base_url = base_url.strip().strip('"')
+        # Local servers usually accept any key, but the SDK requires one
+        self.api_key = (api_key or "").strip().strip('"') or "EMPTY"
+        self.default_model = default_model
+        self._client_lock = threading.Lock()
+        self._client = None
+
+    def get_client(self) -> AsyncOpenAI:
+        """Create the client on first use and reuse it afterwards."""
+        with self._client_lock:
+            if self._client is None:
+                self._client = AsyncOpenAI(
+                    api_key=self.api_key,
+                    base_url=self.base_url,
+                    http_client=get_http_client(self.base_url)
+                )
+                logger.debug(f"OpenAI-compatible client initialized for {self.base_url}")
+        return self._client
+
+    @classmethod
+    def _build_messages(cls, prompt: str, schema: Dict[str, Any]) -> List[Dict[str, str]]:
+        """
+        Construct the system and user message sequence enforcing a JSON schema.
+        """
+        return [
+            {
+                "role": "system",
+                "content": (
+                    f"Provide a valid JSON response matching this schema: "
+                    f"{json.dumps(schema)}"
+                )
+            },
+            {"role": "user", "content": prompt}
+        ]
+
+    @classmethod
+    def clean_response(cls, content: str) -> Dict[str, Any]:
+        """
+        Strip markdown fences and extract the first JSON object.
+        """
+        cleaned = re.sub(r"```(?:json)?\s*", "", content).strip()
+        match = re.search(r"(\{.*\})", cleaned, re.S)
+        if not match:
+            logger.error("Failed to parse JSON from content: %r", content)
+            return {}
+        return json.loads(match.group(1))
+
+    async def get_completion(
+        self,
+        prompt: str,
+        schema: Dict[str, Any],
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 2048,
+        timeout: float = 30.0,
+        top_p: Optional[float] = None,
+        skip_reasoning: bool = False,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """
+        Send an async chat completion request and return parsed JSON output.
+
+        Native reasoning, if the model produces any, is returned as ``reasoning_content``.
+        ``skip_reasoning=True`` discards it and, where the server supports it, turns
+        thinking off so the answer comes without reasoning tokens.
+        """
+        model = model or self.default_model
+        if not model:
+            raise ValueError(f"No model configured for {self.base_url}")
+
+        params: Dict[str, Any] = {
+            "model": model,
+            "messages": self._build_messages(prompt, schema),
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+        }
+        # top_p=0 is the column default and means "unset" rather than greedy sampling
+        if top_p:
+            params["top_p"] = top_p
+        if skip_reasoning and any(host in self.base_url for host in _ENABLE_THINKING_HOSTS):
+            params["extra_body"] = {"enable_thinking": False}
+
+        async def complete():
+            stream = await self.get_client().chat.completions.create(
+                **params, stream=True, stream_options={"include_usage": True}
+            )
+            return await consume_chat_stream(stream, capture_reasoning=not skip_reasoning)
+
+        response = await asyncio.wait_for(complete(), timeout)
+        record_prompt_cache_usage(self.base_url, response.usage)
+        result = self.clean_response(response.content)
+        if result and response.reasoning:
+            result["reasoning_content"] = response.reasoning
+        return result
@@ -12,8 +12,11 @@ import re
 import asyncio
 from openai import AsyncOpenAI
 
-from core.config import CONFIG
-from llm_providers.llm_provider import LLMProvider
+from app.core.config import CONFIG
+from app.core.llm_providers.llm_provider import LLMProvider
+from app.core.http_transport import get_http_client
+from app.core.prompts import record_prompt_cache_usage
+from app.core.reasoning import consume_chat_stream
 from app.core.logger.logging_config_helper import get_configured_logger, LogLevel
 
 logger = get_configured_logger("aliyun_qwen_llm")
@@ -27,7 +30,7 @@ class QwenOpenAIProvider(LLMProvider):
     @classmethod
     def get_api_key(cls) -> str:
         """Retrieve the Qwen OpenAI API key from config."""
-        provider_config = CONFIG.llm_endpoints.get("qwen_openai")
+        provider_config = CONFIG.llm_endpoints.get("aliyun_qwen_openai")
         if provider_config and provider_config.api_key:
             return provider_config.api_key.strip('"')
         raise ValueError("Qwen OpenAI API key not found in config")
@@ -35,7 +38,7 @@ class QwenOpenAIProvider(LLMProvider):
     @classmethod
     def get_base_url(cls) -> str:
         """Retrieve the Qwen OpenAI endpoint from config."""
-        provider_config = CONFIG.llm_endpoints.get("qwen_openai")
+        provider_config = CONFIG.llm_endpoints.get("aliyun_qwen_openai")
         if provider_config and provider_config.endpoint:
             return provider_config.endpoint.strip('"')
         raise ValueError("Qwen OpenAI endpoint not found in config")
@@ -43,7 +46,7 @@ class QwenOpenAIProvider(LLMProvider):
     @classmethod
     def get_model_from_config(cls, high_tier=False) -> str:
         """Get the appropriate model from configuration based on tier."""
-        provider_config = CONFIG.llm_endpoints.get("qwen_openai")
+        provider_config = CONFIG.llm_endpoints.get("aliyun_qwen_openai")
         if provider_config and provider_config.models:
             return provider_config.models.high if high_tier else provider_config.models.low
         # 默认模型
@@ -59,7 +62,8 @@ class QwenOpenAIProvider(LLMProvider):
                 cls._client = AsyncOpenAI(
                     api_key=api_key,
                     base_url=base_url,
-                    timeout=30.0
+                    timeout=30.0,
+                    http_client=get_http_client(base_url)
                 )
                 logger.debug("Qwen OpenAI client initialized successfully")
         return cls._client
@@ -168,6 +172,11 @@ class QwenOpenAIProvider(LLMProvider):
     ) -> Dict[str, Any]:
         """
         Send an async chat completion request and return parsed JSON output.
+
+        The response is streamed so the thinking output of Qwen reasoning models
+        (``reasoning_content`` deltas) is captured and returned as ``reasoning_content``.
+        ``skip_reasoning=True`` turns thinking off (``enable_thinking: false``), which
+        gets to the answer without generating reasoning tokens at all.
         """
         # If model not provided, get it from config
         if model is None:
@@ -179,21 +188,31 @@ class QwenOpenAIProvider(LLMProvider):
         messages = self._build_messages(prompt, schema)
         logger.debug("Andy - Messages: %r", messages)
 
-        try:
-            response = await asyncio.wait_for(
-                client.chat.completions.create(
-                    model=model,
-                    messages=messages,
-                    temperature=temperature,
-                    max_tokens=max_tokens,
-                ),
-                timeout
+        skip_reasoning = kwargs.get("skip_reasoning", False)
+
+        async def complete():
+            stream = await client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=True,
+                stream_options={"include_usage": True},
+                extra_body={"enable_thinking": False} if skip_reasoning else None
             )
+            return await consume_chat_stream(stream, capture_reasoning=not skip_reasoning)
+
+        try:
+            response = await asyncio.wait_for(complete(), timeout)
         except asyncio.TimeoutError:
             logger.error("Completion request timed out after %s seconds", timeout)
             raise
 
-        return self.clean_response(response.choices[0].message.content)
+        record_prompt_cache_usage("aliyun_qwen_openai", response.usage)
+        result = self.clean_response(response.content)
+        if result and response.reasoning:
+            result["reasoning_content"] = response.reasoning
+        return result
 
 # Create a singleton instance
 provider = QwenOpenAIProvider()
\ No newline at end of file
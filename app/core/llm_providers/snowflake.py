@@ -19,9 +19,10 @@ import logging
 import httpx
 from typing import Dict, Any, List, Optional
 
-from core.config import CONFIG
-from llm_providers.llm_provider import LLMProvider
-from retrieval_providers.utils import snowflake
+from app.core.config import CONFIG
+from app.core.llm_providers.llm_provider import LLMProvider
+from app.core.retrieval_providers.utils import snowflake
+from app.core.http_transport import get_http_client
 
 logger = logging.getLogger(__name__)
 
@@ -30,9 +31,9 @@ class SnowflakeProvider(LLMProvider):
     """Implementation of LLMProvider for Snowflake LLM REST API calls."""
 
     @classmethod
-    def get_client(cls):
-        """No-op since no persistent client is needed."""
-        return None
+    def get_client(cls) -> httpx.AsyncClient:
+        """Return the shared, pooled HTTP client for the Snowflake account URL."""
+        return get_http_client(snowflake.get_account_url(CONFIG.llm_endpoints.get("snowflake")))
 
     @classmethod
     def clean_response(cls, content: str) -> Dict[str, Any]:
@@ -124,24 +125,23 @@ async def cortex_complete(
 
 async def post(api: str, request: dict, timeout: float) -> dict:
     cfg = CONFIG.llm_endpoints.get("snowflake")
-    async with httpx.AsyncClient() as client:
-        response =  await client.post(
-            snowflake.get_account_url(cfg) + api,
-            json=request,
-            headers={
-                    "Authorization": f"Bearer {snowflake.get_pat(cfg)}",
-                    "Content-Type": "application/json",
-                    "Accept": "application/json",
-            },
-            timeout=timeout,
-        )
-        if response.status_code == 400:
-            logger.error(f"Snowflake API error: {response.json()}")
-            return {}
-        try:
-            response.raise_for_status()
-        except Exception as e:
-            logger.error(f"Snowflake API request failed: {e}")
-            return {}
-        return response.json()
+    response = await SnowflakeProvider.get_client().post(
+        snowflake.get_account_url(cfg) + api,
+        json=request,
+        headers={
+                "Authorization": f"Bearer {snowflake.get_pat(cfg)}",
+                "Content-Type": "application/json",
+                "Accept": "application/json",
+        },
+        timeout=timeout,
+    )
+    if response.status_code == 400:
+        logger.error(f"Snowflake API error: {response.json()}")
+        return {}
+    try:
+        response.raise_for_status()
+    except Exception as e:
+        logger.error(f"Snowflake API request failed: {e}")
+        return {}
+    return response.json()
 
@@ -0,0 +1,235 @@
+"""
+Routing across several LLM endpoints that serve the same model.
+
+A model group (``model_groups`` in config_llm.yaml) lists interchangeable endpoints.
+The router ranks them by observed latency and current in-flight count, fails over
+on timeouts, rate limits, 5xx responses and empty results, and can hedge: if the
+chosen endpoint hasn't answered within its usual (percentile) latency, a second
+request goes to the next endpoint and whichever finishes first wins, the other is
+cancelled.
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.core import metrics
+from app.core.config import CONFIG, ModelGroupConfig
+from app.core.llm_limiter import is_rate_limit_error, _status_code
+from app.core.logger.logging_config_helper import get_configured_logger
+
+logger = get_configured_logger("llm_router")
+
+# Latency assumed for endpoints that have not been measured yet (seconds)
+DEFAULT_LATENCY = 2.0
+# Smoothing factor for the latency moving average
+EWMA_ALPHA = 0.2
+# Number of latency samples kept per endpoint for percentile-based hedging
+LATENCY_WINDOW = 200
+
+EndpointCall = Callable[[str, float], Awaitable[Dict[str, Any]]]
+
+
+class EmptyLLMResponseError(RuntimeError):
+    """Raised when an endpoint returns no usable content (providers swallow some errors into {})."""
+    pass
+
+
+class AllEndpointsFailedError(RuntimeError):
+    """Raised when every endpoint of a model group failed or the deadline expired."""
+
+    def __init__(self, group: str, attempted: List[str], last_error: Optional[BaseException]):
+        super().__init__(f"All endpoints of model group '{group}' failed")
+        self.group = group
+        self.attempted = attempted
+        self.last_error = last_error
+
+
+def is_retryable_error(exc: BaseException) -> bool:
+    """Timeouts, rate limits, 5xx and empty responses are worth retrying elsewhere."""
+    if isinstance(exc, (asyncio.TimeoutError, EmptyLLMResponseError)):
+        return True
+    if is_rate_limit_error(exc):
+        return True
+    code = _status_code(exc)
+    if code is not None and code >= 500:
+        return True
+    return type(exc).__name__ in ("APITimeoutError", "APIConnectionError", "ConnectError", "ReadTimeout")
+
+
+class EndpointStats:
+    """Latency and load bookkeeping for one endpoint, shared by all model groups."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.ewma_latency: Optional[float] = None
+        self.latencies: deque = deque(maxlen=LATENCY_WINDOW)
+        self.in_flight = 0
+        self.cooldown_until = 0.0
+
+    def record_success(self, latency: float) -> None:
+        self.latencies.append(latency)
+        if self.ewma_latency is None:
+            self.ewma_latency = latency
+        else:
+            self.ewma_latency = EWMA_ALPHA * latency + (1 - EWMA_ALPHA) * self.ewma_latency
+        metrics.observe("llm.router.latency_seconds", latency, {"endpoint": self.name})
+
+    def record_failure(self, cooldown: float) -> None:
+        self.cooldown_until = time.monotonic() + cooldown
+        metrics.inc("llm.router.failures", labels={"endpoint": self.name})
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(q * (len(ordered) - 1)))]
+
+    def score(self) -> float:
+        """Lower is better: expected latency scaled by current load."""
+        latency = self.ewma_latency if self.ewma_latency is not None else DEFAULT_LATENCY
+        return latency * (1 + self.in_flight)
+
+    @property
+    def cooling_down(self) -> bool:
+        return time.monotonic() < self.cooldown_until
+
+
+_endpoint_stats: Dict[str, EndpointStats] = {}
+_routers: Dict[str, "ModelGroupRouter"] = {}
+
+
+def get_endpoint_stats(endpoint_name: str) -> EndpointStats:
+    stats = _endpoint_stats.get(endpoint_name)
+    if stats is None:
+        stats = _endpoint_stats[endpoint_name] = EndpointStats(endpoint_name)
+    return stats
+
+
+class ModelGroupRouter:
+    """Least-latency router with failover and hedging for one model group."""
+
+    def __init__(self, name: str, config: ModelGroupConfig):
+        self.name = name
+        self.config = config
+
+    def rank(self) -> List[str]:
+        """Healthy endpoints first (by score), endpoints in cooldown last."""
+        order = {name: i for i, name in enumerate(self.config.endpoints)}
+        stats = [get_endpoint_stats(name) for name in self.config.endpoints]
+        stats.sort(key=lambda s: (s.cooling_down, s.score(), order[s.name]))
+        return [s.name for s in stats]
+
+    def hedge_delay(self, endpoint_name: str) -> float:
+        """Delay before hedging: the configured latency percentile of the endpoint, clamped."""
+        observed = get_endpoint_stats(endpoint_name).percentile(self.config.hedge_percentile)
+        delay = observed if observed is not None else DEFAULT_LATENCY
+        return min(self.config.hedge_max_delay, max(self.config.hedge_min_delay, delay))
+
+    async def _attempt(self, endpoint_name: str, call: EndpointCall, timeout: float) -> Dict[str, Any]:
+        stats = get_endpoint_stats(endpoint_name)
+        stats.in_flight += 1
+        start = time.monotonic()
+        try:
+            result = await asyncio.wait_for(call(endpoint_name, timeout), timeout=timeout)
+            if not result:
+                raise EmptyLLMResponseError(f"Empty response from {endpoint_name}")
+            stats.record_success(time.monotonic() - start)
+            return result
+        except asyncio.CancelledError:
+            # Hedge loser or caller gave up: not the endpoint's fault
+            raise
+        except Exception as e:
+            if is_retryable_error(e):
+                stats.record_failure(self.config.failure_cooldown)
+            logger.warning(f"Model group {self.name}: endpoint {endpoint_name} failed: {type(e).__name__}: {e}")
+            raise
+        finally:
+            stats.in_flight -= 1
+
+    async def route(self, call: EndpointCall, timeout: float) -> Dict[str, Any]:
+        """
+        Run ``call(endpoint_name, remaining_timeout)`` against the best endpoint,
+        hedging and failing over until one succeeds or the deadline expires.
+        Only retryable errors (see is_retryable_error) fail over; any other error
+        is raised at once.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        ranked = self.rank()
+        next_index = 0
+        attempted: List[str] = []
+        pending: Dict[asyncio.Task, str] = {}
+        last_error: Optional[BaseException] = None
+
+        def launch() -> None:
+            nonlocal next_index
+            endpoint_name = ranked[next_index]
+            next_index += 1
+            attempted.append(endpoint_name)
+            remaining = max(0.0, deadline - loop.time())
+            task = asyncio.create_task(self._attempt(endpoint_name, call, remaining))
+            pending[task] = endpoint_name
+
+        launch()
+        try:
+            while pending:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+
+                can_hedge = (
+                    self.config.hedge_enabled
+                    and len(pending) == 1
+                    and next_index < len(ranked)
+                )
+                wait_timeout = remaining
+                if can_hedge:
+                    primary = next(iter(pending.values()))
+                    wait_timeout = min(remaining, self.hedge_delay(primary))
+
+                done, _ = await asyncio.wait(
+                    pending.keys(), timeout=wait_timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+
+                if not done:
+                    if can_hedge and loop.time() < deadline:
+                        logger.info(f"Model group {self.name}: hedging {pending[next(iter(pending))]} with {ranked[next_index]}")
+                        metrics.inc("llm.router.hedges", labels={"group": self.name})
+                        launch()
+                    continue
+
+                for task in done:
+                    endpoint_name = pending.pop(task)
+                    if task.exception() is None:
+                        if len(attempted) > 1:
+                            metrics.inc("llm.router.recovered", labels={"group": self.name, "endpoint": endpoint_name})
+                        return task.result()
+                    last_error = task.exception()
+                    if not is_retryable_error(last_error):
+                        # Bad request, auth or schema errors would fail on every endpoint
+                        raise AllEndpointsFailedError(self.name, attempted, last_error)
+
+                # Fail over to the next endpoint if nothing else is still running
+                if not pending and next_index < len(ranked):
+                    metrics.inc("llm.router.failovers", labels={"group": self.name})
+                    launch()
+        finally:
+            for task in pending:
+                task.cancel()
+
+        if last_error is None:
+            last_error = asyncio.TimeoutError(f"Model group {self.name} timed out after {timeout}s")
+        raise AllEndpointsFailedError(self.name, attempted, last_error)
+
+
+def get_router(group_name: str) -> ModelGroupRouter:
+    """Return the (cached) router for a configured model group."""
+    router = _routers.get(group_name)
+    if router is None:
+        config = CONFIG.llm_model_groups.get(group_name)
+        if config is None:
+            raise ValueError(f"Unknown model group '{group_name}'")
+        router = _routers[group_name] = ModelGroupRouter(group_name, config)
+    return router
@@ -0,0 +1,122 @@
+"""
+Lightweight in-process metrics registry.
+
+Counters, gauges and latency summaries are kept in memory per worker process and
+exposed as a JSON snapshot (see the ``/metrics`` endpoint in ``app/main.py``).
+Summaries keep a bounded window of recent samples so percentiles reflect current
+behaviour rather than the whole process lifetime.
+"""
+
+import threading
+from collections import deque
+from typing import Any, Dict, Optional, Tuple
+
+# Number of recent samples kept per summary for percentile estimation
+SUMMARY_WINDOW = 1024
+
+_lock = threading.Lock()
+_counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+_gauges: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+_summaries: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], "Summary"] = {}
+
+
+class Summary:
+    """Running count/sum/max plus a sliding window of samples for percentiles."""
+
+    def __init__(self, window: int = SUMMARY_WINDOW):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples: deque = deque(maxlen=window)
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+        self.samples.append(value)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Return the q-th quantile (0-1) of the sampled window, or None if empty."""
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, max(0, int(round(q * (len(ordered) - 1)))))
+        return ordered[index]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": round(self.total, 6),
+            "max": round(self.max, 6),
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99),
+        }
+
+
+def _key(name: str, labels: Optional[Dict[str, Any]]) -> Tuple[str, Tuple[Tuple[str, str], ...]]:
+    if not labels:
+        return name, ()
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def inc(name: str, value: float = 1.0, labels: Optional[Dict[str, Any]] = None) -> None:
+    """Increment a counter."""
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0.0) + value
+
+
+def set_gauge(name: str, value: float, labels: Optional[Dict[str, Any]] = None) -> None:
+    """Set a gauge to an absolute value."""
+    key = _key(name, labels)
+    with _lock:
+        _gauges[key] = value
+
+
+def observe(name: str, value: float, labels: Optional[Dict[str, Any]] = None) -> None:
+    """Record a sample (typically a duration in seconds) in a summary."""
+    key = _key(name, labels)
+    with _lock:
+        summary = _summaries.get(key)
+        if summary is None:
+            summary = _summaries[key] = Summary()
+        summary.observe(value)
+
+
+def get_summary(name: str, labels: Optional[Dict[str, Any]] = None) -> Optional[Summary]:
+    """Return the summary for a metric, or None if nothing was observed yet."""
+    with _lock:
+        return _summaries.get(_key(name, labels))
+
+
+def get_counter(name: str, labels: Optional[Dict[str, Any]] = None) -> float:
+    """Return the current value of a counter (0 if never incremented)."""
+    with _lock:
+        return _counters.get(_key(name, labels), 0.0)
+
+
+def _format(key: Tuple[str, Tuple[Tuple[str, str], ...]]) -> str:
+    name, labels = key
+    if not labels:
+        return name
+    return name + "{" + ",".join(f"{k}={v}" for k, v in labels) + "}"
+
+
+def snapshot() -> Dict[str, Dict[str, Any]]:
+    """Return a JSON-serialisable view of every metric."""
+    with _lock:
+        return {
+            "counters": {_format(k): v for k, v in _counters.items()},
+            "gauges": {_format(k): v for k, v in _gauges.items()},
+            "summaries": {_format(k): s.to_dict() for k, s in _summaries.items()},
+        }
+
+
+def reset() -> None:
+    """Clear all metrics (used by tests)."""
+    with _lock:
+        _counters.clear()
+        _gauges.clear()
+        _summaries.clear()
@@ -0,0 +1,284 @@
+"""
+Prompt registry compiled from config/prompts.xml and config/tools.xml.
+
+Both files are parsed once (at startup, or on first use) into compiled templates:
+each template records the variables it uses (``{request.query}``, ``{item.name}``,
+...) and is split into literal/variable segments, so rendering is a single join
+instead of repeated string scanning. Lookups fall back from the requested site and
+item type to ``Item`` and to the ``default`` site, like the XML layout intends.
+
+Templates keep their literal lead-in (instructions) ahead of the first variable,
+and ``tools_prefix`` renders tool definitions deterministically, so callers can put
+stable segments first and variable content last - the layout provider-side prompt
+caching (OpenAI automatic prefix caching, Anthropic ``cache_control``) needs.
+``record_prompt_cache_usage`` turns provider usage fields into a cache hit-rate metric.
+"""
+
+import json
+import os
+import re
+import textwrap
+import threading
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from app.core import metrics
+from app.core.config import CONFIG
+from app.core.logger.logging_config_helper import get_configured_logger
+
+logger = get_configured_logger("prompts")
+
+DEFAULT_SITE = "default"
+DEFAULT_ITEM_TYPE = "Item"
+
+# {request.query}, {item.name}, ... - JSON braces in returnStruc never match
+_VARIABLE_RE = re.compile(r"\{([A-Za-z_][A-Za-z0-9_]*(?:\.[A-Za-z_][A-Za-z0-9_]*)*)\}")
+
+
+def _local_name(tag: str) -> str:
+    """Strip the XML namespace: '{http://nlweb.ai/base}Prompt' -> 'Prompt'."""
+    return tag.rsplit("}", 1)[-1]
+
+
+def _clean_text(text: Optional[str]) -> str:
+    return textwrap.dedent(text or "").strip()
+
+
+def _parse_return_struc(text: Optional[str]) -> Optional[Dict[str, Any]]:
+    text = _clean_text(text)
+    if not text:
+        return None
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        logger.warning(f"returnStruc is not valid JSON: {text[:80]}...")
+        return None
+
+
+@dataclass
+class PromptTemplate:
+    name: str
+    text: str
+    return_struc: Optional[Dict[str, Any]] = None
+    site: str = DEFAULT_SITE
+    item_type: str = DEFAULT_ITEM_TYPE
+    variables: Tuple[str, ...] = ()
+    # Alternating literal / variable segments; variables are at odd positions
+    _segments: List[str] = field(default_factory=list, repr=False)
+
+    def __post_init__(self):
+        self._segments = _VARIABLE_RE.split(self.text)
+        self.variables = tuple(dict.fromkeys(self._segments[1::2]))
+
+    @property
+    def stable_prefix(self) -> str:
+        """Literal text before the first variable (identical for every render)."""
+        return self._segments[0]
+
+    def render(self, values: Mapping[str, Any]) -> str:
+        """
+        Fill the template. ``values`` is keyed by the dotted variable name
+        (e.g. ``{"request.query": ...}``); missing variables render as empty strings.
+        """
+        parts = list(self._segments)
+        for i in range(1, len(parts), 2):
+            value = values.get(parts[i])
+            parts[i] = "" if value is None else str(value)
+        return "".join(parts)
+
+
+@dataclass
+class ToolDefinition:
+    name: str
+    site: str
+    item_type: str
+    method: Optional[str] = None
+    handler: Optional[str] = None
+    enabled: bool = True
+    examples: List[str] = field(default_factory=list)
+    prompt: Optional[PromptTemplate] = None
+    return_struc: Optional[Dict[str, Any]] = None
+
+
+class PromptRegistry:
+    """Compiled prompts and tools, indexed by (site, item type, name)."""
+
+    def __init__(self, prompts_path: str, tools_path: Optional[str] = None):
+        self.prompts: Dict[Tuple[str, str, str], PromptTemplate] = {}
+        self.tools: Dict[Tuple[str, str], List[ToolDefinition]] = {}
+        self._tools_prefix_cache: Dict[Tuple[str, str], str] = {}
+        # A missing or malformed file leaves the registry empty; callers fall back to
+        # their built-in prompts (see llm._conversation_reply_prompt) instead of failing.
+        try:
+            self._load_prompts(prompts_path)
+        except (OSError, ET.ParseError) as e:
+            logger.error(f"Failed to load prompts from {prompts_path}: {type(e).__name__}: {e}")
+        if tools_path and os.path.exists(tools_path):
+            try:
+                self._load_tools(tools_path)
+            except (OSError, ET.ParseError) as e:
+                logger.error(f"Failed to load tools from {tools_path}: {type(e).__name__}: {e}")
+        logger.info(f"Prompt registry loaded: {len(self.prompts)} prompts, "
+                    f"{sum(len(t) for t in self.tools.values())} tools")
+
+    def _load_prompts(self, path: str) -> None:
+        root = ET.parse(path).getroot()
+        for site_el in root:
+            if _local_name(site_el.tag) != "Site":
+                continue
+            site = site_el.get("id", DEFAULT_SITE)
+            for type_el in site_el:
+                item_type = _local_name(type_el.tag)
+                for prompt_el in type_el:
+                    if _local_name(prompt_el.tag) != "Prompt" or not prompt_el.get("ref"):
+                        continue
+                    text, struc = "", None
+                    for child in prompt_el:
+                        child_name = _local_name(child.tag)
+                        if child_name == "promptString":
+                            # itertext skips XML comments inside the prompt
+                            text = _clean_text("".join(child.itertext()))
+                        elif child_name == "returnStruc":
+                            struc = _parse_return_struc(child.text)
+                    name = prompt_el.get("ref")
+                    self.prompts[(site, item_type, name)] = PromptTemplate(
+                        name=name, text=text, return_struc=struc, site=site, item_type=item_type
+                    )
+
+    def _load_tools(self, path: str) -> None:
+        root = ET.parse(path).getroot()
+        for site_el in root:
+            if _local_name(site_el.tag) != "Site":
+                continue
+            site = site_el.get("id", DEFAULT_SITE)
+            for type_el in site_el:
+                item_type = _local_name(type_el.tag)
+                for tool_el in type_el:
+                    if _local_name(tool_el.tag) != "Tool":
+                        continue
+                    tool = ToolDefinition(
+                        name=tool_el.get("name"),
+                        site=site,
+                        item_type=item_type,
+                        enabled=tool_el.get("enabled", "true").lower() != "false",
+                    )
+                    for child in tool_el:
+                        child_name = _local_name(child.tag)
+                        if child_name == "method":
+                            tool.method = _clean_text(child.text)
+                        elif child_name == "handler":
+                            tool.handler = _clean_text(child.text)
+                        elif child_name == "example":
+                            tool.examples.append(_clean_text(child.text))
+                        elif child_name == "prompt":
+                            tool.prompt = PromptTemplate(
+                                name=tool.name, text=_clean_text("".join(child.itertext())),
+                                site=site, item_type=item_type
+                            )
+                        elif child_name == "returnStruc":
+                            tool.return_struc = _parse_return_struc(child.text)
+                    if tool.prompt is not None:
+                        tool.prompt.return_struc = tool.return_struc
+                    self.tools.setdefault((site, item_type), []).append(tool)
+
+    @staticmethod
+    def _candidates(site: str, item_type: str) -> List[Tuple[str, str]]:
+        candidates = [(site, item_type), (site, DEFAULT_ITEM_TYPE),
+                      (DEFAULT_SITE, item_type), (DEFAULT_SITE, DEFAULT_ITEM_TYPE)]
+        return list(dict.fromkeys(candidates))
+
+    def get_prompt(self, name: str, site: str = DEFAULT_SITE, item_type: str = DEFAULT_ITEM_TYPE) -> Optional[PromptTemplate]:
+        """Most specific template for (site, item type), falling back to Item and the default site."""
+        for candidate_site, candidate_type in self._candidates(site, item_type):
+            template = self.prompts.get((candidate_site, candidate_type, name))
+            if template is not None:
+                return template
+        return None
+
+    def get_tools(self, site: str = DEFAULT_SITE, item_type: str = DEFAULT_ITEM_TYPE) -> List[ToolDefinition]:
+        """Enabled tools for (site, item type); more specific definitions override by name."""
+        tools: Dict[str, ToolDefinition] = {}
+        for key in reversed(self._candidates(site, item_type)):
+            for tool in self.tools.get(key, []):
+                tools[tool.name] = tool
+        return [tool for tool in tools.values() if tool.enabled]
+
+    def tools_prefix(self, site: str = DEFAULT_SITE, item_type: str = DEFAULT_ITEM_TYPE) -> str:
+        """
+        Deterministic rendering of the tool definitions (sorted, compact JSON) to place
+        in the stable part of a prompt; identical input always yields identical bytes.
+        """
+        key = (site, item_type)
+        prefix = self._tools_prefix_cache.get(key)
+        if prefix is None:
+            definitions = [
+                {"name": tool.name, "examples": tool.examples, "returns": tool.return_struc}
+                for tool in sorted(self.get_tools(site, item_type), key=lambda t: t.name)
+            ]
+            prefix = self._tools_prefix_cache[key] = json.dumps(
+                definitions, ensure_ascii=False, sort_keys=True, separators=(",", ":")
+            )
+        return prefix
+
+
+_registry: Optional[PromptRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_prompt_registry() -> PromptRegistry:
+    """Return the process-wide registry, parsing the XML files on first use."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = PromptRegistry(
+                    os.path.join(CONFIG.config_directory, "prompts.xml"),
+                    os.path.join(CONFIG.config_directory, "tools.xml"),
+                )
+    return _registry
+
+
+def get_prompt(name: str, site: str = DEFAULT_SITE, item_type: str = DEFAULT_ITEM_TYPE) -> Optional[PromptTemplate]:
+    return get_prompt_registry().get_prompt(name, site, item_type)
+
+
+def _usage_value(usage: Any, *path: str) -> int:
+    value = usage
+    for key in path:
+        if value is None:
+            return 0
+        value = value.get(key) if isinstance(value, dict) else getattr(value, key, None)
+    try:
+        return int(value or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def record_prompt_cache_usage(provider: str, usage: Any) -> None:
+    """
+    Record prompt-cache statistics from a provider's ``usage`` object.
+
+    Understands OpenAI/Azure/Qwen (``prompt_tokens_details.cached_tokens``), DeepSeek
+    (``prompt_cache_hit_tokens``) and Anthropic (``cache_read_input_tokens``) usage.
+    """
+    if usage is None:
+        return
+    if _usage_value(usage, "input_tokens") or _usage_value(usage, "cache_read_input_tokens"):
+        # Anthropic: input_tokens excludes cache reads and cache writes
+        cached = _usage_value(usage, "cache_read_input_tokens")
+        prompt_tokens = (_usage_value(usage, "input_tokens") + cached
+                         + _usage_value(usage, "cache_creation_input_tokens"))
+    else:
+        prompt_tokens = _usage_value(usage, "prompt_tokens")
+        cached = (_usage_value(usage, "prompt_tokens_details", "cached_tokens")
+                  or _usage_value(usage, "prompt_cache_hit_tokens"))
+    if not prompt_tokens:
+        return
+
+    labels = {"provider": provider}
+    metrics.inc("llm.prompt_cache.prompt_tokens", prompt_tokens, labels)
+    metrics.inc("llm.prompt_cache.cached_tokens", cached, labels)
+    total = metrics.get_counter("llm.prompt_cache.prompt_tokens", labels)
+    hits = metrics.get_counter("llm.prompt_cache.cached_tokens", labels)
+    metrics.set_gauge("llm.prompt_cache.hit_rate", round(hits / total, 4) if total else 0.0, labels)
@@ -0,0 +1,143 @@
+"""
+Handoff of LLM-rewritten queries from the request handler to retrieval clients.
+
+The handler rewrites the user query with an LLM while retrieval is already running.
+Instead of retrieval clients polling ``handler.rewritten_queries``, the handler
+publishes the rewrite with ``set_rewritten_queries`` and clients await it through
+``speculative_search``: retrieval on the original query starts immediately, the
+rewritten-query retrievals are merged in once the rewrite arrives, and the
+speculative search is cancelled if the rewrite drops the original query.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, List, Optional
+
+from app.core.logger.logging_config_helper import get_configured_logger
+
+logger = get_configured_logger("query_rewrite")
+
+# Default time retrieval waits for the rewrite before going with the original query
+DEFAULT_REWRITE_TIMEOUT = 10.0
+
+_HANDOFF_ATTR = "_rewritten_queries_future"
+
+SearchFn = Callable[[str, int], Awaitable[List[List[str]]]]
+
+
+def _get_future(handler: Any) -> asyncio.Future:
+    future = getattr(handler, _HANDOFF_ATTR, None)
+    if future is None:
+        future = asyncio.get_running_loop().create_future()
+        setattr(handler, _HANDOFF_ATTR, future)
+    return future
+
+
+def set_rewritten_queries(handler: Any, queries: Optional[List[str]]) -> None:
+    """
+    Publish the rewritten queries (None if rewriting failed) and wake every waiter.
+
+    ``handler.rewritten_queries`` is still set for code that reads the attribute.
+    """
+    handler.rewritten_queries = queries
+    future = _get_future(handler)
+    if not future.done():
+        future.set_result(queries)
+
+
+async def wait_for_rewritten_queries(
+    handler: Any,
+    timeout: float = DEFAULT_REWRITE_TIMEOUT
+) -> Optional[List[str]]:
+    """Wait for the handler's rewritten queries; None on timeout or if there is no rewrite."""
+    if handler is None:
+        return None
+    if hasattr(handler, "rewritten_queries"):
+        return handler.rewritten_queries
+    try:
+        # shield: a timed-out waiter must not cancel the shared future for the others
+        return await asyncio.wait_for(asyncio.shield(_get_future(handler)), timeout=timeout)
+    except asyncio.TimeoutError:
+        logger.warning(f"Timeout waiting for rewritten_queries after {timeout}s")
+        return None
+
+
+def _normalize(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+def _merge(result_lists: List[List[List[str]]], num_results: int) -> List[List[str]]:
+    """Concatenate per-query results in query order, deduplicating by URL."""
+    merged: List[List[str]] = []
+    seen_urls = set()
+    for results in result_lists:
+        for item in results or []:
+            url = item[0] if item else None
+            if url and url not in seen_urls:
+                seen_urls.add(url)
+                merged.append(item)
+    return merged[:num_results]
+
+
+async def speculative_search(
+    query: str,
+    handler: Any,
+    search_fn: SearchFn,
+    num_results: int,
+    timeout: float = DEFAULT_REWRITE_TIMEOUT
+) -> List[List[str]]:
+    """
+    Search the original query right away and merge in rewritten-query searches.
+
+    Args:
+        query: Original user query
+        handler: Request handler that publishes rewritten queries (may be None)
+        search_fn: ``search_fn(query, num_results)`` performing one retrieval
+        num_results: Total number of results wanted
+        timeout: Maximum time to wait for the rewrite
+
+    Returns:
+        Merged results; the original query's results if there is no useful rewrite
+    """
+    original = asyncio.create_task(search_fn(query, num_results))
+    try:
+        rewritten = await wait_for_rewritten_queries(handler, timeout) if handler is not None else None
+        # A single rewrite is treated like no rewrite: the original query stands
+        if not rewritten or len(rewritten) <= 1:
+            return await original
+
+        logger.info(f"Merging {len(rewritten)} rewritten queries into search for '{query}'")
+        per_query = max(1, num_results // len(rewritten))
+        remainder = num_results % len(rewritten)
+        original_key = _normalize(query)
+        original_kept = any(_normalize(q) == original_key for q in rewritten)
+        if not original_kept and not original.done():
+            # The rewrite replaced the original query: stop the speculative search
+            original.cancel()
+
+        tasks = []
+        shares = []
+        for i, rewritten_query in enumerate(rewritten):
+            share = per_query + (1 if i < remainder else 0)
+            shares.append(share)
+            if original_kept and _normalize(rewritten_query) == original_key:
+                tasks.append(original)
+            else:
+                tasks.append(asyncio.create_task(search_fn(rewritten_query, share)))
+
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        result_lists = []
+        for rewritten_query, share, result in zip(rewritten, shares, results):
+            if isinstance(result, BaseException):
+                logger.warning(f"Search failed for rewritten query '{rewritten_query}': {result}")
+            elif result:
+                # The original search asked for num_results; keep only its share
+                result_lists.append(result[:share])
+
+        merged = _merge(result_lists, num_results)
+        if not merged and original.done() and not original.cancelled() and original.exception() is None:
+            # Rewritten searches came back empty: fall back to what the original query found
+            return original.result()[:num_results]
+        return merged
+    finally:
+        if not original.done():
+            original.cancel()
@@ -0,0 +1,86 @@
+"""
+Native reasoning capture for reasoning models (DeepSeek-R1, Qwen thinking models, ...).
+
+Reasoning models return their chain of thought on a separate channel -
+``reasoning_content`` deltas on OpenAI-compatible streams, or a leading
+``<think>...</think>`` block in the content on some deployments (Azure DeepSeek-R1).
+``consume_chat_stream`` collects the answer and the reasoning from a streamed chat
+completion, so prompts no longer have to ask the model to repeat its reasoning
+inside the JSON answer.
+
+Stored reasoning is truncated (``truncate_reasoning``) according to the ``reasoning``
+block in config_llm.yaml and compressed by the ``CompressedText`` column type
+(``encode_reasoning`` / ``decode_reasoning`` in app.db.reasoning_codec, re-exported here).
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Any, Optional, Tuple
+
+from app.core.config import CONFIG
+from app.db.reasoning_codec import COMPRESSED_PREFIX, decode_reasoning, encode_reasoning  # noqa: F401
+
+_THINK_RE = re.compile(r"^\s*<think>(.*?)</think>\s*", re.S)
+
+
+@dataclass
+class StreamResult:
+    content: str
+    reasoning: Optional[str] = None
+    usage: Any = None
+
+
+def split_think_tags(content: str) -> Tuple[str, Optional[str]]:
+    """Split a leading ``<think>...</think>`` block off the content: (content, reasoning)."""
+    match = _THINK_RE.match(content)
+    if not match:
+        return content, None
+    return content[match.end():], match.group(1).strip() or None
+
+
+async def consume_chat_stream(stream, capture_reasoning: bool = True) -> StreamResult:
+    """
+    Read a streamed chat completion (``stream=True``) to the end.
+
+    Answer and reasoning deltas are accumulated separately; the usage chunk sent with
+    ``stream_options={"include_usage": True}`` is kept for prompt-cache metrics.
+    With ``capture_reasoning=False`` reasoning deltas are discarded as they arrive.
+    """
+    content_parts = []
+    reasoning_parts = []
+    usage = None
+    async for chunk in stream:
+        if getattr(chunk, "usage", None) is not None:
+            usage = chunk.usage
+        for choice in chunk.choices or []:
+            delta = choice.delta
+            if delta is None:
+                continue
+            if delta.content:
+                content_parts.append(delta.content)
+            if capture_reasoning:
+                # DeepSeek / DashScope / vLLM use reasoning_content, Ollama uses reasoning
+                reasoning = getattr(delta, "reasoning_content", None) or getattr(delta, "reasoning", None)
+                if reasoning:
+                    reasoning_parts.append(reasoning)
+
+    content, think = split_think_tags("".join(content_parts))
+    reasoning = "".join(reasoning_parts) or think
+    return StreamResult(content=content, reasoning=reasoning if capture_reasoning else None, usage=usage)
+
+
+def truncate_reasoning(text: Optional[str], max_chars: Optional[int] = None) -> Optional[str]:
+    """
+    Cap reasoning at ``max_chars`` characters, keeping the beginning and the end
+    (where the model reaches its conclusion) and marking what was cut.
+    """
+    if not text:
+        return None
+    policy = CONFIG.llm_reasoning
+    max_chars = policy.max_chars if max_chars is None else max_chars
+    if max_chars <= 0 or len(text) <= max_chars:
+        return text
+    head = min(policy.head_chars, max_chars)
+    tail = max_chars - head
+    omitted = len(text) - head - tail
+    return f"{text[:head]}\n...[{omitted} characters omitted]...\n{text[len(text) - tail:] if tail else ''}"
@@ -0,0 +1,46 @@
+"""
+Shared asyncio Redis client for application caches.
+
+Celery uses Redis through its own broker connection; this client is for request-path
+caching (e.g. the conversation message cache). One connection pool per process,
+created on first use and closed at application shutdown.
+"""
+
+import threading
+from typing import Optional
+
+import redis.asyncio as aioredis
+
+from app.core.config import CONFIG
+from app.core.logger.logging_config_helper import get_configured_logger
+
+logger = get_configured_logger("redis_client")
+
+_client: Optional[aioredis.Redis] = None
+_lock = threading.Lock()
+
+
+def get_redis() -> aioredis.Redis:
+    """Return the process-wide asyncio Redis client."""
+    global _client
+    with _lock:
+        if _client is None:
+            _client = aioredis.Redis(
+                host=CONFIG.redis.host or "localhost",
+                port=CONFIG.redis.port,
+                db=CONFIG.redis.db,
+                socket_connect_timeout=1.0,
+                socket_timeout=1.0,
+                health_check_interval=30
+            )
+            logger.info(f"Redis client created for {CONFIG.redis.host}:{CONFIG.redis.port}/{CONFIG.redis.db}")
+    return _client
+
+
+async def close_redis() -> None:
+    """Close the client's connection pool (application shutdown)."""
+    global _client
+    with _lock:
+        client, _client = _client, None
+    if client is not None:
+        await client.aclose()
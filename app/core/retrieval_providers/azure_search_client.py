@@ -31,6 +31,7 @@ from azure.search.documents.indexes.models import (
 from core.config import CONFIG
 from core.embedding import get_embedding
 from core.retriever import RetrievalClientBase
+from app.core.executors import run_blocking
 from misc.logger.logging_config_helper import get_configured_logger
 from misc.logger.logger import LogLevel
 
@@ -297,7 +298,7 @@ class AzureSearchClient(RetrievalClientBase):
                 return search_client.search("*", filter=filter_expression, 
                                            select="id", include_total_count=True)
             
-            search_results = await asyncio.get_event_loop().run_in_executor(None, search_sync)
+            search_results = await run_blocking("azure_search", search_sync)
             
             # Get the total count of matching documents
             total_matching = search_results.get_count()
@@ -321,7 +322,7 @@ class AzureSearchClient(RetrievalClientBase):
                     def delete_sync():
                         return search_client.delete_documents(batch)
                     
-                    await asyncio.get_event_loop().run_in_executor(None, delete_sync)
+                    await run_blocking("azure_search", delete_sync)
                     deleted_count += len(batch)
                     logger.info(f"Deleted batch of {len(batch)} documents")
                 
@@ -334,6 +335,39 @@ class AzureSearchClient(RetrievalClientBase):
             logger.error(f"Error deleting documents for site {site_value}: {str(e)}")
             return 0
     
+    async def delete_documents_by_ids(self, ids: List[str], 
+                                    index_name: Optional[str] = None) -> int:
+        """
+        Delete documents from the index by their key.
+        
+        Args:
+            ids: Document ids
+            index_name: Optional index name (defaults to configured index name)
+            
+        Returns:
+            int: Number of documents deleted
+        """
+        if not ids:
+            return 0
+        
+        index_name = index_name or self.default_index_name
+        search_client = self._get_search_client(index_name)
+        
+        # Delete documents in batches
+        batch_size = 1000
+        deleted_count = 0
+        for i in range(0, len(ids), batch_size):
+            batch = [{"id": doc_id} for doc_id in ids[i:i+batch_size]]
+            
+            def delete_sync():
+                return search_client.delete_documents(batch)
+            
+            await run_blocking("azure_search", delete_sync)
+            deleted_count += len(batch)
+        
+        logger.info(f"Deleted {deleted_count} documents by id from '{index_name}'")
+        return deleted_count
+    
     async def upload_documents(self, documents: List[Dict[str, Any]], 
                              index_name: Optional[str] = None) -> int:
         """
@@ -376,7 +410,7 @@ class AzureSearchClient(RetrievalClientBase):
             def upload_sync():
                 return search_client.upload_documents(documents)
             
-            await asyncio.get_event_loop().run_in_executor(None, upload_sync)
+            await run_blocking("azure_search", upload_sync)
             
             # Log the API endpoint and index where data was loaded
             logger.info(f"Successfully uploaded {len(documents)} documents to Azure AI Search")
@@ -478,7 +512,7 @@ class AzureSearchClient(RetrievalClientBase):
             def search_sync():
                 return search_client.search(search_text=None, **search_options)
             
-            results = await asyncio.get_event_loop().run_in_executor(None, search_sync)
+            results = await run_blocking("azure_search", search_sync)
             
             # Process results into a more convenient format
             processed_results = []
@@ -533,7 +567,7 @@ class AzureSearchClient(RetrievalClientBase):
             def search_sync():
                 return search_client.search(search_text=None, **search_options)
             
-            results = await asyncio.get_event_loop().run_in_executor(None, search_sync)
+            results = await run_blocking("azure_search", search_sync)
             
             for result in results:
                 logger.info(f"Successfully retrieved item for URL: {url}")
@@ -604,7 +638,7 @@ class AzureSearchClient(RetrievalClientBase):
             def search_sync():
                 return search_client.search(search_text=None, **search_options)
             
-            results = await asyncio.get_event_loop().run_in_executor(None, search_sync)
+            results = await run_blocking("azure_search", search_sync)
             
             # Process results into a more convenient format
             processed_results = []
@@ -656,7 +690,7 @@ class AzureSearchClient(RetrievalClientBase):
                 result = search_client.search(**search_options)
                 return result
             
-            results = await asyncio.get_event_loop().run_in_executor(None, search_sync)
+            results = await run_blocking("azure_search", search_sync)
             
             # Extract unique sites from facets
             sites = []
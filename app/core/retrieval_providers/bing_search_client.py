@@ -14,6 +14,7 @@ from typing import List, Dict, Any, Optional, Union
 from urllib.parse import urlparse, quote
 from core.config import CONFIG
 from core.retriever import RetrievalClientBase
+from app.core.query_rewrite import speculative_search
 from app.core.logger.logging_config_helper import get_configured_logger
 
 logger = get_configured_logger("bing_search_client")
@@ -329,93 +330,23 @@ class BingSearchClient(RetrievalClientBase):
             if isinstance(extract_product_info, str):
                 extract_product_info = extract_product_info.lower() not in ['false', '0', 'no']
             
-            # Check if we have pre-computed rewritten queries from the handler
-            handler = kwargs.get('handler')
-            
-            # Wait for rewritten_queries to be available if handler exists
-            if handler:
-                max_wait = 10  # Maximum wait time in seconds
-                wait_interval = 0.1  # Check every 100ms
-                waited = 0
-                
-                while not hasattr(handler, 'rewritten_queries') and waited < max_wait:
-                    await asyncio.sleep(wait_interval)
-                    waited += wait_interval
-                
-                if waited >= max_wait:
-                    logger.warning(f"Timeout waiting for rewritten_queries after {max_wait}s")
-            
-            rewritten_queries = getattr(handler, 'rewritten_queries', None) if handler else None
-            
-            # Use rewritten queries if available and multiple queries exist
-            if rewritten_queries and len(rewritten_queries) > 1:
-                logger.info(f"Using {len(rewritten_queries)} rewritten queries for Bing search: {rewritten_queries}")
-                
-                # Calculate results per query to maintain total count
-                results_per_query = max(1, num_results // len(rewritten_queries))
-                remainder = num_results % len(rewritten_queries)
-                
-                # Execute searches for each rewritten query in parallel
-                tasks = []
-                for i, rewritten_query in enumerate(rewritten_queries):
-                    # Add remainder to first queries
-                    query_results = results_per_query + (1 if i < remainder else 0)
-                    
-                    # Handle multiple sites
-                    if isinstance(site, list):
-                        # For multiple sites, divide results among sites for this query
-                        for single_site in site:
-                            site_results_count = max(1, query_results // len(site))
-                            task = asyncio.create_task(
-                                self._search_single_site(rewritten_query, single_site, site_results_count,
-                                                       extract_product_info=extract_product_info)
-                            )
-                            tasks.append(task)
-                    else:
-                        # Single site
-                        task = asyncio.create_task(
-                            self._search_single_site(rewritten_query, site, query_results,
-                                                   extract_product_info=extract_product_info)
-                        )
-                        tasks.append(task)
-                
-                # Execute all searches in parallel
-                all_results = await asyncio.gather(*tasks, return_exceptions=True)
-                
-                # Combine results, filtering out errors and deduplicating by URL
-                combined_results = []
-                seen_urls = set()
-                
-                for result in all_results:
-                    if isinstance(result, Exception):
-                        logger.warning(f"Search failed for a rewritten query: {result}")
-                    elif result:
-                        for item in result:
-                            url = item[0] if item else None
-                            if url and url not in seen_urls:
-                                seen_urls.add(url)
-                                combined_results.append(item)
-                
-                # Limit to requested number of results
-                return combined_results[:num_results]
-            
-            # No rewritten queries - use original query
-            # Handle multiple sites
-            if isinstance(site, list):
-                # For multiple sites, perform separate searches and combine results
-                all_results = []
-                results_per_site = max(10, num_results // len(site))
-                
-                for single_site in site:
-                    site_results = await self._search_single_site(query, single_site, results_per_site,
-                                                                 extract_product_info=extract_product_info)
-                    all_results.extend(site_results)
-                
-                # Limit to requested number of results
-                return all_results[:num_results]
-            else:
-                return await self._search_single_site(query, site, num_results,
-                                                     extract_product_info=extract_product_info)
+            async def search_query(search_query: str, count: int) -> List[List[str]]:
+                # Handle multiple sites
+                if isinstance(site, list):
+                    # For multiple sites, perform the site searches in parallel and combine results
+                    per_site = max(1, count // len(site))
+                    site_results = await asyncio.gather(*(
+                        self._search_single_site(search_query, single_site, per_site,
+                                                 extract_product_info=extract_product_info)
+                        for single_site in site
+                    ))
+                    return [item for results in site_results for item in results][:count]
+                return await self._search_single_site(search_query, site, count,
+                                                      extract_product_info=extract_product_info)
+
+            # Start on the original query right away; rewritten queries from the
+            # handler (if any) are merged in as soon as they are published
+            return await speculative_search(query, kwargs.get('handler'), search_query, num_results)
                 
         except Exception as e:
             logger.error(f"Error in Bing search: {e}")
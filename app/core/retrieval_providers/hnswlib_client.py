@@ -20,6 +20,7 @@ except ImportError:
 from core.config import CONFIG
 from core.embedding import get_embedding
 from core.retriever import RetrievalClientBase
+from app.core.executors import run_blocking
 from misc.logger.logging_config_helper import get_configured_logger
 from misc.logger.logger import LogLevel
 
@@ -228,6 +229,22 @@ class HnswlibClient(RetrievalClientBase):
                       f"Rebuild index using 'python -m tools.build_hnswlib_index'")
         return 0
     
+    async def delete_documents_by_ids(self, ids: List[str], **kwargs) -> int:
+        """
+        Delete documents by id - NOT SUPPORTED for HNSW.
+        Index must be rebuilt using build_hnswlib_index.py.
+        
+        Args:
+            ids: Document ids
+            **kwargs: Additional parameters
+            
+        Returns:
+            0 (operation not supported)
+        """
+        logger.warning(f"delete_documents_by_ids not supported for HNSW. "
+                      f"Rebuild index using 'python -m tools.build_hnswlib_index'")
+        return 0
+    
     async def upload_documents(self, documents: List[Dict[str, Any]], **kwargs) -> int:
         """
         Upload documents - NOT SUPPORTED for HNSW.
@@ -295,7 +312,7 @@ class HnswlibClient(RetrievalClientBase):
             labels, distances = self.index.knn_query([embedding], k=k)
             return labels[0], distances[0]  # Return first (and only) query results
         
-        labels, distances = await asyncio.get_event_loop().run_in_executor(None, search_sync)
+        labels, distances = await run_blocking("hnswlib", search_sync)
         
         # Filter results by site and format output
         results = []
@@ -375,7 +392,7 @@ class HnswlibClient(RetrievalClientBase):
             labels, distances = self.index.knn_query([embedding], k=num_results)
             return labels[0], distances[0]  # Return first (and only) query results
         
-        labels, distances = await asyncio.get_event_loop().run_in_executor(None, search_sync)
+        labels, distances = await run_blocking("hnswlib", search_sync)
         
         # Format results
         results = []
@@ -7,6 +7,7 @@ Milvus Vector Database Client - Interface for Milvus operations.
 
 import os
 import sys
+import hashlib
 import threading
 import asyncio
 import json
@@ -18,11 +19,26 @@ import numpy as np
 from core.config import CONFIG
 from core.embedding import get_embedding
 from core.retriever import RetrievalClientBase
+from app.core.executors import run_blocking
 from misc.logger.logging_config_helper import get_configured_logger
 from misc.logger.logger import LogLevel
 
 logger = get_configured_logger("milvus_client")
 
+
+def _entity_id(doc_id: Any) -> int:
+    """
+    Map a document id to the collection's INT64 primary key.
+
+    Numeric ids are kept as-is; other ids (e.g. "{document_id}_{hash}" chunk ids or
+    "message_{id}" history ids) are hashed to a deterministic non-negative int64, so
+    upload and delete always resolve the same id to the same entity.
+    """
+    if isinstance(doc_id, int) or str(doc_id).isdigit():
+        return int(doc_id)
+    digest = hashlib.sha256(str(doc_id).encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") & 0x7FFFFFFFFFFFFFFF
+
 class MilvusVectorClient(RetrievalClientBase):
     """
     Client for Milvus vector database operations, providing a unified interface for 
@@ -210,8 +226,8 @@ class MilvusVectorClient(RetrievalClientBase):
         
         try:
             # Run the delete operation asynchronously
-            return await asyncio.get_event_loop().run_in_executor(
-                None, self._delete_documents_by_site_sync, site, collection_name, client
+            return await run_blocking(
+                "milvus", self._delete_documents_by_site_sync, site, collection_name, client
             )
         except Exception as e:
             logger.error(f"Error deleting documents for site {site}: {str(e)}")
@@ -252,6 +268,36 @@ class MilvusVectorClient(RetrievalClientBase):
             logger.error(f"Error in _delete_documents_by_site_sync for site {site}: {str(e)}")
             raise
     
+    async def delete_documents_by_ids(self, ids: List[str],
+                                    collection_name: Optional[str] = None,
+                                    embedding_size: str = "small") -> int:
+        """
+        Delete entities by the document ids they were uploaded with.
+        
+        Args:
+            ids: Document ids
+            collection_name: Optional collection name (defaults to configured name)
+            embedding_size: Size of embeddings ("small"=1536 or "large"=3072)
+            
+        Returns:
+            int: Number of documents deleted
+        """
+        if not ids:
+            return 0
+        collection_name = collection_name or self.default_collection_name
+        client = self._get_milvus_client(embedding_size)
+        
+        if not client.has_collection(collection_name):
+            logger.warning(f"Collection '{collection_name}' does not exist")
+            return 0
+        
+        entity_ids = [_entity_id(doc_id) for doc_id in ids]
+        await run_blocking(
+            "milvus", lambda: client.delete(collection_name=collection_name, ids=entity_ids)
+        )
+        logger.info(f"Deleted {len(entity_ids)} entities by id from '{collection_name}'")
+        return len(entity_ids)
+    
     async def upload_documents(self, documents: List[Dict[str, Any]], 
                              collection_name: Optional[str] = None,
                              embedding_size: str = "small") -> int:
@@ -275,8 +321,8 @@ class MilvusVectorClient(RetrievalClientBase):
         self.ensure_collection_exists(collection_name, embedding_size)
         
         # Run the upload operation asynchronously
-        return await asyncio.get_event_loop().run_in_executor(
-            None, self._upload_documents_sync, documents, collection_name, embedding_size
+        return await run_blocking(
+            "milvus", self._upload_documents_sync, documents, collection_name, embedding_size
         )
     
     def _upload_documents_sync(self, documents: List[Dict[str, Any]], 
@@ -292,7 +338,7 @@ class MilvusVectorClient(RetrievalClientBase):
                 continue
                 
             milvus_docs.append({
-                "id": int(doc["id"]) if isinstance(doc["id"], (int, str)) else doc["id"],
+                "id": _entity_id(doc["id"]),
                 "vector": doc["embedding"],
                 "text": doc["schema_json"],
                 "url": doc["url"],
@@ -333,8 +379,8 @@ class MilvusVectorClient(RetrievalClientBase):
             logger.debug(f"Generated embedding with dimension: {len(embedding)}")
             
             # Run the search operation asynchronously
-            results = await asyncio.get_event_loop().run_in_executor(
-                None, self._search_sync, query, site, num_results, embedding, collection_name, query_params
+            results = await run_blocking(
+                "milvus", self._search_sync, query, site, num_results, embedding, collection_name, query_params
             )
             
             logger.info(f"Milvus search completed successfully, found {len(results)} results")
@@ -430,8 +476,8 @@ class MilvusVectorClient(RetrievalClientBase):
         
         try:
             # Run the search by URL operation asynchronously
-            return await asyncio.get_event_loop().run_in_executor(
-                None, self._search_by_url_sync, url, collection_name
+            return await run_blocking(
+                "milvus", self._search_by_url_sync, url, collection_name
             )
         except Exception as e:
             logger.exception(f"Error retrieving item with URL: {url}")
@@ -508,8 +554,8 @@ class MilvusVectorClient(RetrievalClientBase):
         
         try:
             # Run the get_sites operation asynchronously
-            return await asyncio.get_event_loop().run_in_executor(
-                None, self._get_sites_sync, collection_name, embedding_size
+            return await run_blocking(
+                "milvus", self._get_sites_sync, collection_name, embedding_size
             )
         except Exception as e:
             logger.exception(f"Error retrieving sites from collection '{collection_name}': {str(e)}")
@@ -273,6 +273,41 @@ class PgVectorClient(RetrievalClientBase):
             logger.exception(f"Error deleting documents for site {site}: {e}")
             raise
     
+    async def delete_documents_by_ids(self, ids: List[str], **kwargs) -> int:
+        """
+        Delete documents by id.
+        
+        Args:
+            ids: Document ids
+            **kwargs: Additional parameters
+            
+        Returns:
+            Number of documents deleted
+        """
+        if not ids:
+            return 0
+        logger.info(f"Deleting {len(ids)} documents by id")
+        
+        async def _delete_docs(conn):
+            async with conn.cursor() as cur:
+                await cur.execute(
+                    f"DELETE FROM {self.table_name} WHERE id = ANY(%s)",
+                    (list(ids),)
+                )
+                
+                # Get count of deleted rows
+                count = cur.rowcount
+                await conn.commit()
+                return count
+        
+        try:
+            count = await self._execute_with_retry(_delete_docs)
+            logger.info(f"Successfully deleted {count} documents by id")
+            return count
+        except Exception as e:
+            logger.exception(f"Error deleting documents by id: {e}")
+            raise
+    
     async def upload_documents(self, documents: List[Dict[str, Any]], **kwargs) -> int:
         """
         Upload documents to the database.
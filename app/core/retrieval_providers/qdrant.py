@@ -371,6 +371,39 @@ class QdrantVectorClient(RetrievalClientBase):
 
         return count
 
+    async def delete_documents_by_ids(
+        self, ids: List[str], collection_name: Optional[str] = None
+    ) -> int:
+        """
+        Delete points by the document ids they were uploaded with.
+
+        Args:
+            ids: Document ids (mapped to point ids the same way as upload_documents)
+            collection_name: Optional collection name (defaults to configured name)
+
+        Returns:
+            int: Number of documents deleted
+        """
+        if not ids:
+            return 0
+        collection_name = collection_name or self.default_collection_name
+        client = await self._get_qdrant_client()
+
+        if not await client.collection_exists(collection_name):
+            logger.warning(
+                f"Collection '{collection_name}' does not exist. No points to delete."
+            )
+            return 0
+
+        point_ids = [str(uuid.uuid5(uuid.NAMESPACE_URL, str(doc_id))) for doc_id in ids]
+        await client.delete(
+            collection_name=collection_name,
+            points_selector=models.PointIdsList(points=point_ids)
+        )
+        logger.info(f"Deleted {len(point_ids)} points by id")
+
+        return len(point_ids)
+
     async def upload_documents(self, documents: List[Dict[str, Any]], 
                              collection_name: Optional[str] = None) -> int:
         """
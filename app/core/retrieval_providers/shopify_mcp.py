@@ -14,6 +14,7 @@ from typing import List, Dict, Optional, Any, Union
 
 from core.config import CONFIG
 from core.retriever import RetrievalClientBase
+from app.core.query_rewrite import speculative_search
 from misc.logger.logging_config_helper import get_configured_logger
 
 logger = get_configured_logger("shopify_mcp")
@@ -75,60 +76,14 @@ class ShopifyMCPClient(RetrievalClientBase):
             logger.error("No site specified for Shopify MCP search")
             return []
         
-        # Check if we have pre-computed rewritten queries from the handler
-        handler = kwargs.get('handler')
-        
-        # Wait for rewritten_queries to be available if handler exists
-        if handler:
-            max_wait = 10  # Maximum wait time in seconds
-            wait_interval = 0.1  # Check every 100ms
-            waited = 0
-            
-            while not hasattr(handler, 'rewritten_queries') and waited < max_wait:
-                await asyncio.sleep(wait_interval)
-                waited += wait_interval
-            
-            if waited >= max_wait:
-                logger.warning(f"Timeout waiting for rewritten_queries after {max_wait}s")
-        
-        rewritten_queries = getattr(handler, 'rewritten_queries', None) if handler else None
-        
-        # Use rewritten queries if available and multiple queries exist
-        if rewritten_queries and len(rewritten_queries) > 1:
-            logger.info(f"Using {len(rewritten_queries)} rewritten queries for Shopify search: {rewritten_queries}")
-            
-            # Calculate results per query to maintain total count
-            results_per_query = max(1, num_results // len(rewritten_queries))
-            remainder = num_results % len(rewritten_queries)
-            
-            # Execute searches for each rewritten query in parallel
-            tasks = []
-            for i, rewritten_query in enumerate(rewritten_queries):
-                # Add remainder to first queries
-                query_results = results_per_query + (1 if i < remainder else 0)
-                # Create a task for each rewritten query
-                task = asyncio.create_task(
-                    self._search_single_query(rewritten_query, site, query_results)
-                )
-                tasks.append(task)
-            
-            # Execute all searches in parallel
-            all_results = await asyncio.gather(*tasks, return_exceptions=True)
-            
-            # Combine results, filtering out errors
-            combined_results = []
-            for i, result in enumerate(all_results):
-                if isinstance(result, Exception):
-                    logger.warning(f"Search failed for rewritten query '{rewritten_queries[i]}': {result}")
-                elif result:
-                    combined_results.extend(result)
-            
-            # Limit to requested number of results
-            return combined_results[:num_results]
-        
-        # No rewritten queries - use original query
-        result = await self._search_single_query(query, site, num_results)
-        return result
+        # Start on the original query right away; rewritten queries from the
+        # handler (if any) are merged in as soon as they are published
+        return await speculative_search(
+            query,
+            kwargs.get('handler'),
+            lambda search_query, count: self._search_single_query(search_query, site, count),
+            num_results
+        )
     
     async def _search_single_query(self, query: str, site: str, num_results: int) -> List[List[str]]:
         """
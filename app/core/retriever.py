@@ -185,6 +185,22 @@ class VectorDBClientInterface(ABC):
         """
         pass
     
+    async def delete_documents_by_ids(self, ids: List[str], **kwargs) -> int:
+        """
+        Delete documents by the ids they were uploaded with.
+        
+        Args:
+            ids: Document ids (the "id" field of uploaded documents)
+            **kwargs: Additional parameters
+            
+        Returns:
+            Number of documents deleted
+            
+        Note:
+            Backends that don't support deleting by id raise NotImplementedError.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support deleting documents by id")
+    
     @abstractmethod
     async def search(self, query: str, site: Union[str, List[str]], 
                     num_results: int = 50, **kwargs) -> List[List[str]]:
@@ -757,6 +773,44 @@ class VectorDBClient:
                 )
                 raise
     
+    async def delete_documents_by_ids(self, ids: List[str], **kwargs) -> int:
+        """
+        Delete documents by id from the write endpoint.
+        
+        Args:
+            ids: Document ids (the "id" field of uploaded documents)
+            **kwargs: Additional parameters
+            
+        Returns:
+            Number of documents deleted
+        """
+        if not self.write_endpoint:
+            raise ValueError("No write endpoint configured for delete operations")
+        if not ids:
+            return 0
+            
+        async with self._retrieval_lock:
+            logger.info(f"Deleting {len(ids)} documents by id using write endpoint: {self.write_endpoint}")
+            
+            try:
+                client = await self.get_client(self.write_endpoint)
+                count = await client.delete_documents_by_ids(ids, **kwargs)
+                logger.info(f"Successfully deleted {count} documents by id")
+                return count
+            except Exception as e:
+                logger.exception(f"Error deleting documents by id: {e}")
+                logger.log_with_context(
+                    LogLevel.ERROR,
+                    "Document deletion failed",
+                    {
+                        "error_type": type(e).__name__,
+                        "error_message": str(e),
+                        "document_count": len(ids),
+                        "endpoint": self.write_endpoint
+                    }
+                )
+                raise
+    
     async def upload_documents(self, documents: List[Dict[str, Any]], **kwargs) -> int:
         """
         Upload documents to the database.
@@ -1239,6 +1293,29 @@ async def upload_documents(documents: List[Dict[str, Any]],
     return await client.upload_documents(documents, **kwargs)
 
 
+async def delete_documents_by_ids(ids: List[str],
+                                 endpoint_name: Optional[str] = None,
+                                 query_params: Optional[Dict[str, Any]] = None,
+                                 **kwargs) -> int:
+    """
+    Delete documents by id from the database using the configured write endpoint.
+    
+    Args:
+        ids: Document ids (the "id" field of uploaded documents)
+        endpoint_name: Optional name of the endpoint to use (overrides write_endpoint)
+        query_params: Optional query parameters for overriding endpoint
+        **kwargs: Additional parameters passed to the delete_documents_by_ids method
+        
+    Returns:
+        Number of documents deleted
+        
+    Example:
+        count = await delete_documents_by_ids(["12_3f2a...", "12_9b1c..."])
+    """
+    client = get_vector_db_client(endpoint_name=endpoint_name, query_params=query_params)
+    return await client.delete_documents_by_ids(ids, **kwargs)
+
+
 async def delete_documents_by_site(site: str,
                                   endpoint_name: Optional[str] = None,
                                   query_params: Optional[Dict[str, Any]] = None,
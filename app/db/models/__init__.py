@@ -7,6 +7,7 @@ from .role import RoleModel, FunctionPermissionModel, RolePermissionModel
 from .document_category import DocumentCategory
 from .document_info import DocumentInfo
 from .document_settings import DocumentSettings
+from .document_chunk import DocumentChunk
 
 __all__ = [
     "Base",
@@ -22,5 +23,6 @@ __all__ = [
     "LlmConfigurationModel",    
     "DocumentCategory",
     "DocumentInfo",
-    "DocumentSettings"
+    "DocumentSettings",
+    "DocumentChunk"
 ]
\ No newline at end of file
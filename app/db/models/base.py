@@ -2,8 +2,10 @@ from __future__ import annotations
 from datetime import datetime, timezone
 from typing import Optional
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
-from sqlalchemy import DateTime, String
+from sqlalchemy import DateTime, String, Text, inspect
 from sqlalchemy.orm import declared_attr
+from sqlalchemy.types import TypeDecorator
+from app.db.reasoning_codec import encode_reasoning, decode_reasoning
 
 class Base(DeclarativeBase):
     """
@@ -23,6 +25,13 @@ class Base(DeclarativeBase):
             return cls.__name__[:-5].lower()
         return cls.__name__.lower()
 
+    def to_dict(self) -> dict:
+        """
+        列字段字典，用于构建响应模型（代替 __dict__：不含 _sa_instance_state，
+        也不会漏掉已过期/未加载的字段）
+        """
+        return {attr.key: getattr(self, attr.key) for attr in inspect(self).mapper.column_attrs}
+
 class TimestampMixin:
     """
     时间戳Mixin，包含创建时间和更新时间
@@ -35,4 +44,17 @@ class OperatorMixin:
     操作者Mixin，包含创建人和更新人
     """
     create_by: Mapped[str] = mapped_column(String(100), nullable=False, comment='创建人')
-    update_by: Mapped[Optional[str]] = mapped_column(String(100), nullable=True, comment='更新人')
\ No newline at end of file
+    update_by: Mapped[Optional[str]] = mapped_column(String(100), nullable=True, comment='更新人')
+
+class CompressedText(TypeDecorator):
+    """
+    压缩存储的长文本（如推理文本），读写时透明压缩/解压，未压缩的旧数据原样读取
+    """
+    impl = Text
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return encode_reasoning(value)
+
+    def process_result_value(self, value, dialect):
+        return decode_reasoning(value)
@@ -1,6 +1,6 @@
 from __future__ import annotations
 from typing import TYPE_CHECKING, List
-from sqlalchemy import Column, BigInteger, String, ForeignKey
+from sqlalchemy import Column, BigInteger, String, ForeignKey, Index
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 from app.db.models.base import Base, TimestampMixin, OperatorMixin
 
@@ -20,10 +20,16 @@ class ConversationModel(Base, TimestampMixin, OperatorMixin):
     
     # 关联关系
     user: Mapped["UserModel"] = relationship(back_populates="conversations")
+    # 删除会话时消息由 ConversationService.delete 批量删除，ORM 不逐条加载子记录
     messages: Mapped[List["MessageModel"]] = relationship(
         back_populates="conversation", 
         lazy="dynamic", 
-        cascade="all, delete-orphan"
+        cascade="all, delete-orphan",
+        passive_deletes=True
     )
 
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # 用户会话列表按时间分页（keyset），InnoDB 二级索引自带主键 id
+        Index('idx_conversation_user_time', 'user_id', 'create_time'),
+        {'extend_existing': True}
+    )
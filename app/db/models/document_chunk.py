@@ -0,0 +1,20 @@
+from __future__ import annotations
+from datetime import datetime, timezone
+from sqlalchemy import String, BigInteger, DateTime, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+from app.db.models.base import Base
+
+class DocumentChunk(Base):
+    """文档分块清单：记录每个文档已写入向量库的分块（内容哈希 -> 向量ID），用于增量重建索引"""
+    __tablename__ = "ai_document_chunk"
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True, comment="主键")
+    document_id: Mapped[int] = mapped_column(BigInteger, nullable=False, comment="文档ID")
+    content_hash: Mapped[str] = mapped_column(String(64), nullable=False, comment="分块内容SHA-256")
+    vector_id: Mapped[str] = mapped_column(String(128), nullable=False, comment="向量库中的文档ID")
+    create_time: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=lambda: datetime.now(timezone.utc), comment='创建时间')
+
+    __table_args__ = (
+        UniqueConstraint('document_id', 'content_hash', name='uk_document_chunk_hash'),
+        {'extend_existing': True}
+    )
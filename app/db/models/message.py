@@ -1,9 +1,9 @@
 from __future__ import annotations
 from typing import TYPE_CHECKING
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, BigInteger, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, BigInteger, Text, ForeignKey, Index
 from sqlalchemy.orm import relationship, Mapped, mapped_column
-from app.db.models.base import Base, TimestampMixin, OperatorMixin
+from app.db.models.base import Base, TimestampMixin, OperatorMixin, CompressedText
 
 if TYPE_CHECKING:
     from .llm_configuration import LlmConfigurationModel
@@ -16,14 +16,20 @@ class MessageModel(Base, TimestampMixin, OperatorMixin):
     __tablename__ = "ai_message"
     
     id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True, comment='消息唯一ID')
-    conversation_id: Mapped[int] = mapped_column(BigInteger, ForeignKey('ai_conversation.id'), nullable=False, index=True, comment='所属对话ID')
+    conversation_id: Mapped[int] = mapped_column(BigInteger, ForeignKey('ai_conversation.id', ondelete='CASCADE'), nullable=False, index=True, comment='所属对话ID')
     llm_id: Mapped[int] = mapped_column(BigInteger, ForeignKey('ai_llm_configuration.id'), nullable=False, comment='大模型ID')
     question: Mapped[str] = mapped_column(Text, nullable=False, comment='用户提问')
     content: Mapped[str] = mapped_column(Text, nullable=False, comment='消息内容')
-    reasoning_content: Mapped[str | None] = mapped_column(Text, comment='推理文本')
+    reasoning_content: Mapped[str | None] = mapped_column(CompressedText, comment='推理文本（压缩存储）')
     
     # 关联关系
     llm_config: Mapped["LlmConfigurationModel"] = relationship(backref="messages")
     conversation: Mapped["ConversationModel"] = relationship(back_populates="messages")
 
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # 会话内按时间分页（keyset）
+        Index('idx_message_conversation_time', 'conversation_id', 'create_time', 'id'),
+        # 历史消息全文检索（ngram 分词支持中文）
+        Index('ft_message_question_content', 'question', 'content', mysql_prefix='FULLTEXT', mysql_with_parser='ngram'),
+        {'extend_existing': True}
+    )
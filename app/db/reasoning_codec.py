@@ -0,0 +1,34 @@
+"""
+推理文本的存储编码（CompressedText 列类型使用）
+
+只依赖标准库，模型层导入时不会加载 LLM 相关模块和配置。较长的推理文本以 zlib 压缩后
+base64 编码存储，并加 COMPRESSED_PREFIX 前缀；不带前缀的值（短文本或旧数据）按原文读取。
+"""
+
+import base64
+import zlib
+from typing import Optional
+
+# 压缩值的前缀；不带前缀的值按原文存储
+COMPRESSED_PREFIX = "~zlib~"
+# 短于该长度的推理文本不压缩
+COMPRESS_MIN_CHARS = 512
+# zlib 压缩级别
+COMPRESSION_LEVEL = 6
+
+
+def encode_reasoning(text: Optional[str]) -> Optional[str]:
+    """长度足够时压缩推理文本（压缩后更长则保留原文）"""
+    if not text or len(text) < COMPRESS_MIN_CHARS:
+        return text
+    compressed = COMPRESSED_PREFIX + base64.b64encode(
+        zlib.compress(text.encode("utf-8"), COMPRESSION_LEVEL)
+    ).decode("ascii")
+    return compressed if len(compressed) < len(text.encode("utf-8")) else text
+
+
+def decode_reasoning(value: Optional[str]) -> Optional[str]:
+    """encode_reasoning 的逆操作；未压缩的（旧）值原样返回"""
+    if not value or not value.startswith(COMPRESSED_PREFIX):
+        return value
+    return zlib.decompress(base64.b64decode(value[len(COMPRESSED_PREFIX):])).decode("utf-8")
@@ -1,17 +1,101 @@
-from typing import AsyncGenerator
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.orm import sessionmaker
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import AsyncGenerator, Callable, Iterator, Optional
+from sqlalchemy.ext.asyncio import AsyncSession, AsyncEngine, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from app.core import metrics
 from app.core.config import CONFIG as settings
-from sqlalchemy import text
-
-# 创建异步引擎
-engine = create_async_engine(
-    str(settings.mysql.uri),
-    echo=False,
-    pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20
-)
+from app.services import message_cache
+from sqlalchemy import event, exc, text
+
+# 只读会话标记（session.info），见 get_read_db
+READ_REPLICA = "read_replica"
+# 当前事务是否执行过写操作（session.info），见 get_db
+_HAS_WRITES = "has_writes"
+# 事务提交后执行的回调（session.info），见 call_after_commit
+_AFTER_COMMIT = "after_commit_callbacks"
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """
+    记录连接获取等待时间的连接池：db.pool.checkout_wait_seconds{engine=...}
+    （含池满时的排队等待和新建连接耗时），超时计入 db.pool.timeouts
+    """
+
+    def _do_get(self):
+        started = time.perf_counter()
+        labels = {"engine": self.logging_name}
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            metrics.inc("db.pool.timeouts", 1, labels)
+            raise
+        finally:
+            metrics.observe("db.pool.checkout_wait_seconds", time.perf_counter() - started, labels)
+
+def _create_engine(uri: str, name: str) -> AsyncEngine:
+    pool = settings.mysql.pool
+    engine = create_async_engine(
+        uri,
+        echo=False,
+        poolclass=TimedQueuePool,
+        pool_logging_name=name,
+        pool_pre_ping=pool.pre_ping,
+        pool_size=pool.size,
+        max_overflow=pool.max_overflow,
+        pool_recycle=pool.recycle,
+        pool_timeout=pool.timeout
+    )
+
+    def publish(dbapi_connection, connection_record, *args):
+        metrics.set_gauge("db.pool.checked_out", engine.sync_engine.pool.checkedout(), {"engine": name})
+
+    event.listen(engine.sync_engine, "checkout", publish)
+    event.listen(engine.sync_engine, "checkin", publish)
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+    return engine
+
+@dataclass
+class DbTimer:
+    """一次请求/操作内累计的数据库耗时"""
+    seconds: float = 0.0
+    statements: int = 0
+
+# 当前请求的数据库计时器（由 track_db_time 设置）
+_db_timer: ContextVar[Optional[DbTimer]] = ContextVar("db_timer", default=None)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    metrics.observe("db.query_seconds", elapsed)
+    timer = _db_timer.get()
+    if timer is not None:
+        timer.seconds += elapsed
+        timer.statements += 1
+
+@contextmanager
+def track_db_time(name: str) -> Iterator[DbTimer]:
+    """
+    统计代码块内执行的SQL语句数与数据库耗时，结束时记录到
+    db.<name>.seconds / db.<name>.statements 指标（/metrics 中可查看 p50）
+    """
+    timer = DbTimer()
+    token = _db_timer.set(timer)
+    try:
+        yield timer
+    finally:
+        _db_timer.reset(token)
+        metrics.observe(f"db.{name}.seconds", timer.seconds)
+        metrics.observe(f"db.{name}.statements", timer.statements)
+
+# 主库引擎（读写），配置了只读副本时另建副本引擎用于列表/详情查询
+engine = _create_engine(str(settings.mysql.uri), "primary")
+read_engine = _create_engine(settings.mysql.replica_uri, "replica") if settings.mysql.replica_uri else engine
 
 # 创建异步会话工厂
 AsyncSessionLocal = sessionmaker(
@@ -22,20 +106,85 @@ AsyncSessionLocal = sessionmaker(
     autoflush=False
 )
 
+# 只读会话工厂（绑定副本引擎，未配置副本时为主库）
+ReadSessionLocal = sessionmaker(
+    read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+    autocommit=False,
+    autoflush=False,
+    info={READ_REPLICA: read_engine is not engine}
+)
+
+def is_read_replica(db: AsyncSession) -> bool:
+    """会话是否读自副本（数据可能略滞后于主库，不应据此回填缓存）"""
+    return bool(db.info.get(READ_REPLICA))
+
+@event.listens_for(Session, "after_flush")
+def _after_flush(session, flush_context):
+    session.info[_HAS_WRITES] = True
+
+@event.listens_for(Session, "do_orm_execute")
+def _do_orm_execute(orm_execute_state):
+    # 批量 INSERT/UPDATE/DELETE 语句不经过 flush
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info[_HAS_WRITES] = True
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session):
+    session.info.pop(_HAS_WRITES, None)
+    for callback in session.info.pop(_AFTER_COMMIT, []):
+        callback()
+
+@event.listens_for(Session, "after_soft_rollback")
+def _after_rollback(session, previous_transaction):
+    session.info.pop(_HAS_WRITES, None)
+    session.info.pop(_AFTER_COMMIT, None)
+
+def has_pending_writes(db: AsyncSession) -> bool:
+    """会话中是否有未提交的写操作（含尚未 flush 的对象变更）"""
+    return bool(db.new or db.dirty or db.deleted or db.info.get(_HAS_WRITES))
+
+def call_after_commit(db: AsyncSession, callback: Callable[[], None]) -> None:
+    """
+    事务提交后调用 callback（回滚则丢弃），用于只应在数据提交后生效的
+    进程内操作，如配置缓存失效
+    """
+    db.info.setdefault(_AFTER_COMMIT, []).append(callback)
+
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """
-    获取数据库会话的依赖函数
+    获取数据库会话的依赖函数（请求级工作单元）
+
+    服务层只 flush 不提交，请求结束时有写操作才提交一次，异常时整体回滚。
+    需要分段提交的长流程（如批量删除、文档处理任务）在流程内显式调用 commit。
+    端点应使用 Depends(get_db, scope="function")，使提交在响应发送前完成、
+    提交失败时返回错误而不是已发出的成功响应。
     """
     async with AsyncSessionLocal() as session:
         try:
             yield session
-            await session.commit()
+            if has_pending_writes(session):
+                await session.commit()
+            # 事务提交后再更新消息缓存（见 app.services.message_cache）
+            await message_cache.apply_committed(session)
         except Exception:
             await session.rollback()
             raise
         finally:
             await session.close()
 
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    获取只读数据库会话的依赖函数（列表/详情查询），配置了副本时读副本，
+    否则读主库；会话不提交，写操作必须使用 get_db
+    """
+    async with ReadSessionLocal() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
 async def test_db_connection() -> bool:
     """
     测试数据库连接
@@ -5,14 +5,21 @@
 # ROOT_DIR = Path(__file__).resolve().parent.parent
 # sys.path.append(str(ROOT_DIR))
 
-from fastapi import FastAPI, APIRouter
+from fastapi import FastAPI, APIRouter, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from app.core.config import CONFIG as settings
 from app.api.v1.endpoints.manage import router as manage_router
 from app.api.v1.endpoints.sa import router as sa_router
 from app.api.v1.endpoints.auth_controller import router as auth_router
+from app.api.v1.deps import require_super_admin
 from app.db.session import test_db_connection
+from app.core import metrics
+from app.core.http_transport import aclose_all as close_http_clients
+from app.core.executors import shutdown_all as shutdown_executors
+from app.core.langchain.parsing_pool import shutdown as shutdown_parsing_pool
+from app.core.prompts import get_prompt_registry
+from app.core.redis_client import close_redis
 
 
 def create_application() -> FastAPI:
@@ -31,11 +38,25 @@ def create_application() -> FastAPI:
                 print("⚠️  警告：数据库连接失败！")
         except Exception as e:
             print(f"❌ 数据库连接测试失败: {e}")
+
+        # 启动时一次性解析并编译提示词模板（失败时不阻止启动，对话回复使用内置提示词）
+        try:
+            get_prompt_registry()
+        except Exception as e:
+            print(f"❌ 提示词模板加载失败: {e}")
         
         yield
         
         # 应用关闭时执行清理操作
         print("🔄 应用正在关闭，清理资源...")
+        # 关闭LLM共享HTTP连接池
+        await close_http_clients()
+        # 关闭阻塞调用专用线程池
+        shutdown_executors()
+        # 关闭文档解析进程池
+        shutdown_parsing_pool()
+        # 关闭缓存用的Redis连接池
+        await close_redis()
     
     # 创建FastAPI应用
     app = FastAPI(
@@ -108,6 +129,11 @@ def _register_root_endpoint(app: FastAPI) -> None:
             "redoc": "/redoc"
         }
 
+    @app.get("/metrics", tags=["系统信息"], dependencies=[Depends(require_super_admin())])
+    async def get_metrics():
+        """进程内运行指标（LLM限流排队时间等），仅超级管理员可访问"""
+        return metrics.snapshot()
+
 
 # 创建应用实例
 app = create_application()
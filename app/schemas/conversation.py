@@ -37,12 +37,27 @@ class ConversationResponse(ConversationInDB):
 # 会话列表响应模型
 class ConversationList(BaseModel):
     total: int
-    items: List[ConversationResponse] 
+    items: List[ConversationResponse]
+    next_cursor: Optional[str] = None  # 下一页游标（keyset分页），无更多数据时为空
+
+# 历史消息检索结果
+class ConversationSearchHit(BaseModel):
+    message_id: int
+    conversation_id: int
+    conversation_title: str
+    question: str
+    content: Optional[str] = None
+    create_time: datetime
+    score: float  # 全文/向量两路倒数排名融合（RRF）分数
+
+class ConversationSearchResponse(BaseModel):
+    items: List[ConversationSearchHit]
 
 # 发送消息请求模型
 class SendMessageRequest(BaseModel):
     question: str
     llm_id: int
+    skip_reasoning: bool = False  # 不获取推理过程，更快得到回答
 
 # 发送消息响应模型
 class SendMessageResponse(BaseModel):
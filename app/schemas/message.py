@@ -1,6 +1,7 @@
 from datetime import datetime
-from typing import Optional
+from typing import Any, Optional
 from pydantic import BaseModel
+from app.core.reasoning import truncate_reasoning
 
 class MessageBase(BaseModel):
     conversation_id: int
@@ -29,4 +30,14 @@ class MessageInDB(MessageBase):
         from_attributes = True
 
 class MessageResponse(MessageInDB):
-    pass 
\ No newline at end of file
+    @classmethod
+    def from_row(cls, row: Any, reasoning_chars: Optional[int] = None) -> "MessageResponse":
+        """
+        由消息行（MessageService 投影查询的 Row / 缓存的 CachedMessage）或 MessageModel
+        直接构建，数据来自数据库，跳过校验和 from_attributes 逐属性读取。
+        reasoning_chars 为列表视图的推理文本预览长度（0 表示不返回，None 表示完整返回）。
+        """
+        data = row._asdict() if hasattr(row, "_asdict") else row.to_dict()
+        if reasoning_chars is not None:
+            data["reasoning_content"] = truncate_reasoning(data["reasoning_content"], reasoning_chars) if reasoning_chars else None
+        return cls.model_construct(**data) 
\ No newline at end of file
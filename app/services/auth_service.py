@@ -108,7 +108,7 @@ class AuthService:
             return False
             
         user.password = get_password_hash(new_password)
-        await self.db.commit()
+        await self.db.flush()
         logger.info(f"Password successfully changed for user ID: {user_id}.")
         return True
     
@@ -1,12 +1,19 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, func, delete
 from app.db.models.conversation import ConversationModel
+from app.db.models.message import MessageModel
+from app.db.models.llm_configuration import LlmConfigurationModel
 from app.schemas.conversation import ConversationCreate, ConversationUpdate
+from app.utils.pagination import after_cursor, newest_first
+from app.services import message_cache, history_search
 from app.core.logger.logging_config_helper import get_configured_logger # 导入日志
 
 logger = get_configured_logger("pioneer_handler") # 获取Logger实例
 
+# 删除会话时每批删除的消息条数（每批单独提交，避免长时间持有行锁）
+MESSAGE_DELETE_BATCH_SIZE = 1000
+
 class ConversationService:
     @staticmethod
     async def create(db: AsyncSession, obj_in: ConversationCreate) -> ConversationModel:
@@ -17,8 +24,7 @@ class ConversationService:
             create_by=obj_in.create_by
         )
         db.add(db_obj)
-        await db.commit()
-        await db.refresh(db_obj)
+        await db.flush()
         logger.info(f"Conversation {db_obj.id} created successfully for user {obj_in.user_id}.")
         return db_obj
 
@@ -28,8 +34,7 @@ class ConversationService:
         update_data = obj_in.model_dump(exclude_unset=True)
         for field, value in update_data.items():
             setattr(db_obj, field, value)
-        await db.commit()
-        await db.refresh(db_obj)
+        await db.flush()
         logger.info(f"Conversation {db_obj.id} updated successfully.")
         return db_obj
 
@@ -46,17 +51,44 @@ class ConversationService:
             logger.debug(f"Conversation {id} not found.")
         return conversation
 
+    @staticmethod
+    async def get_with_llm_config(
+        db: AsyncSession, id: int, llm_id: int
+    ) -> Tuple[Optional[ConversationModel], Optional[LlmConfigurationModel]]:
+        """
+        一次查询同时获取会话和LLM配置（LEFT JOIN，配置不存在时为 None）
+        """
+        logger.debug(f"Fetching conversation {id} with LLM configuration {llm_id}.")
+        result = await db.execute(
+            select(ConversationModel, LlmConfigurationModel)
+            .outerjoin(LlmConfigurationModel, LlmConfigurationModel.id == llm_id)
+            .filter(ConversationModel.id == id)
+        )
+        row = result.first()
+        if row is None:
+            logger.debug(f"Conversation {id} not found.")
+            return None, None
+        return row[0], row[1]
+
     @staticmethod
     async def get_multi(
-        db: AsyncSession, *, user_id: int, skip: int = 0, limit: int = 100
+        db: AsyncSession, *, user_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
     ) -> List[ConversationModel]:
-        logger.debug(f"Fetching multiple conversations for user {user_id}. Skip: {skip}, Limit: {limit}.")
-        result = await db.execute(
+        """
+        获取用户会话列表（按创建时间倒序）。传入 cursor 时使用 keyset 分页并忽略 skip。
+        """
+        logger.debug(f"Fetching multiple conversations for user {user_id}. Skip: {skip}, Limit: {limit}, Cursor: {cursor}.")
+        query = (
             select(ConversationModel)
             .filter(ConversationModel.user_id == user_id)
-            .offset(skip)
+            .order_by(*newest_first(ConversationModel))
             .limit(limit)
         )
+        if cursor:
+            query = query.filter(after_cursor(ConversationModel, cursor))
+        elif skip:
+            query = query.offset(skip)
+        result = await db.execute(query)
         conversations = result.scalars().all()
         logger.debug(f"Returned {len(conversations)} conversations for user {user_id}.")
         return list(conversations)
@@ -64,35 +96,62 @@ class ConversationService:
     @staticmethod
     async def get_total(db: AsyncSession, user_id: int) -> int:
         logger.debug(f"Counting total conversations for user {user_id}.")
-        result = await db.execute(
-            select(ConversationModel)
+        total = await db.scalar(
+            select(func.count())
+            .select_from(ConversationModel)
             .filter(ConversationModel.user_id == user_id)
         )
-        total = len(result.scalars().all())
         logger.debug(f"Total conversations for user {user_id}: {total}.")
         return total 
 
     @staticmethod
     async def delete(db: AsyncSession, id: int) -> bool:
         """
-        Delete a conversation and its related messages (cascade delete).
-        
+        Delete a conversation and its related messages.
+
+        Messages are removed in batches of MESSAGE_DELETE_BATCH_SIZE ids (an id-only
+        SELECT ... LIMIT, then a bulk DELETE by primary key), one short transaction per
+        batch, instead of loading them through the ORM cascade; the conversation row is
+        deleted last. Each committed batch enqueues deletion of its message vectors.
+
         Args:
             db: Database session
             id: Conversation ID to delete
-            
+
         Returns:
             Boolean indicating success
         """
         logger.info(f"Deleting conversation {id} and its messages.")
-        conversation = await ConversationService.get(db=db, id=id)
-        if not conversation:
+        exists = await db.scalar(select(ConversationModel.id).filter(ConversationModel.id == id))
+        if not exists:
             logger.warning(f"Conversation {id} not found for deletion.")
             return False
-            
-        # The cascade delete is handled at the database level via the relationship
-        # defined in the ConversationModel (cascade="all, delete-orphan")
-        await db.delete(conversation)
+
+        message_cache.stage_invalidate(db, id)
+        deleted = 0
+        while True:
+            message_ids = (await db.scalars(
+                select(MessageModel.id)
+                .where(MessageModel.conversation_id == id)
+                .limit(MESSAGE_DELETE_BATCH_SIZE)
+            )).all()
+            if message_ids:
+                await db.execute(
+                    delete(MessageModel)
+                    .where(MessageModel.id.in_(message_ids))
+                    .execution_options(synchronize_session=False)
+                )
+                history_search.enqueue_delete(db, message_ids)
+                await db.commit()
+            deleted += len(message_ids)
+            if len(message_ids) < MESSAGE_DELETE_BATCH_SIZE:
+                break
+
+        await db.execute(
+            delete(ConversationModel)
+            .where(ConversationModel.id == id)
+            .execution_options(synchronize_session=False)
+        )
         await db.commit()
-        logger.info(f"Conversation {id} and its messages deleted successfully.")
-        return True 
\ No newline at end of file
+        logger.info(f"Conversation {id} and its {deleted} messages deleted successfully.")
+        return True
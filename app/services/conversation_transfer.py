@@ -0,0 +1,171 @@
+"""
+会话导出/导入（NDJSON，用于迁移和备份）
+
+格式：每行一个 JSON 对象，会话行后紧跟该会话的消息行（按创建时间正序）：
+
+    {"type": "conversation", "id": 1, "title": "...", "create_time": "...", ...}
+    {"type": "message", "conversation_id": 1, "id": 10, "question": "...", "content": "...", ...}
+
+导出在只读会话上执行一条会话 LEFT JOIN 消息的查询，使用服务端游标（yield_per）按批
+读取并逐批写出；导入逐行解析请求体，消息按 IMPORT_BATCH_SIZE 条一批 executemany 插入。
+两者的内存占用都与历史消息量无关。
+"""
+
+import json
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, Optional
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models.conversation import ConversationModel
+from app.db.models.message import MessageModel
+from app.db.models.user import UserModel
+from app.db.session import ReadSessionLocal
+from app.services.message_cache import column_datetime
+from app.core.logger.logging_config_helper import get_configured_logger
+
+logger = get_configured_logger("pioneer_handler")
+
+# 导出时每批从服务端游标读取的行数
+EXPORT_BATCH_SIZE = 1000
+# 导入时每次 executemany 插入的消息条数
+IMPORT_BATCH_SIZE = 2000
+
+_CONVERSATION_FIELDS = ("id", "title", "create_by", "create_time", "update_by", "update_time")
+_MESSAGE_FIELDS = (
+    "id", "conversation_id", "llm_id", "question", "content", "reasoning_content",
+    "create_by", "create_time", "update_by", "update_time"
+)
+
+
+def _line(record: Dict[str, Any]) -> bytes:
+    return (json.dumps(record, ensure_ascii=False, default=_json_default) + "\n").encode("utf-8")
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _parse_time(value: Optional[str]) -> datetime:
+    """解析导入的时间并规范为 DATETIME 列的存储值（naive UTC，精确到秒）；缺失时取当前时间"""
+    if not value:
+        return column_datetime(datetime.now(timezone.utc))
+    return column_datetime(datetime.fromisoformat(value))
+
+
+async def export_ndjson(user_id: int) -> AsyncIterator[bytes]:
+    """
+    按 NDJSON 流式导出用户的全部会话和消息（每批 EXPORT_BATCH_SIZE 行写出一次）。
+    使用独立的只读会话：StreamingResponse 在端点返回后才消费本生成器。
+    """
+    conversation_columns = [getattr(ConversationModel, f).label(f"c_{f}") for f in _CONVERSATION_FIELDS]
+    message_columns = [getattr(MessageModel, f) for f in _MESSAGE_FIELDS]
+    query = (
+        select(*conversation_columns, *message_columns)
+        .outerjoin(MessageModel, MessageModel.conversation_id == ConversationModel.id)
+        .filter(ConversationModel.user_id == user_id)
+        .order_by(ConversationModel.id, MessageModel.create_time, MessageModel.id)
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+    conversations = messages = 0
+    current_id = None
+    async with ReadSessionLocal() as db:
+        result = await db.stream(query)
+        async for rows in result.partitions():
+            lines = []
+            for row in rows:
+                data = row._mapping
+                if data["c_id"] != current_id:
+                    current_id = data["c_id"]
+                    conversations += 1
+                    lines.append(_line({
+                        "type": "conversation",
+                        **{f: data[f"c_{f}"] for f in _CONVERSATION_FIELDS}
+                    }))
+                if data["id"] is not None:
+                    messages += 1
+                    lines.append(_line({"type": "message", **{f: data[f] for f in _MESSAGE_FIELDS}}))
+            yield b"".join(lines)
+    logger.info(f"Exported {conversations} conversations and {messages} messages for user {user_id}.")
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """把请求体的字节块切分为行（跳过空行），只缓存未结束的最后一行"""
+    pending = b""
+    async for chunk in chunks:
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield line
+    if pending.strip():
+        yield pending
+
+
+async def import_ndjson(
+    db: AsyncSession,
+    lines: AsyncIterator[bytes],
+    user: UserModel,
+    llm_id: Optional[int] = None
+) -> Dict[str, int]:
+    """
+    导入 export_ndjson 格式的数据，会话归属当前用户并分配新的ID。
+
+    消息行必须紧跟其所属会话行；llm_id 不为空时覆盖消息的大模型ID（目标库中
+    没有原大模型配置时使用）。整个导入在请求事务中完成，任一行出错则全部回滚。
+    格式错误抛出 ValueError。
+    """
+    counts = {"conversations": 0, "messages": 0}
+    batch = []
+    source_id = None  # 文件中当前会话的ID
+    conversation_id = None  # 当前会话导入后的新ID
+
+    async def insert_batch():
+        if batch:
+            await db.execute(insert(MessageModel), batch)
+            counts["messages"] += len(batch)
+            batch.clear()
+
+    line_no = 0
+    async for line in lines:
+        line_no += 1
+        try:
+            record = json.loads(line)
+            record_type = record.get("type")
+            if record_type == "conversation":
+                await insert_batch()
+                result = await db.execute(
+                    insert(ConversationModel).values(
+                        title=record.get("title") or "新对话",
+                        user_id=user.id,
+                        create_by=user.user_name,
+                        create_time=_parse_time(record.get("create_time"))
+                    )
+                )
+                conversation_id = result.inserted_primary_key[0]
+                source_id = record.get("id")
+                counts["conversations"] += 1
+            elif record_type == "message":
+                if conversation_id is None or record.get("conversation_id", source_id) != source_id:
+                    raise ValueError("message does not follow its conversation")
+                batch.append({
+                    "conversation_id": conversation_id,
+                    "llm_id": llm_id or record["llm_id"],
+                    "question": record["question"],
+                    "content": record.get("content") or "",
+                    "reasoning_content": record.get("reasoning_content"),
+                    "create_by": record.get("create_by") or user.user_name,
+                    "create_time": _parse_time(record.get("create_time"))
+                })
+                if len(batch) >= IMPORT_BATCH_SIZE:
+                    await insert_batch()
+            else:
+                raise ValueError(f"unknown record type {record_type!r}")
+        except (AttributeError, KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Invalid import data at line {line_no}: {e}") from e
+    await insert_batch()
+    logger.info(f"Imported {counts['conversations']} conversations and {counts['messages']} messages for user {user.id}.")
+    return counts
@@ -23,8 +23,7 @@ class DocumentCategoryService:
             create_by=str(user_id)
         )
         db.add(db_obj)
-        await db.commit()
-        await db.refresh(db_obj)
+        await db.flush()
         logger.info(f"Document category {db_obj.id} ({db_obj.name}) created successfully by user {user_id}.")
         return db_obj
 
@@ -90,8 +89,7 @@ class DocumentCategoryService:
         for field, value in update_data.items():
             setattr(db_obj, field, value)
             
-        await db.commit()
-        await db.refresh(db_obj)
+        await db.flush()
         logger.info(f"Document category {category_id} updated successfully by user {user_id}.")
         return db_obj
 
@@ -112,7 +110,7 @@ class DocumentCategoryService:
         db_obj.is_deleted = 1
         db_obj.update_by = str(user_id)
         
-        await db.commit()
+        await db.flush()
         logger.info(f"Document category {category_id} soft-deleted successfully by user {user_id}.")
         return True
     
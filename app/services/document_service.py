@@ -1,5 +1,5 @@
 from typing import List, Optional, Dict, Any
-from sqlalchemy import select, and_
+from sqlalchemy import select, and_, delete, insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, UploadFile
 import os
@@ -7,6 +7,7 @@ from datetime import datetime
 from app.core.langchain.rag_pipeline import RAGPipeline
 from app.db.models.document_info import DocumentInfo
 from app.db.models.document_settings import DocumentSettings
+from app.db.models.document_chunk import DocumentChunk
 from app.schemas.document import DocumentCreate, DocumentUpdate, DocumentSettingsCreate
 from app.core.config import CONFIG as settings
 from app.core.rag.document_processor import DocumentProcessor
@@ -15,6 +16,9 @@ from app.core.rag.document_splitter import ChunkConfig
 from app.core.logger.logging_config_helper import get_configured_logger
 logger = get_configured_logger("pioneer_handler")
 
+# 分块清单每条 DELETE/INSERT 语句处理的行数
+CHUNK_MANIFEST_BATCH_SIZE = 1000
+
 class DocumentService:
     @staticmethod
     async def create_document(
@@ -55,8 +59,7 @@ class DocumentService:
             # description=description
         )
         db.add(db_obj)
-        await db.commit()
-        await db.refresh(db_obj)
+        await db.flush()
         logger.info(f"Document record {db_obj.id} created successfully for user {user_id}.")
         return db_obj
     
@@ -116,7 +119,7 @@ class DocumentService:
         db_obj.is_deleted = 1
         db_obj.update_by = str(user_id)
         
-        await db.commit()
+        await db.flush()
         logger.info(f"Document {document_id} soft-deleted successfully by user {user_id}.")
         return True
 
@@ -138,8 +141,7 @@ class DocumentService:
             create_by=settings_in.create_by
         )
         db.add(db_obj)
-        await db.commit()
-        await db.refresh(db_obj)
+        await db.flush()
         logger.info(f"Settings for document {document_id} created successfully by user {user_id}.")
         return db_obj
 
@@ -180,8 +182,7 @@ class DocumentService:
         for field, value in update_data.items():
             setattr(db_obj, field, value)
             
-        await db.commit()
-        await db.refresh(db_obj)
+        await db.flush()
         logger.info(f"Settings for document {document_id} updated successfully by user {user_id}.")
         return db_obj
     
@@ -190,66 +191,36 @@ class DocumentService:
         db: AsyncSession,
         document_id: int,
     ) -> Dict[str, Any]:
-        """处理文档并构建知识库"""
+        """处理文档并构建知识库（在一个任务内完成解析、向量化和写入）"""
         logger.info(f"Starting document processing for document ID: {document_id}.")
         document = None
         try:
-            # 1. 获取文档信息
-            stmt = select(DocumentInfo).filter(
-                DocumentInfo.id == document_id,
-                DocumentInfo.is_deleted == 0
-            )
-            result = await db.execute(stmt)
-            document = result.scalar_one_or_none()
-            
-            if not document:
-                logger.error(f"Document {document_id} not found or already deleted during processing.")
-                raise ValueError(f"文档不存在: {document_id}")
+            # 1. 获取文档信息、分块配置
+            document, chunk_config, document_info = await DocumentService.get_processing_context(db, document_id)
 
-            # 2. 获取文档设置
-            document_settings = await DocumentService.get_document_settings(db, document_id)
-            if not document_settings:
-                logger.error(f"Document settings not found for document {document_id} during processing.")
-                raise ValueError(f"文档设置未找到: {document_id}")
-
-            # 3. 构建分块配置
-            # 假设 overlap 是以整数百分比形式存储的 (例如 20 代表 20%)
-            overlap_ratio = (document_settings.chunking_overlap or 20) / 100.0
-            chunk_config = {
-                "mode": document_settings.chunking_type,
-                "max_size": document_settings.maximum_length,
-                "overlap_ratio": overlap_ratio,
-                "separators": document_settings.chunk_identifier.split(",") if document_settings.chunk_identifier else None
-            }
-            logger.debug(f"Chunk configuration for document {document_id}: {chunk_config}.")
-
-            # 4. 创建并运行RAG管道
+            # 2. 创建并运行RAG管道
             # Embedding provider/model 可以将来从配置中读取
             pipeline = RAGPipeline(splitter_config=chunk_config)
-            
-            document_info = {
-                "id": document.id,
-                "name": document.file_name,
-                "category_id": document.category_id,
-                "user_id": document.create_by
-            }
 
             # 定义一个简单的进度回调函数用于日志记录
             async def progress_logger(status: str, progress: float):
                 logger.info(f"Doc {document_id} processing status: {status} ({progress*100:.0f}%)")
                 # 在这里可以添加将进度发送到前端的逻辑 (例如, WebSocket)
 
+            # 增量索引：只向量化/上传内容有变化的分块，并删除已不存在的分块
+            previous_chunks = await DocumentService.get_chunk_manifest(db, document_id)
             result = await pipeline.process_and_store_file(
                 file_path=document.file_url,
                 document_info=document_info,
-                progress_callback=progress_logger
+                progress_callback=progress_logger,
+                previous_chunks=previous_chunks
             )
 
-            # 5. 更新文档状态
-            document.status = 1  # 处理完成
-            await db.commit()
-
-            logger.info(f"Document processing completed successfully for document {document_id}.")
+            # 3. 更新分块清单和文档状态
+            await DocumentService.complete_processing(
+                db, document, previous_chunks,
+                result.pop("chunks") if result.get("status") == "success" else None
+            )
             return result
 
         except Exception as e:
@@ -260,6 +231,95 @@ class DocumentService:
                 await db.commit()
             raise
 
+    @staticmethod
+    async def get_processing_context(db: AsyncSession, document_id: int):
+        """获取文档处理所需的上下文：(文档, 分块配置, 写入向量库的文档信息)"""
+        stmt = select(DocumentInfo).filter(
+            DocumentInfo.id == document_id,
+            DocumentInfo.is_deleted == 0
+        )
+        result = await db.execute(stmt)
+        document = result.scalar_one_or_none()
+
+        if not document:
+            logger.error(f"Document {document_id} not found or already deleted during processing.")
+            raise ValueError(f"文档不存在: {document_id}")
+
+        document_settings = await DocumentService.get_document_settings(db, document_id)
+        if not document_settings:
+            logger.error(f"Document settings not found for document {document_id} during processing.")
+            raise ValueError(f"文档设置未找到: {document_id}")
+
+        # 假设 overlap 是以整数百分比形式存储的 (例如 20 代表 20%)
+        overlap_ratio = (document_settings.chunking_overlap or 20) / 100.0
+        chunk_config = {
+            "mode": document_settings.chunking_type,
+            "max_size": document_settings.maximum_length,
+            "overlap_ratio": overlap_ratio,
+            "separators": document_settings.chunk_identifier.split(",") if document_settings.chunk_identifier else None
+        }
+        logger.debug(f"Chunk configuration for document {document_id}: {chunk_config}.")
+
+        document_info = {
+            "id": document.id,
+            "name": document.file_name,
+            "category_id": document.category_id,
+            "user_id": document.create_by
+        }
+        return document, chunk_config, document_info
+
+    @staticmethod
+    async def complete_processing(
+        db: AsyncSession,
+        document: DocumentInfo,
+        previous_chunks: Dict[str, str],
+        chunks: Optional[Dict[str, str]]
+    ) -> None:
+        """更新分块清单（chunks 为 None 时不更新）并标记文档处理完成（同一事务；长流程在任务内自行提交，不经过 get_db）"""
+        if chunks is not None:
+            await DocumentService.save_chunk_manifest(db, document.id, previous_chunks, chunks)
+        document.status = 1  # 处理完成
+        await db.commit()
+        logger.info(f"Document processing completed successfully for document {document.id}.")
+
+    @staticmethod
+    async def mark_failed(db: AsyncSession, document_id: int) -> None:
+        """标记文档处理失败"""
+        document = await DocumentService.get_by_id(db, document_id)
+        if document:
+            document.status = 2  # 处理失败
+            await db.commit()
+
+    @staticmethod
+    async def get_chunk_manifest(db: AsyncSession, document_id: int) -> Dict[str, str]:
+        """获取文档已写入向量库的分块清单（内容哈希 -> 向量ID）"""
+        result = await db.execute(
+            select(DocumentChunk.content_hash, DocumentChunk.vector_id).filter(DocumentChunk.document_id == document_id)
+        )
+        return {content_hash: vector_id for content_hash, vector_id in result.all()}
+
+    @staticmethod
+    async def save_chunk_manifest(
+        db: AsyncSession,
+        document_id: int,
+        previous: Dict[str, str],
+        current: Dict[str, str]
+    ) -> None:
+        """按差异更新分块清单：删除已移除的分块，批量插入新增的分块（只 flush，由调用方提交）"""
+        removed = [content_hash for content_hash in previous if content_hash not in current]
+        added = [
+            {"document_id": document_id, "content_hash": content_hash, "vector_id": vector_id}
+            for content_hash, vector_id in current.items() if content_hash not in previous
+        ]
+        for i in range(0, len(removed), CHUNK_MANIFEST_BATCH_SIZE):
+            await db.execute(delete(DocumentChunk).where(
+                DocumentChunk.document_id == document_id,
+                DocumentChunk.content_hash.in_(removed[i:i + CHUNK_MANIFEST_BATCH_SIZE])
+            ))
+        for i in range(0, len(added), CHUNK_MANIFEST_BATCH_SIZE):
+            await db.execute(insert(DocumentChunk), added[i:i + CHUNK_MANIFEST_BATCH_SIZE])
+        logger.info(f"Chunk manifest of document {document_id} updated: {len(added)} added, {len(removed)} removed.")
+
     @staticmethod
     async def get_document_chunks(
         db: AsyncSession,
@@ -0,0 +1,163 @@
+"""
+用户聊天历史检索（/sa/conversation/search）
+
+- 全文检索：ai_message(question, content) 上的 MySQL FULLTEXT 索引（ngram 分词），
+  随消息写入即时生效；索引由 scripts/sql/ai_message_fulltext.sql 创建，缺失时退化为仅向量检索
+- 向量检索（history_search.vector_enabled）：消息提交后投递 Celery 任务异步生成向量，
+  写入向量库的 user_{id}_history 站点，聊天写入路径不等待向量化
+- 两路结果按倒数排名融合（RRF）排序，最后按消息ID回查数据库并校验归属，
+  已删除的消息不会出现在结果中；删除消息/会话提交后异步删除对应的消息向量
+"""
+
+import asyncio
+import json
+from typing import Any, Dict, List, Sequence, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import retriever
+from app.core.celery.celery_app import celery_app
+from app.core.config import CONFIG
+from app.db.models.conversation import ConversationModel
+from app.db.models.message import MessageModel
+from app.db.session import call_after_commit
+from app.core.logger.logging_config_helper import get_configured_logger
+
+logger = get_configured_logger("pioneer_handler")
+
+INDEX_TASK = "app.core.celery.history_task.index_message"
+DELETE_TASK = "app.core.celery.history_task.delete_messages"
+
+
+def history_site(user_id: int) -> str:
+    """用户历史消息在向量库中的站点名"""
+    return f"user_{user_id}_history"
+
+
+def enqueue_index(db: AsyncSession, message: MessageModel) -> None:
+    """事务提交后投递消息向量化任务（未启用向量检索时不做任何事）"""
+    if not CONFIG.history_search.vector_enabled:
+        return
+    message_id = message.id
+
+    def send():
+        try:
+            celery_app.send_task(INDEX_TASK, args=[message_id])
+        except Exception as e:
+            logger.warning(f"Failed to enqueue history indexing for message {message_id}: {e}")
+
+    call_after_commit(db, send)
+
+
+def enqueue_delete(db: AsyncSession, message_ids: Sequence[int]) -> None:
+    """事务提交后投递删除消息向量的任务（消息/会话删除时调用）"""
+    if not CONFIG.history_search.vector_enabled or not message_ids:
+        return
+    message_ids = list(message_ids)
+
+    def send():
+        try:
+            celery_app.send_task(DELETE_TASK, args=[message_ids])
+        except Exception as e:
+            logger.warning(f"Failed to enqueue history vector deletion for {len(message_ids)} messages: {e}")
+
+    call_after_commit(db, send)
+
+
+def vector_id(message_id: int) -> str:
+    """消息在向量库中的文档ID"""
+    return f"message_{message_id}"
+
+
+def build_document(message: Any, user_id: int, embedding: List[float]) -> Dict[str, Any]:
+    """向量库文档（与 RAGPipeline 上传的文档格式一致）"""
+    return {
+        "id": vector_id(message.id),
+        "url": f"conversation/{message.conversation_id}#message-{message.id}",
+        "name": message.question[:100],
+        "site": history_site(user_id),
+        "schema_json": json.dumps({
+            "message_id": message.id,
+            "conversation_id": message.conversation_id,
+            "question": message.question,
+            "content": message.content,
+        }, ensure_ascii=False),
+        "embedding": embedding,
+    }
+
+
+async def fulltext_search(db: AsyncSession, user_id: int, query: str, limit: int) -> List[int]:
+    """FULLTEXT 检索用户的历史消息，返回按相关度排序的消息ID；缺少全文索引等数据库错误时返回空列表"""
+    relevance = match(MessageModel.question, MessageModel.content, against=query)
+    try:
+        result = await db.execute(
+            select(MessageModel.id)
+            .join(ConversationModel, ConversationModel.id == MessageModel.conversation_id)
+            .filter(ConversationModel.user_id == user_id, relevance)
+            .order_by(relevance.desc())
+            .limit(limit)
+        )
+    except OperationalError as e:
+        logger.error(
+            f"History full-text search failed for user {user_id}, falling back to vector search "
+            f"(run scripts/sql/ai_message_fulltext.sql if the FULLTEXT index is missing): {e}"
+        )
+        return []
+    return list(result.scalars().all())
+
+
+async def vector_search(user_id: int, query: str, limit: int) -> List[int]:
+    """在用户的历史向量站点中检索，返回按相似度排序的消息ID；失败时返回空列表"""
+    if not CONFIG.history_search.vector_enabled:
+        return []
+    try:
+        results = await retriever.search(query, site=history_site(user_id), num_results=limit)
+    except Exception as e:
+        logger.warning(f"History vector search failed for user {user_id}: {e}")
+        return []
+    message_ids = []
+    for _url, schema_json, *_ in results:
+        try:
+            message_ids.append(int(json.loads(schema_json)["message_id"]))
+        except (TypeError, ValueError, KeyError):
+            continue
+    return message_ids
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[int]], k: int) -> List[Tuple[int, float]]:
+    """倒数排名融合：score = sum(1 / (k + rank))，按分数降序返回 (id, score)"""
+    scores: Dict[int, float] = {}
+    for ranking in rankings:
+        for rank, item in enumerate(ranking, start=1):
+            scores[item] = scores.get(item, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+async def search(db: AsyncSession, user_id: int, query: str, limit: int) -> List[Tuple[Any, float]]:
+    """
+    混合检索用户的历史消息，返回 (消息行, 分数) 列表；消息行包含
+    id/conversation_id/question/content/create_time/conversation_title
+    """
+    config = CONFIG.history_search
+    fulltext, vector = await asyncio.gather(
+        fulltext_search(db, user_id, query, config.candidates),
+        vector_search(user_id, query, config.candidates)
+    )
+    fused = reciprocal_rank_fusion([fulltext, vector], config.rrf_k)[:limit]
+    if not fused:
+        return []
+    result = await db.execute(
+        select(
+            MessageModel.id, MessageModel.conversation_id, MessageModel.question,
+            MessageModel.content, MessageModel.create_time,
+            ConversationModel.title.label("conversation_title")
+        )
+        .join(ConversationModel, ConversationModel.id == MessageModel.conversation_id)
+        .filter(MessageModel.id.in_([message_id for message_id, _ in fused]), ConversationModel.user_id == user_id)
+    )
+    rows = {row.id: row for row in result.all()}
+    logger.debug(f"History search for user {user_id}: {len(fulltext)} full-text, {len(vector)} vector, {len(rows)} returned.")
+    return [(rows[message_id], score) for message_id, score in fused if message_id in rows]
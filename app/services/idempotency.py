@@ -0,0 +1,163 @@
+"""
+消息发送的请求幂等（Idempotency-Key 请求头）
+
+双击发送或客户端超时重试时，同一用户、同一接口、同一幂等键的请求只执行一次
+（只调用一次大模型、只写入一条消息）：
+- 进程内：并发的重复请求等待同一个 asyncio.Future，共享同一次执行的结果或异常
+- 跨 worker：Redis SET NX 锁，持锁者执行，其余请求轮询结果直到锁释放或超时（409）
+- 执行成功后先提交数据库事务，再把结果（JSON）写入 Redis 保存 ttl_seconds，
+  之后的重复请求直接重放，不会重放未提交的消息
+- 失败的请求不保存结果，客户端可用同一个键重试
+
+同一个键用于不同的请求内容时返回 422；Redis 不可用时退化为仅进程内合并。
+"""
+
+import asyncio
+import hashlib
+import json
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import metrics
+from app.core.config import CONFIG
+from app.core.redis_client import get_redis
+from app.db.session import has_pending_writes
+from app.core.logger.logging_config_helper import get_configured_logger
+
+logger = get_configured_logger("pioneer_handler")
+
+HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = 128
+
+# 进程内正在执行的请求：Redis 键 -> (请求指纹, 结果 Future)
+_in_flight: Dict[str, Tuple[str, asyncio.Future]] = {}
+
+# 只释放自己持有的锁（锁过期后可能已被其他 worker 获得）
+_RELEASE_LOCK = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+def fingerprint(payload: Any) -> str:
+    """请求内容指纹（用于识别同一个键被用于不同的请求）"""
+    raw = json.dumps(jsonable_encoder(payload), sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _reused(scope: str) -> HTTPException:
+    metrics.inc("idempotency.key_reused", labels={"scope": scope})
+    return HTTPException(status_code=422, detail=f"{HEADER} was already used for a different request")
+
+
+async def run(
+    db: AsyncSession,
+    user_id: int,
+    scope: str,
+    key: Optional[str],
+    payload: Any,
+    work: Callable[[], Awaitable[Any]]
+) -> Any:
+    """
+    按幂等键执行 work（返回端点响应），未携带键或未启用时直接执行。
+
+    work 在请求的数据库会话中执行写操作；成功后在这里提交事务，再保存结果供重放。
+    重放的结果为 JSON 字典（由端点的 response_model 校验）。
+    """
+    config = CONFIG.idempotency
+    if not key or not config.enabled:
+        return await work()
+    if len(key) > MAX_KEY_LENGTH:
+        raise HTTPException(status_code=400, detail=f"{HEADER} must be at most {MAX_KEY_LENGTH} characters")
+
+    request_fingerprint = fingerprint(payload)
+    redis_key = f"idem:{user_id}:{scope}:{key}"
+
+    in_flight = _in_flight.get(redis_key)
+    if in_flight is not None:
+        if in_flight[0] != request_fingerprint:
+            raise _reused(scope)
+        metrics.inc("idempotency.coalesced", labels={"scope": scope})
+        logger.info(f"Duplicate request for {redis_key} joined the in-flight execution.")
+        return await asyncio.shield(in_flight[1])
+
+    future = asyncio.get_running_loop().create_future()
+    # 没有并发的重复请求时，避免 "exception was never retrieved" 警告
+    future.add_done_callback(lambda f: f.cancelled() or f.exception())
+    _in_flight[redis_key] = (request_fingerprint, future)
+    try:
+        result = await _run_once(db, redis_key, scope, request_fingerprint, work)
+        future.set_result(result)
+        return result
+    except asyncio.CancelledError:
+        future.set_exception(HTTPException(status_code=409, detail="The original request was cancelled, please retry"))
+        raise
+    except Exception as e:
+        future.set_exception(e)
+        raise
+    finally:
+        _in_flight.pop(redis_key, None)
+
+
+async def _run_once(
+    db: AsyncSession,
+    redis_key: str,
+    scope: str,
+    request_fingerprint: str,
+    work: Callable[[], Awaitable[Any]]
+) -> Any:
+    """跨 worker 去重：重放已保存的结果，或获得 Redis 锁后执行"""
+    config = CONFIG.idempotency
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + config.wait_timeout_seconds
+    lock_key = f"{redis_key}:lock"
+    token = uuid.uuid4().hex
+    while True:
+        try:
+            redis = get_redis()
+            stored = await redis.get(redis_key)
+            if stored is None:
+                acquired = await redis.set(lock_key, token, nx=True, ex=config.lock_ttl_seconds)
+        except Exception as e:
+            logger.warning(f"Idempotency store unavailable, deduplicating {redis_key} in-process only: {e}")
+            return await _execute(db, work)
+        if stored is not None:
+            record = json.loads(stored)
+            if record["fingerprint"] != request_fingerprint:
+                raise _reused(scope)
+            metrics.inc("idempotency.replayed", labels={"scope": scope})
+            logger.info(f"Replaying stored result for {redis_key}.")
+            return record["result"]
+        if acquired:
+            break
+        if loop.time() >= deadline:
+            raise HTTPException(status_code=409, detail=f"A request with this {HEADER} is still in progress")
+        await asyncio.sleep(config.poll_interval_seconds)
+
+    try:
+        result = await _execute(db, work)
+        try:
+            record = {"fingerprint": request_fingerprint, "result": jsonable_encoder(result)}
+            await redis.set(redis_key, json.dumps(record, ensure_ascii=False), ex=config.ttl_seconds)
+        except Exception as e:
+            logger.warning(f"Failed to store idempotent result for {redis_key}: {e}")
+        return result
+    finally:
+        try:
+            await redis.eval(_RELEASE_LOCK, 1, lock_key, token)
+        except Exception as e:
+            logger.warning(f"Failed to release idempotency lock {lock_key}: {e}")
+
+
+async def _execute(db: AsyncSession, work: Callable[[], Awaitable[Any]]) -> Any:
+    """执行并提交，保证之后重放的结果已持久化（get_db 随后不会再次提交）"""
+    result = await work()
+    if has_pending_writes(db):
+        await db.commit()
+    return result
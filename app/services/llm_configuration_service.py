@@ -1,8 +1,10 @@
 from typing import List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, func
 from app.db.models.llm_configuration import LlmConfigurationModel
 from app.schemas.llm_configuration import LlmConfigurationCreate, LlmConfigurationUpdate
+from app.core.llm import invalidate_llm_config
+from app.db.session import call_after_commit
 from app.core.logger.logging_config_helper import get_configured_logger # 导入日志
 
 logger = get_configured_logger("pioneer_handler") # 获取Logger实例
@@ -13,8 +15,7 @@ class LlmConfigurationService:
         logger.info(f"Creating new LLM configuration: {obj_in.llm_name} ({obj_in.llm_en_name}).")
         db_obj = LlmConfigurationModel(**obj_in.model_dump())
         db.add(db_obj)
-        await db.commit()
-        await db.refresh(db_obj)
+        await db.flush()
         logger.info(f"LLM configuration {db_obj.id} ({db_obj.llm_name}) created successfully.")
         return db_obj
 
@@ -26,8 +27,10 @@ class LlmConfigurationService:
         update_data = obj_in.model_dump(exclude_unset=True)
         for field, value in update_data.items():
             setattr(db_obj, field, value)
-        await db.commit()
-        await db.refresh(db_obj)
+        await db.flush()
+        # 配置变更提交后丢弃缓存的客户端，下次调用按新配置重建
+        config_id = db_obj.id
+        call_after_commit(db, lambda: invalidate_llm_config(config_id))
         logger.info(f"LLM configuration {db_obj.id} updated successfully.")
         return db_obj
 
@@ -65,6 +68,7 @@ class LlmConfigurationService:
         result = await db.execute(
             select(LlmConfigurationModel)
             .filter(LlmConfigurationModel.status == 1)
+            .order_by(LlmConfigurationModel.id)
             .offset(skip)
             .limit(limit)
         )
@@ -75,10 +79,10 @@ class LlmConfigurationService:
     @staticmethod
     async def get_total(db: AsyncSession) -> int:
         logger.debug("Counting total active LLM configurations.")
-        result = await db.execute(
-            select(LlmConfigurationModel)
+        total = await db.scalar(
+            select(func.count())
+            .select_from(LlmConfigurationModel)
             .filter(LlmConfigurationModel.status == 1)
         )
-        total = len(result.scalars().all())
         logger.debug(f"Total active LLM configurations: {total}.")
         return total 
\ No newline at end of file
@@ -0,0 +1,246 @@
+"""
+会话最近消息的 Redis 写穿缓存
+
+每个会话在 Redis 中保存最近 max_messages 条消息（LIST，最新在前），每条消息序列化为
+紧凑的 JSON 数组。读取历史上下文和会话详情时优先命中缓存，未命中时从 MySQL 加载并回填。
+
+缓存只在事务提交后更新：MessageService 的 create/update/delete 先把缓存操作登记到
+session.info，提交成功后移入待应用队列（回滚则丢弃），由 get_db 在请求结束时调用
+apply_committed 写入 Redis。这样缓存中不会出现未提交或已回滚的消息。
+
+一致性说明：
+- 列表长度小于 max_messages 时说明会话的全部消息都在缓存中；等于时为最新的 max_messages 条，
+  因此任何 limit <= max_messages 的最新消息读取都可由缓存满足
+- 删除消息时直接删除缓存键（下次读取时回填），避免缓存“看起来完整”但缺少更早的消息
+- 每个会话有一个版本号，提交后的每次缓存写入都会递增；回填前先读取版本号，写入时仅在
+  版本号未变时生效，避免并发写入后被查询时刻较早的旧数据覆盖
+- Redis 不可用时静默回退到数据库
+"""
+
+import json
+from collections import namedtuple
+from datetime import datetime, timezone
+from typing import Any, List, Optional, Sequence
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import CONFIG
+from app.core.redis_client import get_redis
+from app.db.models.message import MessageModel
+from app.core.logger.logging_config_helper import get_configured_logger
+
+logger = get_configured_logger("pioneer_handler")
+
+# 序列化字段顺序（紧凑数组格式，新增字段只能追加在末尾）
+_FIELDS = (
+    "id", "conversation_id", "llm_id", "question", "content", "reasoning_content",
+    "create_by", "create_time", "update_by", "update_time"
+)
+_DATETIME_FIELDS = {"create_time", "update_time"}
+
+# 缓存中还原的消息：与 MessageService 投影查询返回的行相同，支持属性访问和 _asdict()
+CachedMessage = namedtuple("CachedMessage", _FIELDS)
+
+_STAGED = "message_cache_staged"
+_COMMITTED = "message_cache_committed"
+
+
+def _key(conversation_id: int) -> str:
+    return f"conv:{conversation_id}:messages"
+
+
+def _version_key(conversation_id: int) -> str:
+    return f"conv:{conversation_id}:messages:version"
+
+
+def column_datetime(value: datetime) -> datetime:
+    """规范为 DATETIME 列实际存储的值（naive UTC，精确到秒），使缓存与数据库中的时间一致"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.replace(microsecond=0)
+
+
+def serialize(message: Any) -> str:
+    """序列化 MessageModel 或投影查询行"""
+    values = []
+    for name in _FIELDS:
+        value = getattr(message, name)
+        if name in _DATETIME_FIELDS and value is not None:
+            value = column_datetime(value).isoformat()
+        values.append(value)
+    return json.dumps(values, ensure_ascii=False, separators=(",", ":"))
+
+
+def deserialize(raw: Any) -> CachedMessage:
+    """还原为只读的 CachedMessage（不构造ORM对象）"""
+    data = dict(zip(_FIELDS, json.loads(raw)))
+    for name in _DATETIME_FIELDS:
+        if data.get(name):
+            data[name] = datetime.fromisoformat(data[name])
+    return CachedMessage(**data)
+
+
+async def get_recent(conversation_id: int, limit: int) -> Optional[List[CachedMessage]]:
+    """从缓存读取最新的 limit 条消息（最新在前）；未命中或无法由缓存满足时返回 None"""
+    config = CONFIG.message_cache
+    if not config.enabled or limit > config.max_messages:
+        return None
+    try:
+        redis = get_redis()
+        key = _key(conversation_id)
+        pipe = redis.pipeline(transaction=False)
+        pipe.exists(key)
+        pipe.lrange(key, 0, limit - 1)
+        pipe.expire(key, config.ttl_seconds)
+        exists, items, _ = await pipe.execute()
+    except Exception as e:
+        logger.warning(f"Message cache read failed for conversation {conversation_id}: {e}")
+        return None
+    if not exists:
+        return None
+    return [deserialize(item) for item in items]
+
+
+async def get_version(conversation_id: int) -> Optional[str]:
+    """读取会话缓存的版本号（在查询数据库之前调用，结果传给 fill）；Redis 不可用时返回 None"""
+    if not CONFIG.message_cache.enabled:
+        return None
+    try:
+        version = await get_redis().get(_version_key(conversation_id))
+    except Exception as e:
+        logger.warning(f"Message cache version read failed for conversation {conversation_id}: {e}")
+        return None
+    if isinstance(version, bytes):
+        version = version.decode()
+    return version or ""
+
+
+# 仅在版本号未变时回填（期间有提交写入则放弃，下次读取时再回填）
+_FILL_IF_VERSION = """
+if (redis.call('GET', KEYS[2]) or '') ~= ARGV[1] then
+    return 0
+end
+redis.call('DEL', KEYS[1])
+redis.call('RPUSH', KEYS[1], unpack(ARGV, 3))
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+return 1
+"""
+
+
+async def fill(conversation_id: int, messages: Sequence[Any], version: Optional[str]) -> None:
+    """用数据库中最新的 max_messages 条消息（最新在前）回填缓存；空会话不缓存
+
+    version 为查询数据库之前 get_version 的返回值，版本号已变化（或为 None）时不回填。
+    """
+    config = CONFIG.message_cache
+    if not config.enabled or not messages or version is None:
+        return
+    try:
+        filled = await get_redis().eval(
+            _FILL_IF_VERSION, 2, _key(conversation_id), _version_key(conversation_id),
+            version, config.ttl_seconds, *(serialize(m) for m in messages[:config.max_messages])
+        )
+        if not filled:
+            logger.debug(f"Message cache fill skipped for conversation {conversation_id}: version changed.")
+    except Exception as e:
+        logger.warning(f"Message cache fill failed for conversation {conversation_id}: {e}")
+
+
+def _stage(db, op: str, payload: Any) -> None:
+    if CONFIG.message_cache.enabled:
+        db.info.setdefault(_STAGED, []).append((op, payload))
+
+
+def stage_create(db, message: MessageModel) -> None:
+    """登记新消息（提交后写入已缓存会话的列表头部）"""
+    _stage(db, "create", message)
+
+
+def stage_update(db, message: MessageModel) -> None:
+    """登记消息更新（提交后原位替换缓存中的消息）"""
+    _stage(db, "update", message)
+
+
+def stage_invalidate(db, conversation_id: int) -> None:
+    """登记缓存失效（删除消息/会话后，下次读取时回填）"""
+    _stage(db, "invalidate", conversation_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session):
+    staged = session.info.pop(_STAGED, None)
+    if staged:
+        session.info.setdefault(_COMMITTED, []).extend(staged)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _after_rollback(session, previous_transaction):
+    session.info.pop(_STAGED, None)
+
+
+# 仅在键存在时插入（键已过期则不创建只含新消息的“残缺”列表）
+_PUSH_IF_CACHED = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    redis.call('LPUSH', KEYS[1], ARGV[1])
+    redis.call('LTRIM', KEYS[1], 0, tonumber(ARGV[2]) - 1)
+    redis.call('EXPIRE', KEYS[1], ARGV[3])
+end
+return 0
+"""
+
+# 按消息ID前缀原位替换（原子操作，不受并发插入导致的下标变化影响）
+_REPLACE_BY_ID = """
+local items = redis.call('LRANGE', KEYS[1], 0, -1)
+for i, item in ipairs(items) do
+    if string.sub(item, 1, string.len(ARGV[1])) == ARGV[1] then
+        redis.call('LSET', KEYS[1], i - 1, ARGV[2])
+        return 1
+    end
+end
+return 0
+"""
+
+
+async def apply_committed(db) -> None:
+    """把已提交事务登记的缓存更新写入 Redis（get_db 在请求结束时调用）"""
+    ops = db.info.pop(_COMMITTED, None)
+    if not ops:
+        return
+    config = CONFIG.message_cache
+    try:
+        redis = get_redis()
+        for op, payload in ops:
+            await _bump_version(redis, payload if op == "invalidate" else payload.conversation_id)
+            if op == "invalidate":
+                await redis.delete(_key(payload))
+            elif op == "create":
+                await redis.eval(
+                    _PUSH_IF_CACHED, 1, _key(payload.conversation_id),
+                    serialize(payload), config.max_messages, config.ttl_seconds
+                )
+            elif op == "update":
+                await redis.eval(
+                    _REPLACE_BY_ID, 1, _key(payload.conversation_id),
+                    f"[{payload.id},", serialize(payload)
+                )
+    except Exception as e:
+        # 写入失败时删除相关缓存，避免读到过期数据
+        logger.warning(f"Message cache update failed, invalidating: {e}")
+        conversation_ids = {p if op == "invalidate" else p.conversation_id for op, p in ops}
+        try:
+            redis = get_redis()
+            for conversation_id in conversation_ids:
+                await _bump_version(redis, conversation_id)
+            await redis.delete(*(_key(c) for c in conversation_ids))
+        except Exception as e:
+            logger.error(
+                f"Message cache invalidation failed for conversations {sorted(conversation_ids)}, "
+                f"entries may be stale until they expire: {e}"
+            )
+
+
+async def _bump_version(redis, conversation_id: int) -> None:
+    key = _version_key(conversation_id)
+    await redis.incr(key)
+    await redis.expire(key, CONFIG.message_cache.ttl_seconds)
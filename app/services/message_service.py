@@ -1,13 +1,24 @@
-from typing import List, Optional
+from typing import Any, List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from datetime import datetime
+from sqlalchemy import select, func, null
+from datetime import datetime, timezone
 from app.db.models.message import MessageModel
 from app.schemas.message import MessageCreate, MessageUpdate
+from app.utils.pagination import after_cursor, newest_first
+from app.services import message_cache, history_search
+from app.db.session import is_read_replica
+from app.core.config import CONFIG
 from app.core.logger.logging_config_helper import get_configured_logger # 导入日志
 
 logger = get_configured_logger("pioneer_handler") # 获取Logger实例
 
+# 消息列表的投影列（推理文本单独处理，可按需不查询）
+_LIST_COLUMNS = (
+    MessageModel.id, MessageModel.conversation_id, MessageModel.llm_id,
+    MessageModel.question, MessageModel.content,
+    MessageModel.create_by, MessageModel.create_time, MessageModel.update_by, MessageModel.update_time
+)
+
 class MessageService:
     @staticmethod
     async def create(db: AsyncSession, obj_in: MessageCreate) -> MessageModel:
@@ -18,11 +29,16 @@ class MessageService:
             question=obj_in.question,
             content=obj_in.content,
             reasoning_content=obj_in.reasoning_content,
-            create_by=obj_in.create_by
+            create_by=obj_in.create_by,
+            # 按列精度写入，内存中的值与数据库/缓存一致（keyset 游标基于该值构建）
+            create_time=message_cache.column_datetime(datetime.now(timezone.utc))
         )
         db.add(db_obj)
-        await db.commit()
-        await db.refresh(db_obj)
+        # flush 即可取得自增主键（随INSERT返回），字段默认值已在内存中，无需 refresh；
+        # 事务由调用方/get_db 统一提交
+        await db.flush()
+        message_cache.stage_create(db, db_obj)
+        history_search.enqueue_index(db, db_obj)
         logger.info(f"Message {db_obj.id} created successfully for conversation {obj_in.conversation_id}.")
         return db_obj
 
@@ -32,8 +48,10 @@ class MessageService:
         update_data = obj_in.model_dump(exclude_unset=True)
         for field, value in update_data.items():
             setattr(db_obj, field, value)
-        await db.commit()
-        await db.refresh(db_obj)
+        message_cache.stage_update(db, db_obj)
+        await db.flush()
+        if "question" in update_data or "content" in update_data:
+            history_search.enqueue_index(db, db_obj)
         logger.info(f"Message {db_obj.id} updated successfully.")
         return db_obj
 
@@ -52,28 +70,64 @@ class MessageService:
 
     @staticmethod
     async def get_by_conversation(
-        db: AsyncSession, conversation_id: int, skip: int = 0, limit: int = 100
-    ) -> List[MessageModel]:
-        logger.debug(f"Fetching messages for conversation {conversation_id}. Skip: {skip}, Limit: {limit}.")
-        result = await db.execute(
-            select(MessageModel)
+        db: AsyncSession,
+        conversation_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        include_reasoning: bool = True
+    ) -> List[Any]:
+        """
+        获取会话消息（按创建时间倒序）。传入 cursor 时使用 keyset 分页并忽略 skip。
+
+        返回只读的消息行（列投影查询的 Row 或缓存的 CachedMessage），不构造ORM对象；
+        两者都支持按属性读取字段和 _asdict()。include_reasoning=False 时不查询推理文本
+        （该字段为 None）。
+
+        读取最新消息（无 skip/cursor）时优先使用 Redis 消息缓存，未命中时按缓存容量
+        从数据库加载并回填（只读副本上的查询不回填，避免缓存副本延迟的数据）。
+        """
+        logger.debug(f"Fetching messages for conversation {conversation_id}. Skip: {skip}, Limit: {limit}, Cursor: {cursor}.")
+        latest = not skip and not cursor
+        if latest:
+            cached = await message_cache.get_recent(conversation_id, limit)
+            if cached is not None:
+                logger.debug(f"Returned {len(cached)} cached messages for conversation {conversation_id}.")
+                return cached
+        # 缓存未命中时按缓存容量加载（含推理文本），以便回填
+        fill_cache = latest and limit <= CONFIG.message_cache.max_messages and not is_read_replica(db)
+        if include_reasoning or fill_cache:
+            reasoning = MessageModel.reasoning_content
+        else:
+            reasoning = null().label("reasoning_content")
+        # 回填前记录缓存版本号，查询期间有新的提交写入时放弃回填
+        version = await message_cache.get_version(conversation_id) if fill_cache else None
+        query = (
+            select(*_LIST_COLUMNS, reasoning)
             .filter(MessageModel.conversation_id == conversation_id)
-            .order_by(MessageModel.create_time.desc())
-            .offset(skip)
-            .limit(limit)
+            .order_by(*newest_first(MessageModel))
+            .limit(CONFIG.message_cache.max_messages if fill_cache else limit)
         )
-        messages = result.scalars().all()
+        if cursor:
+            query = query.filter(after_cursor(MessageModel, cursor))
+        elif skip:
+            query = query.offset(skip)
+        result = await db.execute(query)
+        messages = list(result.all())
+        if fill_cache:
+            await message_cache.fill(conversation_id, messages, version)
+            messages = messages[:limit]
         logger.debug(f"Returned {len(messages)} messages for conversation {conversation_id}.")
-        return list(messages)
+        return messages
 
     @staticmethod
     async def get_conversation_messages_count(db: AsyncSession, conversation_id: int) -> int:
         logger.debug(f"Counting messages for conversation {conversation_id}.")
-        result = await db.execute(
-            select(MessageModel)
+        total = await db.scalar(
+            select(func.count())
+            .select_from(MessageModel)
             .filter(MessageModel.conversation_id == conversation_id)
         )
-        total = len(result.scalars().all())
         logger.debug(f"Total messages for conversation {conversation_id}: {total}.")
         return total 
 
@@ -96,7 +150,9 @@ class MessageService:
             return False
             
         await db.delete(message)
-        await db.commit()
+        message_cache.stage_invalidate(db, message.conversation_id)
+        history_search.enqueue_delete(db, [id])
+        await db.flush()
         logger.info(f"Message {id} deleted successfully.")
         return True
 
@@ -118,7 +174,7 @@ class MessageService:
             select(MessageModel)
             .filter(MessageModel.conversation_id == conversation_id)
             .filter(MessageModel.create_time < before_time)
-            .order_by(MessageModel.create_time.asc())
+            .order_by(MessageModel.create_time.asc(), MessageModel.id.asc())
         )
         messages = result.scalars().all()
         logger.debug(f"Returned {len(messages)} messages for conversation {conversation_id} before {before_time}.")
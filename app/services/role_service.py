@@ -61,8 +61,7 @@ class RoleService:
             create_by=operator
         )
         self.db.add(db_role)
-        await self.db.commit()
-        await self.db.refresh(db_role)
+        await self.db.flush()
         logger.info(f"Role {db_role.id} ({db_role.name}) created successfully by {operator}.")
         return db_role
     
@@ -78,8 +77,7 @@ class RoleService:
             setattr(db_role, field, value)
         db_role.update_by = operator
         
-        await self.db.commit()
-        await self.db.refresh(db_role)
+        await self.db.flush()
         logger.info(f"Role {role_id} updated successfully by {operator}.")
         return db_role
     
@@ -92,7 +90,7 @@ class RoleService:
             return False
             
         await self.db.delete(db_role)
-        await self.db.commit()
+        await self.db.flush()
         logger.info(f"Role {role_id} deleted successfully.")
         return True
     
@@ -162,8 +160,7 @@ class FunctionPermissionService:
             create_by=operator
         )
         self.db.add(db_permission)
-        await self.db.commit()
-        await self.db.refresh(db_permission)
+        await self.db.flush()
         logger.info(f"Function permission {db_permission.id} ({db_permission.name}) created successfully by {operator}.")
         return db_permission
     
@@ -181,8 +178,7 @@ class FunctionPermissionService:
             setattr(db_permission, field, value)
         db_permission.update_by = operator
         
-        await self.db.commit()
-        await self.db.refresh(db_permission)
+        await self.db.flush()
         logger.info(f"Function permission {permission_id} updated successfully by {operator}.")
         return db_permission
     
@@ -195,7 +191,7 @@ class FunctionPermissionService:
             return False
             
         await self.db.delete(db_permission)
-        await self.db.commit()
+        await self.db.flush()
         logger.info(f"Function permission {permission_id} deleted successfully.")
         return True
     
@@ -219,7 +215,7 @@ class FunctionPermissionService:
                 func_per_id=permission_id
             ))
         
-        await self.db.commit()
+        await self.db.flush()
         logger.info(f"Permissions {permission_ids} assigned to role {role_id} successfully by {operator}.")
         return True
 
@@ -62,8 +62,7 @@ class UserService:
             create_by=operator
         )
         self.db.add(db_user)
-        await self.db.commit()
-        await self.db.refresh(db_user)
+        await self.db.flush()
         logger.info(f"User {db_user.id} ({db_user.user_name}) created successfully by {operator}.")
 
         role_ids = user_data.role_ids
@@ -78,7 +77,7 @@ class UserService:
                     logger.debug(f"Role {role_id} assigned to user {db_user.id}.")
                 else:
                     logger.warning(f"Role {role_id} not found when assigning to user {db_user.id}.")
-            await self.db.commit()
+            await self.db.flush()
             
             # 关键：在返回db_user之前，重新查询并预加载所有关联关系
             # 确保roles（通过association_proxy）能够被正确序列化
@@ -114,8 +113,7 @@ class UserService:
             setattr(db_user, field, value)
         db_user.update_by = operator
         
-        await self.db.commit()
-        await self.db.refresh(db_user)
+        await self.db.flush()
         logger.info(f"User {user_id} updated successfully by {operator}.")
         return db_user
 
@@ -160,7 +158,7 @@ class UserService:
             return False
         
         user.password = get_password_hash(new_password)
-        await self.db.commit()
+        await self.db.flush()
         logger.info(f"Password successfully changed for user ID: {user_id}.")
         return True
 
@@ -191,6 +189,6 @@ class UserService:
             logger.warning(f"User {user_id} not found for deletion.")
             return False
         await self.db.delete(db_user)
-        await self.db.commit()
+        await self.db.flush()
         logger.info(f"User {user_id} deleted successfully.")
         return True
\ No newline at end of file
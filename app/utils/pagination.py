@@ -0,0 +1,52 @@
+"""
+Keyset (cursor) pagination on (create_time, id).
+
+Lists are ordered newest first by ``create_time DESC, id DESC``; the cursor encodes
+the last row of a page, and the next page continues strictly after it. Unlike
+OFFSET, the database seeks straight to the cursor through the composite index, so
+the cost of a page does not grow with the page number.
+"""
+
+import base64
+from datetime import datetime
+from typing import Optional, Sequence, Tuple
+
+from sqlalchemy import and_, or_
+
+
+def encode_cursor(create_time: datetime, id: int) -> str:
+    """Opaque cursor for the row (create_time, id)."""
+    raw = f"{create_time.isoformat()}|{id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Inverse of ``encode_cursor``; raises ValueError for a malformed cursor."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+        create_time, id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(create_time), int(id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+
+def after_cursor(model, cursor: str):
+    """WHERE clause selecting rows after the cursor in (create_time DESC, id DESC) order."""
+    create_time, id = decode_cursor(cursor)
+    return or_(
+        model.create_time < create_time,
+        and_(model.create_time == create_time, model.id < id)
+    )
+
+
+def newest_first(model):
+    """ORDER BY matching ``after_cursor``."""
+    return model.create_time.desc(), model.id.desc()
+
+
+def next_cursor(rows: Sequence, limit: int) -> Optional[str]:
+    """Cursor for the page after ``rows``, or None if this was the last page."""
+    if len(rows) < limit or not rows:
+        return None
+    last = rows[-1]
+    return encode_cursor(last.create_time, last.id)
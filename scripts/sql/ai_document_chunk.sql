@@ -0,0 +1,16 @@
+-- 文档分块清单表（增量重建索引）
+-- 记录每个文档已写入向量库的分块：内容哈希 -> 向量ID。重新处理文档时只向量化新增/修改的分块，
+-- 并删除已不存在的分块。对应 app/db/models/document_chunk.py 中的 DocumentChunk。
+--
+-- 升级已有数据库时执行一次：
+--   mysql -h $MYSQL_HOST -u $MYSQL_USER -p $MYSQL_DATABASE < scripts/sql/ai_document_chunk.sql
+
+CREATE TABLE IF NOT EXISTS ai_document_chunk (
+    id BIGINT NOT NULL AUTO_INCREMENT COMMENT '主键',
+    document_id BIGINT NOT NULL COMMENT '文档ID',
+    content_hash VARCHAR(64) NOT NULL COMMENT '分块内容SHA-256',
+    vector_id VARCHAR(128) NOT NULL COMMENT '向量库中的文档ID',
+    create_time DATETIME NOT NULL COMMENT '创建时间',
+    PRIMARY KEY (id),
+    UNIQUE KEY uk_document_chunk_hash (document_id, content_hash)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='文档分块清单';
@@ -0,0 +1,19 @@
+-- 历史消息全文索引（/sa/conversation/search 的全文检索）
+-- 在 ai_message(question, content) 上创建 ngram 分词的 FULLTEXT 索引，支持中文检索。
+-- 对应 app/db/models/message.py 中的 ft_message_question_content。索引缺失时历史检索只返回向量检索结果。
+--
+-- 升级已有数据库时执行（索引已存在时跳过）；大表上建索引耗时较长，建议在低峰期执行：
+--   mysql -h $MYSQL_HOST -u $MYSQL_USER -p $MYSQL_DATABASE < scripts/sql/ai_message_fulltext.sql
+
+SET @index_exists = (
+    SELECT COUNT(*) FROM information_schema.statistics
+    WHERE table_schema = DATABASE() AND table_name = 'ai_message' AND index_name = 'ft_message_question_content'
+);
+SET @ddl = IF(
+    @index_exists = 0,
+    'ALTER TABLE ai_message ADD FULLTEXT INDEX ft_message_question_content (question, content) WITH PARSER ngram',
+    'SELECT 1'
+);
+PREPARE stmt FROM @ddl;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
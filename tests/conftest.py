@@ -1,3 +1,9 @@
+import os
+import tempfile
+
+# 测试期间的日志等输出写入临时目录（须在导入 app 之前设置），不写入仓库的 logs/
+os.environ.setdefault("PIONEER_OUTPUT_DIR", tempfile.mkdtemp(prefix="pioneer-test-"))
+
 import pytest_asyncio
 from typing import AsyncGenerator
 from httpx import AsyncClient, ASGITransport
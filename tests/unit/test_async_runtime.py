@@ -0,0 +1,60 @@
+# tests/unit/test_async_runtime.py
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.core.celery import async_runtime
+
+
+def test_tasks_share_one_persistent_loop():
+    """测试多个任务线程共享同一个常驻事件循环，并可并发执行"""
+    async def work():
+        await asyncio.sleep(0.2)
+        return asyncio.get_running_loop()
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        loops = list(pool.map(lambda _: async_runtime.run_async(work()), range(4)))
+    assert time.monotonic() - started < 0.6
+    assert len(set(map(id, loops))) == 1
+    assert async_runtime.run_async(work()) is loops[0]
+    assert loops[0].is_running()
+
+
+def test_timeout_cancels_coroutine():
+    """测试等待超时后协程在循环中被取消"""
+    cancelled = []
+
+    async def slow():
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    try:
+        async_runtime.run_async(slow(), timeout=0.05)
+    except Exception:
+        pass
+    time.sleep(0.1)
+    assert cancelled == [True]
+
+
+def test_tasks_run_with_time_limit(monkeypatch):
+    """测试任务以 TASK_TIME_LIMIT 为超时运行协程（threads 池不强制 task_time_limit）"""
+    from app.core.celery import document_task
+    from app.core.celery.celery_app import TASK_TIME_LIMIT
+
+    timeouts = []
+
+    def fake_run_async(coro, timeout=None):
+        coro.close()
+        timeouts.append(timeout)
+        return {'status': 'success', 'chunks_stored': 3}
+
+    monkeypatch.setattr(document_task, "run_async", fake_run_async)
+    monkeypatch.setattr(document_task.settings.celery, "staged_ingestion", False)
+    monkeypatch.setattr(document_task.process_document, "update_state", lambda **kwargs: None)
+
+    assert document_task.process_document(1, 2)['chunks_count'] == 3
+    assert timeouts == [TASK_TIME_LIMIT]
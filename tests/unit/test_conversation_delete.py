@@ -0,0 +1,52 @@
+# tests/unit/test_conversation_delete.py
+from types import SimpleNamespace
+
+from sqlalchemy.dialects import mysql
+
+from app.db import session as db_session
+from app.services import conversation_service, history_search
+from app.services.conversation_service import ConversationService
+
+
+class _FakeSession:
+    """记录执行的语句，按给定的消息ID批次返回查询结果；提交时执行提交后回调"""
+
+    def __init__(self, id_batches):
+        self.id_batches = list(id_batches)
+        self.statements = []
+        self.commits = 0
+        self.info = {}
+
+    async def scalar(self, statement):
+        return 1
+
+    async def scalars(self, statement):
+        self.statements.append(statement)
+        return SimpleNamespace(all=lambda: self.id_batches.pop(0) if self.id_batches else [])
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return SimpleNamespace(rowcount=1)
+
+    async def commit(self):
+        self.commits += 1
+        for callback in self.info.pop(db_session._AFTER_COMMIT, []):
+            callback()
+
+
+async def test_delete_conversation_in_batches(monkeypatch):
+    """测试删除会话时按批删除消息（按ID批量 DELETE，每批提交并删除消息向量），最后删除会话"""
+    monkeypatch.setattr(conversation_service, "MESSAGE_DELETE_BATCH_SIZE", 2)
+    monkeypatch.setattr(history_search.CONFIG.history_search, "vector_enabled", True)
+    sent = []
+    monkeypatch.setattr(history_search.celery_app, "send_task", lambda name, args: sent.append((name, args)))
+    db = _FakeSession([[1, 2], [3, 4], [5]])
+    assert await ConversationService.delete(db, 7)
+
+    sql = [str(s.compile(dialect=mysql.dialect())) for s in db.statements]
+    assert len(sql) == 7 and db.commits == 4
+    for i in range(3):
+        assert sql[2 * i].startswith("SELECT ai_message.id") and sql[2 * i].endswith("LIMIT %s")
+        assert sql[2 * i + 1].startswith("DELETE FROM ai_message WHERE ai_message.id IN")
+    assert sql[6].startswith("DELETE FROM ai_conversation")
+    assert sent == [(history_search.DELETE_TASK, [ids]) for ids in ([1, 2], [3, 4], [5])]
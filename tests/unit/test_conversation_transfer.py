@@ -0,0 +1,70 @@
+# tests/unit/test_conversation_transfer.py
+import json
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import conversation_transfer
+
+
+async def _chunks(*chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+class _FakeSession:
+    """记录插入语句和参数，会话插入返回递增的新ID"""
+
+    def __init__(self):
+        self.message_batches = []
+        self.next_id = 100
+
+    async def execute(self, statement, params=None):
+        if params is not None:
+            self.message_batches.append(list(params))
+            return SimpleNamespace()
+        self.next_id += 1
+        return SimpleNamespace(inserted_primary_key=(self.next_id,))
+
+
+async def test_iter_lines_across_chunks():
+    """测试请求体字节块按行切分（行可跨块，跳过空行）"""
+    lines = [line async for line in conversation_transfer.iter_lines(_chunks(b'{"a":', b'1}\n\n{"b"', b":2}"))]
+    assert lines == [b'{"a":1}', b'{"b":2}']
+
+
+async def test_import_batches_messages(monkeypatch):
+    """测试导入时会话分配新ID，消息按批插入"""
+    monkeypatch.setattr(conversation_transfer, "IMPORT_BATCH_SIZE", 2)
+    records = [{"type": "conversation", "id": 7, "title": "t", "create_time": "2025-01-01T08:00:00"}]
+    records += [
+        {"type": "message", "conversation_id": 7, "id": i, "llm_id": 3, "question": f"q{i}", "content": "c"}
+        for i in range(3)
+    ]
+    records.append({"type": "conversation", "id": 8, "title": "empty"})
+    lines = _chunks(*(json.dumps(r).encode() + b"\n" for r in records))
+    db = _FakeSession()
+    user = SimpleNamespace(id=1, user_name="u")
+
+    counts = await conversation_transfer.import_ndjson(db, conversation_transfer.iter_lines(lines), user, llm_id=9)
+    assert counts == {"conversations": 2, "messages": 3}
+    assert [len(batch) for batch in db.message_batches] == [2, 1]
+    assert all(m["conversation_id"] == 101 and m["llm_id"] == 9 for batch in db.message_batches for m in batch)
+
+
+async def test_import_rejects_orphan_message():
+    """测试消息行不跟随所属会话时报告行号"""
+    line = json.dumps({"type": "message", "conversation_id": 1, "llm_id": 1, "question": "q"}).encode()
+    with pytest.raises(ValueError, match="line 1"):
+        await conversation_transfer.import_ndjson(
+            _FakeSession(), conversation_transfer.iter_lines(_chunks(line)), SimpleNamespace(id=1, user_name="u")
+        )
+
+
+def test_parse_time_normalizes_to_column_value():
+    """测试导入时间规范为 naive UTC（精确到秒），缺失时取当前 UTC 时间"""
+    parsed = conversation_transfer._parse_time("2025-01-01T16:00:00.654321+08:00")
+    assert parsed == datetime(2025, 1, 1, 8, 0, 0)
+    now = conversation_transfer._parse_time(None)
+    assert now.tzinfo is None and now.microsecond == 0
@@ -0,0 +1,73 @@
+# tests/unit/test_db_timing.py
+from types import SimpleNamespace
+
+from app.core import metrics
+from app.db import session
+
+
+def test_track_db_time_counts_statements():
+    """测试按请求统计SQL语句数和数据库耗时"""
+    metrics.reset()
+    conn = SimpleNamespace(info={})
+
+    def execute():
+        session._before_cursor_execute(conn, None, "SELECT 1", None, None, False)
+        session._after_cursor_execute(conn, None, "SELECT 1", None, None, False)
+
+    execute()  # 计时范围外的语句不计入
+    with session.track_db_time("unit") as timer:
+        execute()
+        execute()
+    assert timer.statements == 2
+    assert timer.seconds >= 0
+    assert metrics.get_summary("db.unit.statements").percentile(0.5) == 2
+    assert metrics.get_summary("db.query_seconds").count == 3
+
+
+async def test_pool_checkout_wait_and_timeout():
+    """测试连接池记录连接获取等待时间和超时次数"""
+    import sqlite3
+    import pytest
+    from sqlalchemy import exc
+    from sqlalchemy.util import greenlet_spawn
+
+    metrics.reset()
+    pool = session.TimedQueuePool(
+        lambda: sqlite3.connect(":memory:"), pool_size=1, max_overflow=0, timeout=0.01, logging_name="unit"
+    )
+    connection = await greenlet_spawn(pool.connect)
+    with pytest.raises(exc.TimeoutError):
+        await greenlet_spawn(pool.connect)
+    await greenlet_spawn(connection.close)
+    assert metrics.get_summary("db.pool.checkout_wait_seconds", {"engine": "unit"}).count == 2
+    assert metrics.get_counter("db.pool.timeouts", {"engine": "unit"}) == 1
+
+
+def test_unit_of_work_tracks_writes_and_after_commit_callbacks():
+    """测试请求级事务：仅有写操作时需要提交，提交后才执行回调，回滚则丢弃"""
+    from datetime import datetime
+    from sqlalchemy import create_engine, select
+    from sqlalchemy.orm import Session
+    from app.db.models.message import MessageModel
+
+    engine = create_engine("sqlite://")
+    MessageModel.__table__.create(engine)
+    db = Session(bind=engine)
+    called = []
+
+    db.execute(select(MessageModel.id))
+    assert not session.has_pending_writes(db)
+
+    db.add(MessageModel(id=1, conversation_id=1, llm_id=1, question="q", content="c", create_by="u", create_time=datetime.now()))
+    assert session.has_pending_writes(db)
+    db.flush()
+    assert session.has_pending_writes(db)
+    session.call_after_commit(db, lambda: called.append("rolled back"))
+    db.rollback()
+    assert not session.has_pending_writes(db) and called == []
+
+    db.execute(MessageModel.__table__.delete())
+    assert session.has_pending_writes(db)
+    session.call_after_commit(db, lambda: called.append("committed"))
+    db.commit()
+    assert not session.has_pending_writes(db) and called == ["committed"]
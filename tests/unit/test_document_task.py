@@ -0,0 +1,43 @@
+# tests/unit/test_document_task.py
+from types import SimpleNamespace
+
+from app.core.celery import document_task
+from app.core.celery.celery_app import celery_app
+from app.core.config import CeleryWorkerConfig
+
+
+def _queue(name):
+    return celery_app.amqp.router.route({}, name)["queue"].name
+
+
+def test_ingestion_stages_are_routed_to_separate_queues():
+    """测试解析、向量化、写入阶段路由到各自的队列"""
+    assert _queue(document_task.process_document.name) == "document.parse"
+    assert _queue(document_task.embed_chunks.name) == "document.embed"
+    assert _queue(document_task.index_chunks.name) == "document.index"
+    assert _queue(document_task.finalize_document.name) == "document.index"
+
+
+def test_chord_inherits_priority_and_demotes_large_documents(monkeypatch):
+    """测试子任务继承文档优先级，子任务数超过阈值的大文档降低优先级"""
+    monkeypatch.setattr(document_task.settings, "celery", CeleryWorkerConfig(large_document_tasks=2))
+    task = SimpleNamespace(request=SimpleNamespace(id="root", delivery_info={"priority": 2}))
+    chunk = {"id": "7_abc", "content": "text", "metadata": {}}
+
+    def plan(batches):
+        return {"file_path": "f.pdf", "document_info": {"id": 7}, "batches": [[chunk]] * batches, "chunks": {"abc": "7_abc"}}
+
+    small = document_task._build_chord(task, 7, plan(2))
+    assert [step.options["priority"] for chain in small.tasks for step in chain.tasks] == [2] * 4
+    assert small.body.options["priority"] == 2
+    assert small.tasks[0].tasks[1].kwargs == {"document_id": 7, "root_id": "root", "total": 2}
+
+    large = document_task._build_chord(task, 7, plan(3))
+    assert {step.options["priority"] for chain in large.tasks for step in chain.tasks} == {5}
+    assert large.body.options["priority"] == 5
+
+
+def test_worker_without_queue_option_consumes_every_stage():
+    """测试未指定 -Q 的 worker 消费全部阶段队列"""
+    declared = {queue.name for queue in celery_app.conf.task_queues}
+    assert declared == {"celery", "document.parse", "document.embed", "document.index"}
@@ -0,0 +1,31 @@
+# tests/unit/test_executors.py
+import asyncio
+import threading
+from app.core import executors, metrics
+
+
+async def test_run_blocking_uses_dedicated_pool():
+    """测试阻塞调用在子系统专用线程池中执行"""
+    thread_name = await executors.run_blocking("test_pool", lambda: threading.current_thread().name)
+    assert thread_name.startswith("test_pool-")
+    assert executors.get_executor("test_pool")._max_workers == executors.DEFAULT_MAX_WORKERS
+
+
+async def test_queue_depth_returns_to_zero(monkeypatch):
+    """测试排队和执行结束后队列深度归零"""
+    monkeypatch.setattr(executors.CONFIG, "executors", {"test_depth": 1})
+    release = threading.Event()
+
+    first = asyncio.create_task(executors.run_blocking("test_depth", release.wait))
+    second = asyncio.create_task(executors.run_blocking("test_depth", lambda: None))
+    await asyncio.sleep(0.05)
+    assert executors._queued["test_depth"] == 1
+
+    second.cancel()
+    await asyncio.sleep(0)
+    assert executors._queued["test_depth"] == 0
+
+    release.set()
+    await first
+    assert executors._active["test_depth"] == 0
+    assert metrics.get_summary("executor.queue_wait_seconds", {"executor": "test_depth"}).count == 1
@@ -0,0 +1,60 @@
+# tests/unit/test_history_search.py
+import json
+from types import SimpleNamespace
+
+from sqlalchemy.exc import OperationalError
+
+from app.services import history_search
+
+
+def test_rrf_ranks_items_found_by_both_retrievers_first():
+    fused = history_search.reciprocal_rank_fusion([[1, 2, 3], [3, 4]], k=60)
+    ids = [item for item, _ in fused]
+    assert ids[0] == 3
+    assert set(ids) == {1, 2, 3, 4}
+    assert dict(fused)[1] == 1 / 61
+
+
+async def test_vector_search_parses_message_ids(monkeypatch):
+    monkeypatch.setattr(history_search.CONFIG.history_search, "vector_enabled", True)
+    calls = {}
+
+    async def fake_search(query, site, num_results):
+        calls["site"] = site
+        return [
+            ["conversation/1#message-7", json.dumps({"message_id": 7}), "q", site],
+            ["broken", "not json", "q", site],
+            ["conversation/1#message-5", json.dumps({"message_id": 5}), "q", site],
+        ]
+
+    monkeypatch.setattr(history_search.retriever, "search", fake_search)
+    assert await history_search.vector_search(42, "hello", 10) == [7, 5]
+    assert calls["site"] == "user_42_history"
+
+
+def test_build_document_targets_user_history_site():
+    message = SimpleNamespace(id=7, conversation_id=3, question="问题", content="回答")
+    doc = history_search.build_document(message, 42, [0.1])
+    assert doc["id"] == "message_7"
+    assert doc["site"] == "user_42_history"
+    assert json.loads(doc["schema_json"])["message_id"] == 7
+
+
+async def test_search_falls_back_to_vector_without_fulltext_index(monkeypatch):
+    """测试缺少 FULLTEXT 索引时退化为仅向量检索，而不是抛出异常"""
+    async def fake_vector_search(user_id, query, limit):
+        return [7]
+
+    class FakeSession:
+        calls = 0
+
+        async def execute(self, statement):
+            self.calls += 1
+            if self.calls == 1:  # 全文检索
+                raise OperationalError("SELECT", {}, Exception("Can't find FULLTEXT index matching the column list"))
+            row = SimpleNamespace(id=7)
+            return SimpleNamespace(all=lambda: [row])
+
+    monkeypatch.setattr(history_search, "vector_search", fake_vector_search)
+    results = await history_search.search(FakeSession(), 42, "hello", 10)
+    assert [row.id for row, _ in results] == [7]
@@ -0,0 +1,49 @@
+# tests/unit/test_http_transport.py
+import pytest
+from app.core import http_transport
+
+
+@pytest.fixture(autouse=True)
+async def close_clients():
+    yield
+    await http_transport.aclose_all()
+
+
+async def test_client_shared_per_origin():
+    """测试同一主机的不同路径共享同一个HTTP客户端"""
+    a = http_transport.get_http_client("https://example.com/v1")
+    b = http_transport.get_http_client("https://EXAMPLE.com/compatible-mode/v1")
+    c = http_transport.get_http_client("https://other.example.com/v1")
+    assert a is b
+    assert a is not c
+
+
+async def test_closed_client_is_recreated():
+    """测试关闭后再次获取会重建客户端"""
+    a = http_transport.get_http_client("https://example.com")
+    await http_transport.aclose_all()
+    assert a.is_closed
+    b = http_transport.get_http_client("https://example.com")
+    assert b is not a and not b.is_closed
+
+
+def test_invalid_base_url():
+    """测试非法URL"""
+    with pytest.raises(ValueError):
+        http_transport.get_http_client("not-a-url")
+
+
+async def test_snowflake_post_returns_json_body(monkeypatch):
+    """测试 Snowflake 请求成功时返回响应 JSON"""
+    import httpx
+    from app.core.llm_providers import snowflake as provider
+
+    body = {"choices": [{"message": {"content": "{\"answer\": 1}"}}]}
+    client = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(200, json=body)))
+    monkeypatch.setattr(provider.SnowflakeProvider, "get_client", classmethod(lambda cls: client))
+    monkeypatch.setattr(provider.snowflake, "get_account_url", lambda cfg: "https://account.snowflake.test")
+    monkeypatch.setattr(provider.snowflake, "get_pat", lambda cfg: "pat")
+    try:
+        assert await provider.post("/api/v2/cortex/inference:complete", {}, 5) == body
+    finally:
+        await client.aclose()
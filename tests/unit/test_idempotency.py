@@ -0,0 +1,95 @@
+# tests/unit/test_idempotency.py
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from app.services import idempotency
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    async def eval(self, script, numkeys, key, token):
+        if self.data.get(key) == token:
+            del self.data[key]
+
+
+def _db():
+    db = SimpleNamespace(new=[], dirty=[], deleted=[], info={}, commits=0)
+
+    async def commit():
+        db.commits += 1
+    db.commit = commit
+    return db
+
+
+def _counting_work(calls, result=None):
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return result or {"id": len(calls)}
+    return lambda: work()
+
+
+async def test_concurrent_duplicates_share_one_execution(monkeypatch):
+    """测试进程内并发的重复请求只执行一次（Redis 不可用时同样生效）"""
+    def unavailable():
+        raise ConnectionError("redis down")
+    monkeypatch.setattr(idempotency, "get_redis", unavailable)
+    calls = []
+    work = _counting_work(calls)
+    results = await asyncio.gather(*(
+        idempotency.run(_db(), 1, "send", "k1", {"q": "hi"}, work) for _ in range(3)
+    ))
+    assert calls == [1]
+    assert results == [{"id": 1}] * 3
+
+
+async def test_stored_result_replayed_and_commit_before_store(monkeypatch):
+    """测试结果在提交后保存，之后的重复请求直接重放，不同请求内容复用键返回422"""
+    redis = FakeRedis()
+    monkeypatch.setattr(idempotency, "get_redis", lambda: redis)
+    db = _db()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        db.info["has_writes"] = True
+        db.new.append(object())
+        return {"id": 10}
+
+    assert await idempotency.run(db, 1, "send", "k2", {"q": "hi"}, work) == {"id": 10}
+    assert db.commits == 1
+    assert await idempotency.run(_db(), 1, "send", "k2", {"q": "hi"}, work) == {"id": 10}
+    assert calls == [1]
+    assert not any(key.endswith(":lock") for key in redis.data)
+
+    with pytest.raises(HTTPException) as exc:
+        await idempotency.run(_db(), 1, "send", "k2", {"q": "other"}, work)
+    assert exc.value.status_code == 422
+
+
+async def test_failure_not_stored(monkeypatch):
+    """测试失败的请求不保存结果，同一个键可以重试"""
+    redis = FakeRedis()
+    monkeypatch.setattr(idempotency, "get_redis", lambda: redis)
+
+    async def failing():
+        raise HTTPException(status_code=400, detail="bad")
+
+    with pytest.raises(HTTPException):
+        await idempotency.run(_db(), 1, "send", "k3", {"q": "hi"}, failing)
+    calls = []
+    assert await idempotency.run(_db(), 1, "send", "k3", {"q": "hi"}, _counting_work(calls)) == {"id": 1}
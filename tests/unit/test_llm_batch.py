@@ -0,0 +1,98 @@
+# tests/unit/test_llm_batch.py
+import pytest
+from app.core import llm_batch
+from app.core.llm_batch import BatchJobStore, ask_llm_batch
+
+
+@pytest.fixture(autouse=True)
+def job_store(tmp_path, monkeypatch):
+    """使用临时目录作为作业存储"""
+    store = BatchJobStore(str(tmp_path))
+    monkeypatch.setattr(llm_batch, "_store", store)
+    return store
+
+
+async def test_duplicate_prompts_sent_once(monkeypatch):
+    """测试重复提示词只调用一次且结果按原顺序返回"""
+    calls = []
+
+    async def fake_ask_llm(prompt, schema, **kwargs):
+        calls.append(prompt)
+        return {"answer": prompt.upper()}
+
+    monkeypatch.setattr(llm_batch, "ask_llm", fake_ask_llm)
+    results = await ask_llm_batch(["a", "b", "a"], {"type": "object"}, concurrency=2)
+
+    assert sorted(calls) == ["a", "b"]
+    assert results == [{"answer": "A"}, {"answer": "B"}, {"answer": "A"}]
+
+
+async def test_resume_skips_finished_prompts(monkeypatch, job_store):
+    """测试作业恢复时只执行尚未完成的提示词"""
+    job = llm_batch.create_batch_job(["a", "b"], {"type": "object"}, job_id="job1")
+    job.results["0"] = {"answer": "cached"}
+    job_store.save(job)
+    calls = []
+
+    async def fake_ask_llm(prompt, schema, **kwargs):
+        calls.append(prompt)
+        return {"answer": prompt}
+
+    monkeypatch.setattr(llm_batch, "ask_llm", fake_ask_llm)
+    results = await ask_llm_batch([], {}, job_id="job1")
+
+    assert calls == ["b"]
+    assert results == [{"answer": "cached"}, {"answer": "b"}]
+    assert job_store.load("job1").status == "completed"
+
+
+async def test_resume_retries_failed_prompts(monkeypatch, job_store):
+    """测试失败的提示词不记录结果，作业恢复时重新执行"""
+    calls = []
+
+    async def flaky_ask_llm(prompt, schema, **kwargs):
+        calls.append(prompt)
+        return {} if prompt == "b" and calls.count("b") == 1 else {"answer": prompt}
+
+    monkeypatch.setattr(llm_batch, "ask_llm", flaky_ask_llm)
+    assert await ask_llm_batch(["a", "b"], {"type": "object"}, job_id="job2") == [{"answer": "a"}, {}]
+    assert job_store.load("job2").results == {"0": {"answer": "a"}}
+
+    results = await ask_llm_batch([], {}, job_id="job2")
+    assert sorted(calls) == ["a", "b", "b"]
+    assert results == [{"answer": "a"}, {"answer": "b"}]
+
+
+def test_task_retries_failed_vendor_poll(monkeypatch, job_store):
+    """测试厂商作业轮询失败时任务稍后重试，连续失败达到上限才放弃"""
+    from app.core.celery import llm_batch_task
+    from app.core.config import BatchConfig
+
+    job = llm_batch.create_batch_job(["a"], {"type": "object"}, job_id="job2")
+    job.mode, job.vendor_batch_id = "vendor", "batch_1"
+    job_store.save(job)
+
+    async def failing_poll(job):
+        raise RuntimeError("502 Bad Gateway")
+
+    class Retry(Exception):
+        pass
+
+    retries = []
+
+    def fake_retry(**kwargs):
+        retries.append(kwargs)
+        return Retry()
+
+    task = llm_batch_task.run_llm_batch
+    monkeypatch.setattr(llm_batch_task, "advance_batch_job", failing_poll)
+    monkeypatch.setattr(llm_batch_task.CONFIG, "llm_batch", BatchConfig(max_poll_errors=2, poll_interval=5))
+    monkeypatch.setattr(task, "retry", fake_retry)
+    monkeypatch.setattr(task, "update_state", lambda **kwargs: None)
+
+    with pytest.raises(Retry):
+        task("job2", poll_errors=1)
+    assert retries == [{"args": ("job2",), "kwargs": {"poll_errors": 2}, "countdown": 5}]
+
+    result = task("job2", poll_errors=2)
+    assert result["status"] == "error" and len(retries) == 1
@@ -0,0 +1,59 @@
+# tests/unit/test_llm_config_provider.py
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+from app.core import llm
+from app.core.llm_providers.openai_compatible import OpenAICompatibleProvider
+
+
+def make_config(**overrides):
+    """构造一条LLM配置记录"""
+    values = dict(
+        id=1, llm_en_name="deepseek-chat", api_url="https://api.deepseek.com/v1", api_key="sk-test",
+        temperature=0.2, top_p=0.9, max_tokens=256, is_local_llm=False
+    )
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    llm._config_providers.clear()
+    yield
+    llm._config_providers.clear()
+
+
+def test_provider_cached_per_config_id():
+    """测试同一配置复用客户端，配置变化后重建"""
+    config = make_config()
+    first = llm.get_config_provider(config)
+    assert isinstance(first.provider, OpenAICompatibleProvider)
+    assert first.model == "deepseek-chat"
+    assert llm.get_config_provider(config) is first
+
+    config.api_key = "sk-rotated"
+    assert llm.get_config_provider(config) is not first
+
+
+def test_invalidate_llm_config():
+    """测试更新配置后缓存失效"""
+    config = make_config()
+    first = llm.get_config_provider(config)
+    llm.invalidate_llm_config(config.id)
+    assert llm.get_config_provider(config) is not first
+
+
+async def test_ask_llm_with_config_uses_row_settings():
+    """测试调用时使用配置中的模型、温度和最大token数"""
+    config = make_config()
+    resolved = llm.get_config_provider(config)
+    resolved.provider.get_completion = AsyncMock(return_value={"content": "hi"})
+
+    result = await llm.ask_llm_with_config(config, "prompt", {"type": "object"})
+
+    assert result == {"content": "hi"}
+    kwargs = resolved.provider.get_completion.call_args.kwargs
+    assert kwargs["model"] == "deepseek-chat"
+    assert kwargs["temperature"] == 0.2
+    assert kwargs["top_p"] == 0.9
+    assert kwargs["max_tokens"] == 256
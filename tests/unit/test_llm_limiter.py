@@ -0,0 +1,75 @@
+# tests/unit/test_llm_limiter.py
+import asyncio
+import pytest
+from types import SimpleNamespace
+from app.core.config import RateLimitConfig
+from app.core.llm_limiter import EndpointLimiter, get_retry_after, is_rate_limit_error
+
+
+class FakeRateLimitError(Exception):
+    """模拟SDK抛出的429异常"""
+    def __init__(self, headers=None):
+        super().__init__("429 Too Many Requests")
+        self.status_code = 429
+        self.response = SimpleNamespace(status_code=429, headers=headers or {})
+
+
+class TestEndpointLimiter:
+    """LLM端点限流器测试"""
+
+    async def test_limits_in_flight_requests(self):
+        """测试并发数不超过上限"""
+        limiter = EndpointLimiter("test", RateLimitConfig(max_concurrency=2))
+        peak = 0
+
+        async def call():
+            nonlocal peak
+            async with limiter.slot():
+                peak = max(peak, limiter.in_flight)
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(*(call() for _ in range(10)))
+        assert peak == 2
+        assert limiter.in_flight == 0
+
+    async def test_rate_limit_halves_concurrency(self):
+        """测试收到429后并发上限按比例下降"""
+        limiter = EndpointLimiter(
+            "test", RateLimitConfig(max_concurrency=8, default_retry_after=0.0)
+        )
+        with pytest.raises(FakeRateLimitError):
+            async with limiter.slot():
+                raise FakeRateLimitError()
+        assert limiter.limit == 4
+
+    async def test_success_increases_concurrency(self):
+        """测试成功调用后并发上限逐步恢复"""
+        limiter = EndpointLimiter(
+            "test", RateLimitConfig(max_concurrency=4, initial_concurrency=1)
+        )
+        for _ in range(10):
+            async with limiter.slot():
+                pass
+        assert limiter.limit == 4
+
+    async def test_cancelled_waiter_is_removed(self):
+        """测试排队中被取消的请求不会占用队列"""
+        limiter = EndpointLimiter("test", RateLimitConfig(max_concurrency=1))
+        await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        assert limiter.queue_depth == 1
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert limiter.queue_depth == 0
+        limiter.release()
+
+
+def test_retry_after_header_parsing():
+    """测试Retry-After头解析"""
+    assert get_retry_after(FakeRateLimitError({"retry-after": "3"})) == 3.0
+    assert get_retry_after(FakeRateLimitError({"retry-after-ms": "500"})) == 0.5
+    assert get_retry_after(FakeRateLimitError()) is None
+    assert is_rate_limit_error(FakeRateLimitError())
+    assert not is_rate_limit_error(ValueError("boom"))
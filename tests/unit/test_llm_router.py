@@ -0,0 +1,96 @@
+# tests/unit/test_llm_router.py
+import asyncio
+import pytest
+from app.core import llm_router
+from app.core.config import ModelGroupConfig
+from app.core.llm_router import AllEndpointsFailedError, ModelGroupRouter
+
+
+@pytest.fixture(autouse=True)
+def reset_stats():
+    """每个测试使用独立的端点统计"""
+    llm_router._endpoint_stats.clear()
+    yield
+    llm_router._endpoint_stats.clear()
+
+
+class TestModelGroupRouter:
+    """模型组路由测试"""
+
+    async def test_failover_on_timeout(self):
+        """测试首选端点超时后切换到下一个端点"""
+        router = ModelGroupRouter("g", ModelGroupConfig(endpoints=["a", "b"]))
+        calls = []
+
+        async def call(endpoint, remaining):
+            calls.append(endpoint)
+            if endpoint == "a":
+                raise asyncio.TimeoutError()
+            return {"content": endpoint}
+
+        result = await router.route(call, timeout=1.0)
+        assert result == {"content": "b"}
+        assert calls == ["a", "b"]
+        # 失败的端点进入冷却期，下次排在后面
+        assert router.rank() == ["b", "a"]
+
+    async def test_empty_response_triggers_failover(self):
+        """测试空响应视为失败"""
+        router = ModelGroupRouter("g", ModelGroupConfig(endpoints=["a", "b"]))
+
+        async def call(endpoint, remaining):
+            return {} if endpoint == "a" else {"content": "ok"}
+
+        assert await router.route(call, timeout=1.0) == {"content": "ok"}
+
+    async def test_hedged_request_wins(self):
+        """测试主请求过慢时对冲请求先返回并取消主请求"""
+        router = ModelGroupRouter(
+            "g",
+            ModelGroupConfig(endpoints=["slow", "fast"], hedge_enabled=True,
+                             hedge_min_delay=0.01, hedge_max_delay=0.01),
+        )
+        cancelled = asyncio.Event()
+
+        async def call(endpoint, remaining):
+            if endpoint == "slow":
+                try:
+                    await asyncio.sleep(10)
+                except asyncio.CancelledError:
+                    cancelled.set()
+                    raise
+            return {"content": endpoint}
+
+        result = await router.route(call, timeout=1.0)
+        assert result == {"content": "fast"}
+        await asyncio.wait_for(cancelled.wait(), timeout=1.0)
+        assert llm_router.get_endpoint_stats("slow").in_flight == 0
+
+    async def test_all_endpoints_failed(self):
+        """测试所有端点失败时抛出异常并记录尝试过的端点"""
+        router = ModelGroupRouter("g", ModelGroupConfig(endpoints=["a", "b"]))
+
+        async def call(endpoint, remaining):
+            raise asyncio.TimeoutError(endpoint)
+
+        with pytest.raises(AllEndpointsFailedError) as exc_info:
+            await router.route(call, timeout=1.0)
+        assert exc_info.value.attempted == ["a", "b"]
+        assert str(exc_info.value.last_error) == "b"
+
+    async def test_non_retryable_error_does_not_fail_over(self):
+        """测试请求错误、鉴权失败等不可重试的错误不切换端点"""
+        router = ModelGroupRouter("g", ModelGroupConfig(endpoints=["a", "b"]))
+        calls = []
+
+        class AuthenticationError(Exception):
+            status_code = 401
+
+        async def call(endpoint, remaining):
+            calls.append(endpoint)
+            raise AuthenticationError("invalid api key")
+
+        with pytest.raises(AllEndpointsFailedError) as exc_info:
+            await router.route(call, timeout=1.0)
+        assert calls == ["a"]
+        assert isinstance(exc_info.value.last_error, AuthenticationError)
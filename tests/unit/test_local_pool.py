@@ -0,0 +1,65 @@
+# tests/unit/test_local_pool.py
+import asyncio
+import httpx
+import pytest
+from app.core.config import LocalPoolConfig, LocalServerConfig
+from app.core.llm_providers.local_pool import LocalServerPool, NoLocalServerError
+
+
+def _pool():
+    return LocalServerPool(LocalPoolConfig(servers=[
+        LocalServerConfig(url="http://a", models=["chat"], max_concurrency=2),
+        LocalServerConfig(url="http://b", models=["chat"], max_concurrency=2),
+        LocalServerConfig(url="http://e", models=["embed"], max_concurrency=1),
+        LocalServerConfig(url="http://any"),
+    ]))
+
+
+def test_models_pinned_to_servers():
+    """测试模型只路由到固定该模型的服务器"""
+    pool = _pool()
+    assert [s.url for s in pool.candidates("embed")] == ["http://e"]
+    assert {s.url for s in pool.candidates("chat")} == {"http://a", "http://b"}
+    # 未固定的模型只发往未声明模型的服务器
+    assert [s.url for s in pool.candidates("other")] == ["http://any"]
+
+
+async def test_dispatch_to_least_loaded():
+    """测试请求分发到队列最短的服务器"""
+    pool = _pool()
+    release = asyncio.Event()
+    used = []
+
+    async def call(server):
+        used.append(server.url)
+        await release.wait()
+        return server.url
+
+    tasks = [asyncio.create_task(pool.dispatch("chat", call)) for _ in range(4)]
+    await asyncio.sleep(0)
+    assert sorted(used) == ["http://a", "http://a", "http://b", "http://b"]
+    release.set()
+    await asyncio.gather(*tasks)
+    assert all(s.inflight == 0 for s in pool.servers)
+
+
+async def test_failover_on_connection_error():
+    """测试服务器不可达时切换并进入冷却"""
+    pool = _pool()
+
+    async def call(server):
+        if server.url == "http://a":
+            raise httpx.ConnectError("refused")
+        return server.url
+
+    assert await pool.dispatch("chat", call) == "http://b"
+    # a 处于冷却期，排在后面
+    assert pool.candidates("chat")[0].url == "http://b"
+
+    async def always_down(server):
+        raise httpx.ConnectError("refused")
+
+    with pytest.raises(httpx.ConnectError):
+        await pool.dispatch("embed", always_down)
+    with pytest.raises(NoLocalServerError):
+        await LocalServerPool(LocalPoolConfig(servers=[])).dispatch("chat", call)
@@ -0,0 +1,123 @@
+# tests/unit/test_message_cache.py
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.db.models.message import MessageModel
+from app.services import message_cache
+
+
+def _message(id=1, conversation_id=7):
+    return MessageModel(
+        id=id, conversation_id=conversation_id, llm_id=2, question="问题", content="回答",
+        reasoning_content=None, create_by="u", create_time=datetime(2025, 1, 1, 8, 0, 0)
+    )
+
+
+def test_serialize_roundtrip():
+    """测试消息紧凑序列化与还原"""
+    raw = message_cache.serialize(_message())
+    assert raw.startswith("[1,7,2,")
+    restored = message_cache.deserialize(raw)
+    assert restored.id == 1 and restored.question == "问题"
+    assert restored.create_time == datetime(2025, 1, 1, 8, 0, 0)
+    assert restored.update_time is None
+
+
+def test_serialize_stores_column_precision_time():
+    """测试缓存中的时间与 DATETIME 列一致（naive UTC、精确到秒）"""
+    message = _message()
+    message.create_time = datetime(2025, 1, 1, 16, 0, 0, 654321, tzinfo=timezone(timedelta(hours=8)))
+    restored = message_cache.deserialize(message_cache.serialize(message))
+    assert restored.create_time == datetime(2025, 1, 1, 8, 0, 0)
+    assert restored.create_time.tzinfo is None
+
+
+def test_cache_ops_applied_only_after_commit():
+    """测试缓存更新仅在事务提交后生效，回滚则丢弃"""
+    session = Session(bind=create_engine("sqlite://"))
+    message_cache.stage_create(session, _message())
+    session.connection()
+    session.rollback()
+    assert message_cache._COMMITTED not in session.info
+    assert message_cache._STAGED not in session.info
+
+    message_cache.stage_create(session, _message())
+    message_cache.stage_invalidate(session, 8)
+    session.connection()
+    session.commit()
+    ops = session.info[message_cache._COMMITTED]
+    assert [op for op, _ in ops] == ["create", "invalidate"]
+
+
+async def test_apply_committed(monkeypatch):
+    """测试提交后的缓存写入：新增写入列表头部，删除使缓存失效"""
+    calls = []
+
+    class FakeRedis:
+        async def eval(self, script, numkeys, key, *args):
+            calls.append(("eval", key, args[0]))
+
+        async def delete(self, *keys):
+            calls.append(("delete",) + keys)
+
+        async def incr(self, key):
+            calls.append(("incr", key))
+
+        async def expire(self, key, seconds):
+            pass
+
+    monkeypatch.setattr(message_cache, "get_redis", lambda: FakeRedis())
+    session = Session()
+    session.info[message_cache._COMMITTED] = [("create", _message()), ("invalidate", 8)]
+    await message_cache.apply_committed(session)
+    assert calls[0] == ("incr", "conv:7:messages:version")
+    assert calls[1][0] == "eval" and calls[1][1] == "conv:7:messages"
+    assert calls[2] == ("incr", "conv:8:messages:version")
+    assert calls[3] == ("delete", "conv:8:messages")
+    assert message_cache._COMMITTED not in session.info
+
+
+async def test_fill_skipped_when_version_changed(monkeypatch):
+    """测试查询期间有提交写入（版本号变化）时不回填旧数据"""
+    store = {"conv:7:messages:version": "3"}
+    evals = []
+
+    class FakeRedis:
+        async def get(self, key):
+            return store.get(key)
+
+        async def eval(self, script, numkeys, key, version_key, version, *args):
+            evals.append(version)
+            return int((store.get(version_key) or "") == version)
+
+    monkeypatch.setattr(message_cache, "get_redis", lambda: FakeRedis())
+    version = await message_cache.get_version(7)
+    assert version == "3"
+    store["conv:7:messages:version"] = "4"  # 并发提交
+    await message_cache.fill(7, [_message()], version)
+    assert evals == ["3"]
+
+    # 读取版本号失败时不回填
+    await message_cache.fill(7, [_message()], None)
+    assert evals == ["3"]
+
+
+def test_response_from_cached_row():
+    """测试由缓存行直接构建消息响应，列表视图只返回推理文本预览"""
+    from app.schemas.message import MessageResponse
+
+    message = _message()
+    message.reasoning_content = "思考" * 400
+    row = message_cache.deserialize(message_cache.serialize(message))
+
+    full = MessageResponse.from_row(row)
+    assert full.reasoning_content == message.reasoning_content
+    assert full.model_dump() == MessageResponse.from_row(message).model_dump()
+
+    preview = MessageResponse.from_row(row, 100)
+    assert preview.reasoning_content.startswith("思考" * 50)
+    assert "characters omitted" in preview.reasoning_content
+    assert MessageResponse.from_row(row, 0).reasoning_content is None
+    assert "_sa_instance_state" not in message.to_dict()
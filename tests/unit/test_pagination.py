@@ -0,0 +1,40 @@
+# tests/unit/test_pagination.py
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import mysql
+
+from app.db.models.message import MessageModel
+from app.utils.pagination import after_cursor, decode_cursor, encode_cursor, newest_first, next_cursor
+
+
+def test_cursor_roundtrip():
+    """测试游标编码与解码"""
+    created = datetime(2025, 1, 2, 3, 4, 5, 678)
+    assert decode_cursor(encode_cursor(created, 42)) == (created, 42)
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+
+def test_next_cursor_only_for_full_page():
+    """测试仅在满页时返回下一页游标"""
+    rows = [SimpleNamespace(create_time=datetime(2025, 1, 1), id=i) for i in (3, 2)]
+    assert decode_cursor(next_cursor(rows, 2)) == (datetime(2025, 1, 1), 2)
+    assert next_cursor(rows, 3) is None
+
+
+def test_keyset_query():
+    """测试 keyset 分页SQL：按(create_time, id)倒序且不使用OFFSET"""
+    query = (
+        select(MessageModel)
+        .filter(MessageModel.conversation_id == 1)
+        .filter(after_cursor(MessageModel, encode_cursor(datetime(2025, 1, 1), 10)))
+        .order_by(*newest_first(MessageModel))
+        .limit(20)
+    )
+    sql = str(query.compile(dialect=mysql.dialect()))
+    assert "ai_message.create_time < %s OR ai_message.create_time = %s AND ai_message.id < %s" in sql
+    assert "ORDER BY ai_message.create_time DESC, ai_message.id DESC" in sql
+    assert "OFFSET" not in sql
@@ -0,0 +1,32 @@
+# tests/unit/test_parsing_pool.py
+import pypdf
+
+from app.core.config import IngestionConfig
+from app.core.langchain import parsing_pool
+
+
+async def test_pdf_page_ranges_parsed_in_worker_processes(tmp_path, monkeypatch):
+    """测试PDF按页区间在进程池中并行解析，并按页码顺序返回"""
+    path = tmp_path / "report.pdf"
+    writer = pypdf.PdfWriter()
+    for _ in range(5):
+        writer.add_blank_page(width=72, height=72)
+    with open(path, "wb") as f:
+        writer.write(f)
+
+    monkeypatch.setattr(parsing_pool.CONFIG, "ingestion", IngestionConfig(parse_workers=2, pdf_pages_per_task=2))
+    try:
+        pages = [doc async for doc in parsing_pool.iter_documents(str(path))]
+    finally:
+        parsing_pool.shutdown(wait=True)
+    assert [doc.metadata["page"] for doc in pages] == [0, 1, 2, 3, 4]
+    assert pages[0].metadata["source"] == str(path)
+
+
+async def test_falls_back_to_thread_loader_without_pool(tmp_path, monkeypatch):
+    """测试 parse_workers 为 0 时在线程中加载"""
+    path = tmp_path / "notes.txt"
+    path.write_text("hello", encoding="utf-8")
+    monkeypatch.setattr(parsing_pool.CONFIG, "ingestion", IngestionConfig(parse_workers=0))
+    pages = [doc async for doc in parsing_pool.iter_documents(str(path))]
+    assert [doc.page_content for doc in pages] == ["hello"]
@@ -0,0 +1,98 @@
+# tests/unit/test_prompts.py
+from types import SimpleNamespace
+
+from app.core import metrics
+from app.core.prompts import PromptRegistry, PromptTemplate, get_prompt, record_prompt_cache_usage
+
+PROMPTS_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<root xmlns="http://nlweb.ai/base">
+  <Site id="default">
+    <Item>
+      <Prompt ref="RankingPrompt">
+        <promptString>
+          Rank the item. The user's question is: {request.query}. Item: {item.description}
+        </promptString>
+        <returnStruc>
+          {"score": "integer between 0 and 100"}
+        </returnStruc>
+      </Prompt>
+    </Item>
+  </Site>
+  <Site id="seriouseats">
+    <Recipe>
+      <Prompt ref="RankingPrompt">
+        <promptString>Recipe ranking: {request.query}</promptString>
+      </Prompt>
+    </Recipe>
+  </Site>
+</root>
+"""
+
+
+def test_render_template():
+    """测试模板编译与渲染，JSON大括号不被当作变量"""
+    template = PromptTemplate(name="t", text='Stable. {request.query} then {"score": 1} and {item.name}')
+    assert template.variables == ("request.query", "item.name")
+    assert template.stable_prefix == "Stable. "
+    assert template.render({"request.query": "q"}) == 'Stable. q then {"score": 1} and '
+
+
+def test_lookup_falls_back_to_default_site(tmp_path):
+    """测试按站点和类型查找提示词，缺失时回退到默认站点"""
+    path = tmp_path / "prompts.xml"
+    path.write_text(PROMPTS_XML, encoding="utf-8")
+    registry = PromptRegistry(str(path))
+
+    specific = registry.get_prompt("RankingPrompt", site="seriouseats", item_type="Recipe")
+    assert specific.text == "Recipe ranking: {request.query}"
+
+    fallback = registry.get_prompt("RankingPrompt", site="unknown", item_type="Recipe")
+    assert fallback.site == "default"
+    assert fallback.variables == ("request.query", "item.description")
+    assert fallback.return_struc == {"score": "integer between 0 and 100"}
+    assert registry.get_prompt("Missing") is None
+
+
+def test_registry_survives_malformed_prompts(tmp_path):
+    """测试 prompts.xml 缺失或格式错误时注册表为空（调用方回退到内置提示词），不抛出异常"""
+    path = tmp_path / "prompts.xml"
+    path.write_text("<Prompts><Site id='default'>", encoding="utf-8")
+    assert PromptRegistry(str(path)).get_prompt("ConversationReplyPrompt") is None
+    assert PromptRegistry(str(tmp_path / "missing.xml")).prompts == {}
+
+
+def test_conversation_prompt_in_config():
+    """测试对话回复模板：固定指令在前，变量在后"""
+    template = get_prompt("ConversationReplyPrompt")
+    assert template.variables == ("conversation.history", "request.query")
+    assert template.stable_prefix.startswith("You are a professional AI assistant.")
+
+
+def test_prompt_cache_hit_rate():
+    """测试根据usage统计提示词缓存命中率"""
+    metrics.reset()
+    openai_usage = SimpleNamespace(prompt_tokens=1000, prompt_tokens_details=SimpleNamespace(cached_tokens=768))
+    record_prompt_cache_usage("openai", openai_usage)
+    record_prompt_cache_usage("openai", {"prompt_tokens": 1000, "prompt_tokens_details": None})
+    assert metrics.snapshot()["gauges"]["llm.prompt_cache.hit_rate{provider=openai}"] == 0.384
+
+    anthropic_usage = SimpleNamespace(input_tokens=100, cache_read_input_tokens=900, cache_creation_input_tokens=0)
+    record_prompt_cache_usage("anthropic", anthropic_usage)
+    assert metrics.get_counter("llm.prompt_cache.cached_tokens", {"provider": "anthropic"}) == 900
+    assert metrics.snapshot()["gauges"]["llm.prompt_cache.hit_rate{provider=anthropic}"] == 0.9
+
+
+def test_reply_prompt_falls_back_when_template_missing(monkeypatch):
+    """测试对话回复模板缺失或注册表加载失败时使用内置提示词，而不是中断对话"""
+    from app.core import llm
+
+    monkeypatch.setattr(llm, "get_prompt", lambda name: None)
+    prompt = llm._conversation_reply_prompt("User: hi", "今天天气？")
+    assert prompt.startswith("You are a professional AI assistant.")
+    assert "User: hi" in prompt and prompt.count("今天天气？") == 1
+
+    def broken(name):
+        raise ValueError("prompts.xml is not well-formed")
+
+    monkeypatch.setattr(llm, "get_prompt", broken)
+    assert llm._conversation_reply_prompt("", "q").endswith("Please provide a helpful response:")
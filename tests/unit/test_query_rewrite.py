@@ -0,0 +1,51 @@
+# tests/unit/test_query_rewrite.py
+import asyncio
+from types import SimpleNamespace
+from app.core.query_rewrite import set_rewritten_queries, speculative_search
+
+
+def make_search(calls, delays=None):
+    """构造记录调用的检索函数"""
+    async def search(query, count):
+        calls.append(query)
+        await asyncio.sleep((delays or {}).get(query, 0))
+        return [[f"https://{query}/{i}", "{}", query, "site"] for i in range(count)]
+    return search
+
+
+async def test_original_results_without_rewrite():
+    """测试没有改写结果时直接返回原始查询结果"""
+    calls = []
+    results = await speculative_search("shoes", None, make_search(calls), 3)
+    assert calls == ["shoes"]
+    assert len(results) == 3
+
+
+async def test_rewrites_merged_when_published():
+    """测试改写结果发布后合并多个查询的检索结果，且原查询不重复检索"""
+    calls = []
+    handler = SimpleNamespace()
+
+    async def publish():
+        await asyncio.sleep(0.01)
+        set_rewritten_queries(handler, ["shoes", "running shoes"])
+
+    asyncio.create_task(publish())
+    results = await speculative_search("shoes", handler, make_search(calls), 4)
+    assert sorted(calls) == ["running shoes", "shoes"]
+    assert [r[2] for r in results] == ["shoes", "shoes", "running shoes", "running shoes"]
+
+
+async def test_irrelevant_original_search_cancelled():
+    """测试改写后不再包含原查询时取消进行中的原查询检索"""
+    calls = []
+    handler = SimpleNamespace()
+    search = make_search(calls, delays={"shoez": 10})
+
+    async def publish():
+        await asyncio.sleep(0.01)
+        set_rewritten_queries(handler, ["shoes", "sneakers"])
+
+    asyncio.create_task(publish())
+    results = await asyncio.wait_for(speculative_search("shoez", handler, search, 2), timeout=1)
+    assert {r[2] for r in results} == {"shoes", "sneakers"}
@@ -0,0 +1,138 @@
+# tests/unit/test_rag_pipeline.py
+import asyncio
+import json
+
+import pytest
+from langchain.schema import Document
+
+from app.core.config import IngestionConfig
+from app.core.langchain import rag_pipeline
+from app.core.langchain.rag_pipeline import RAGPipeline
+
+
+class FakeEmbeddings:
+    async def aembed_documents(self, texts):
+        await asyncio.sleep(0)
+        return [[float(len(text))] for text in texts]
+
+
+class FakeVectorDB:
+    def __init__(self, events):
+        self.events = events
+        self.batches = []
+        self.deleted = []
+
+    async def upload_documents(self, docs):
+        self.events.append("upload")
+        self.batches.append(list(docs))
+
+    async def delete_documents_by_ids(self, ids):
+        self.deleted.extend(ids)
+        return len(ids)
+
+
+def _pipeline(events):
+    pipeline = RAGPipeline.__new__(RAGPipeline)
+    pipeline.splitter_config = {"mode": "recursive", "max_size": 20, "overlap_ratio": 0}
+    pipeline.embeddings = FakeEmbeddings()
+    pipeline.vector_db_client = FakeVectorDB(events)
+    return pipeline
+
+
+def _pages(events, count, edited=None):
+    for i in range(count):
+        events.append(f"load:{i}")
+        text = f"page {i} " + "word " * 10 if i != edited else f"edited page {i}"
+        yield Document(page_content=text, metadata={"page": i})
+
+
+async def test_pipeline_streams_pages_through_bounded_stages(monkeypatch):
+    """测试分阶段流水线：边加载边上传、分批上传且每个分块都被存储"""
+    events, progress = [], []
+    monkeypatch.setattr(rag_pipeline.CONFIG, "ingestion", IngestionConfig(
+        queue_size=1, embed_batch_size=3, embed_concurrency=2, upload_batch_size=4, parse_workers=0
+    ))
+    monkeypatch.setattr(
+        rag_pipeline.parsing_pool.DocumentLoaderFactory, "lazy_load_documents", lambda path: _pages(events, 30)
+    )
+    pipeline = _pipeline(events)
+
+    async def on_progress(status, value):
+        progress.append(value)
+
+    result = await pipeline.process_and_store_file("f.pdf", {"id": 5, "user_id": 1}, on_progress)
+
+    stored = [doc for batch in pipeline.vector_db_client.batches for doc in batch]
+    assert result["status"] == "success" and result["chunks_stored"] == len(stored)
+    assert sorted(result["chunks"].values()) == sorted(doc["id"] for doc in stored)
+    assert len({doc["id"] for doc in stored}) == len(stored)
+    assert all(len(batch) <= 4 for batch in pipeline.vector_db_client.batches)
+    assert json.loads(stored[0]["schema_json"])["metadata"]["page"] is not None
+    assert events.index("upload") < events.index("load:29")
+    assert progress == sorted(progress) and progress[-1] == 1.0
+
+
+async def test_pipeline_failure_cancels_stages(monkeypatch):
+    """测试任一阶段失败时其余阶段被取消并抛出原异常"""
+    events = []
+    monkeypatch.setattr(rag_pipeline.CONFIG, "ingestion", IngestionConfig(queue_size=1, embed_batch_size=2, parse_workers=0))
+    monkeypatch.setattr(
+        rag_pipeline.parsing_pool.DocumentLoaderFactory, "lazy_load_documents", lambda path: _pages(events, 30)
+    )
+    pipeline = _pipeline(events)
+
+    async def broken(texts):
+        raise RuntimeError("embedding service down")
+    pipeline.embeddings.aembed_documents = broken
+
+    with pytest.raises(RuntimeError, match="embedding service down"):
+        await asyncio.wait_for(pipeline.process_and_store_file("f.pdf", {"id": 5, "user_id": 1}), 5)
+
+
+async def test_reindex_uploads_only_changed_chunks(monkeypatch):
+    """测试增量索引：未变化的分块不再向量化上传，已移除的分块从向量库删除"""
+    monkeypatch.setattr(rag_pipeline.CONFIG, "ingestion", IngestionConfig(parse_workers=0))
+    edited = {"page": None}
+    monkeypatch.setattr(
+        rag_pipeline.parsing_pool.DocumentLoaderFactory, "lazy_load_documents",
+        lambda path: _pages([], 10, edited["page"])
+    )
+    first = _pipeline([])
+    manifest = (await first.process_and_store_file("f.pdf", {"id": 5, "user_id": 1}))["chunks"]
+
+    edited["page"] = 3
+    second = _pipeline([])
+    result = await second.process_and_store_file("f.pdf", {"id": 5, "user_id": 1}, previous_chunks=manifest)
+
+    uploaded = [doc for batch in second.vector_db_client.batches for doc in batch]
+    assert [json.loads(doc["schema_json"])["metadata"]["page"] for doc in uploaded] == [3]
+    assert result["chunks_stored"] == 1 and result["chunks_deleted"] >= 1
+    assert set(second.vector_db_client.deleted) == set(manifest.values()) - set(result["chunks"].values())
+    assert all(vector_id.startswith("5_") for vector_id in result["chunks"].values())
+
+
+async def test_first_reindex_deletes_legacy_positional_ids(monkeypatch):
+    """测试首次增量索引删除旧版本按位置编号存储的向量，删除失败时记入清单下次重试"""
+    monkeypatch.setattr(rag_pipeline.CONFIG, "ingestion", IngestionConfig(parse_workers=0))
+    monkeypatch.setattr(
+        rag_pipeline.parsing_pool.DocumentLoaderFactory, "lazy_load_documents", lambda path: _pages([], 3)
+    )
+    monkeypatch.setattr(rag_pipeline, "LEGACY_MIN_IDS", 4)
+    pipeline = _pipeline([])
+    result = await pipeline.process_and_store_file("f.pdf", {"id": 5, "user_id": 1})
+
+    legacy = [f"5_{i}" for i in range(max(4, 2 * len(result["chunks"])))]
+    assert pipeline.vector_db_client.deleted == legacy
+    assert result["chunks_deleted"] == 0
+
+    async def unavailable(ids):
+        raise RuntimeError("vector store down")
+    failing = _pipeline([])
+    failing.vector_db_client.delete_documents_by_ids = unavailable
+    manifest = (await failing.process_and_store_file("f.pdf", {"id": 5, "user_id": 1}))["chunks"]
+    assert set(legacy) <= set(manifest.values())
+
+    retry = _pipeline([])
+    result = await retry.process_and_store_file("f.pdf", {"id": 5, "user_id": 1}, previous_chunks=manifest)
+    assert sorted(retry.vector_db_client.deleted) == sorted(legacy)
+    assert not any(key.startswith("legacy:") for key in result["chunks"])
@@ -0,0 +1,78 @@
+# tests/unit/test_reasoning.py
+from types import SimpleNamespace
+
+from app.core import reasoning
+from app.core.reasoning import (
+    consume_chat_stream, truncate_reasoning, encode_reasoning, decode_reasoning, COMPRESSED_PREFIX
+)
+
+
+def _chunk(content=None, reasoning_content=None, usage=None):
+    delta = SimpleNamespace(content=content, reasoning_content=reasoning_content)
+    choices = [] if usage is not None else [SimpleNamespace(delta=delta)]
+    return SimpleNamespace(choices=choices, usage=usage)
+
+
+async def _stream(chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+async def test_stream_separates_reasoning():
+    """测试流式响应中推理内容与回答分开收集"""
+    usage = SimpleNamespace(prompt_tokens=10)
+    chunks = [
+        _chunk(reasoning_content="First, "), _chunk(reasoning_content="think."),
+        _chunk(content='{"content": '), _chunk(content='"hi"}'), _chunk(usage=usage)
+    ]
+    result = await consume_chat_stream(_stream(chunks))
+    assert result.content == '{"content": "hi"}'
+    assert result.reasoning == "First, think."
+    assert result.usage is usage
+
+    skipped = await consume_chat_stream(_stream(chunks), capture_reasoning=False)
+    assert skipped.content == '{"content": "hi"}'
+    assert skipped.reasoning is None
+
+
+async def test_stream_think_tags():
+    """测试从<think>标签中提取推理内容"""
+    result = await consume_chat_stream(_stream([_chunk(content="<think>a {b}</think>\n"), _chunk(content='{"x": 1}')]))
+    assert result.content == '{"x": 1}'
+    assert result.reasoning == "a {b}"
+
+
+def test_truncate_keeps_head_and_tail(monkeypatch):
+    """测试推理文本截断保留开头和结尾"""
+    monkeypatch.setattr(reasoning.CONFIG.llm_reasoning, "head_chars", 4)
+    text = "HEAD" + "x" * 100 + "TAIL"
+    truncated = truncate_reasoning(text, max_chars=8)
+    assert truncated.startswith("HEAD") and truncated.endswith("TAIL")
+    assert "[100 characters omitted]" in truncated
+    assert truncate_reasoning("short", max_chars=8) == "short"
+
+
+def test_compression_roundtrip():
+    """测试推理文本压缩存储与读取"""
+    text = "推理步骤：先分析问题，再给出答案。" * 100
+    encoded = encode_reasoning(text)
+    assert encoded.startswith(COMPRESSED_PREFIX) and len(encoded) < len(text.encode("utf-8"))
+    assert decode_reasoning(encoded) == text
+    # 短文本和旧数据不压缩
+    assert encode_reasoning("short") == "short"
+    assert decode_reasoning("legacy plain text") == "legacy plain text"
+
+
+async def test_qwen_unparseable_answer_stays_empty(monkeypatch):
+    """测试回答无法解析时不附加推理内容，调用方仍视为失败（{}）"""
+    from app.core.llm_providers.qwen_openai import QwenOpenAIProvider
+
+    async def create(**kwargs):
+        return _stream([_chunk(reasoning_content="thinking"), _chunk(content="not json")])
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    provider = QwenOpenAIProvider()
+    monkeypatch.setattr(provider, "get_client", lambda: client)
+    monkeypatch.setattr(provider, "clean_response", lambda content: {})
+
+    assert await provider.get_completion("q", {"type": "object"}, model="qwen-plus") == {}